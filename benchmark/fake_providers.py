@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+This file is part of yamr "Yet Another Media Renamer".
+
+Copyright (C) 2019, James Lee <jamesl33info@gmail.com>.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import collections
+import itertools
+import threading
+import time
+
+from typing import Dict, Iterable, List
+
+import imdb
+
+from yamr.helper import scoring
+
+
+class FakeIMDb():
+    """Class representing an in-process stand in for the IMDB web api.
+
+    It implements the same interface as 'yamr.helper.imdb_index.IMDbIndex',
+    so it can be passed to yamr as its 'imdb_backend'.
+    """
+    def __init__(self, latency: float = 0.0) -> None:
+        """Instantiate the FakeIMDb class.
+
+        Arguments:
+            latency: The number of seconds each request takes.
+        """
+        self.latency = latency
+        self.calls = collections.Counter()
+
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._titles = collections.defaultdict(list)
+        self._ids_to_titles = {}
+        self._episodes = {}
+
+    def add_movie(self, title: str, year: int) -> imdb.Movie.Movie:
+        """Add a movie which can be searched for, returning it."""
+        return self._add(title, 'movie', year)
+
+    def add_show(self, title: str, year: int, seasons: Dict[int, int]) -> None:
+        """Add a TV show which can be searched for.
+
+        Arguments:
+            title: The title of the show.
+            year: The year the show started.
+            seasons: The number of episodes in each season.
+        """
+        show = self._add(title, 'tv series', year)
+
+        self._episodes[show.movieID] = {
+            season: {
+                episode: imdb.Movie.Movie(data={'title': 'Episode {0}'.format(episode), 'kind': 'episode'})
+                for episode in range(1, count + 1)
+            }
+            for season, count in seasons.items()
+        }
+
+    def search_movie(self, title: str, year: int = None) -> List[imdb.Movie.Movie]:
+        """See 'yamr.helper.imdb_index.IMDbIndex.search_movie'."""
+        self._request('search_movie')
+
+        return [self._response(movie) for movie in self._titles.get(scoring.normalize(title), [])]
+
+    def get_movie(self, movie_id: str) -> imdb.Movie.Movie:
+        """See 'yamr.helper.imdb_index.IMDbIndex.get_movie'."""
+        self._request('get_movie')
+
+        movie = self._ids_to_titles.get(movie_id[2:] if movie_id.startswith('tt') else movie_id)
+
+        return self._response(movie) if movie is not None else None
+
+    def update_episodes(self, imdb_show: imdb.Movie.Movie, seasons: Iterable[int] = None) -> None:
+        """See 'yamr.helper.imdb_index.IMDbIndex.update_episodes'."""
+        self._request('update_episodes')
+
+        episodes = self._episodes.get(imdb_show.movieID, {})
+
+        if seasons is None:
+            imdb_show['episodes'] = dict(episodes)
+        else:
+            imdb_show['episodes'] = dict(imdb_show.get('episodes') or {})
+            imdb_show['episodes'].update((season, episodes.get(season, {})) for season in seasons)
+
+    def _add(self, title: str, kind: str, year: int) -> imdb.Movie.Movie:
+        title_id = str(next(self._ids)).zfill(7)
+        movie = imdb.Movie.Movie(movieID=title_id, data={'title': title, 'kind': kind, 'year': year})
+
+        self._titles[scoring.normalize(title)].append(movie)
+        self._ids_to_titles[title_id] = movie
+
+        return movie
+
+    @classmethod
+    def _response(cls, movie: imdb.Movie.Movie) -> imdb.Movie.Movie:
+        # Like the web api each response is a new object, so episodes fetched for one aren't shared
+        return imdb.Movie.Movie(movieID=movie.movieID, data=dict(movie.data))
+
+    def _request(self, name: str) -> None:
+        with self._lock:
+            self.calls[name] += 1
+
+        if self.latency:
+            time.sleep(self.latency)
+
+
+class FakeMusicBrainz():
+    """Class representing an in-process stand in for the MusicBrainz web api."""
+    def __init__(self, latency: float = 0.0) -> None:
+        """Instantiate the FakeMusicBrainz class.
+
+        Arguments:
+            latency: The number of seconds each request takes.
+        """
+        self.latency = latency
+        self.calls = collections.Counter()
+
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._releases = {}
+        self._search = collections.defaultdict(list)
+
+    def add_album(self, artist: str, title: str, discs: List[List[str]]) -> None:
+        """Add an album which can be searched for.
+
+        Arguments:
+            artist: The name of the artist.
+            title: The title of the album.
+            discs: The track titles on each disc.
+        """
+        release_id = 'release-{0}'.format(next(self._ids))
+
+        release = {
+            'id': release_id,
+            'title': title,
+            'artist-credit': [{'artist': {'name': artist}}],
+            'artist-credit-phrase': artist,
+            'release-group': {'type': 'Album'},
+            'medium-list': [{'track-count': str(len(disc))} for disc in discs],
+        }
+
+        self._search[scoring.normalize(title)].append(release)
+
+        self._releases[release_id] = {
+            'release': {
+                'id': release_id,
+                'title': title,
+                'artist-credit': [{'artist': {'name': artist}}],
+                'medium-list': [
+                    {'track-list': [{'recording': {'title': track}} for track in disc]} for disc in discs
+                ],
+            },
+        }
+
+    def search_releases(self, title: str, artist: str = None) -> List[dict]:
+        """See 'yamr.helper.providers.search_releases'."""
+        self._request('search_releases')
+
+        releases = self._search.get(scoring.normalize(title), [])
+
+        # Like the web api, releases by the artist are ranked first rather than the others being filtered out
+        if artist is not None:
+            releases = sorted(releases, key=lambda r: scoring.similarity(r['artist-credit-phrase'], artist) < 1)
+
+        return list(releases)
+
+    def get_release(self, release_id: str) -> dict:
+        """See 'yamr.helper.providers.get_release'."""
+        self._request('get_release')
+
+        return self._releases.get(release_id)
+
+    def _request(self, name: str) -> None:
+        with self._lock:
+            self.calls[name] += 1
+
+        if self.latency:
+            time.sleep(self.latency)
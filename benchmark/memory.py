@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+This file is part of yamr "Yet Another Media Renamer".
+
+Copyright (C) 2019, James Lee <jamesl33info@gmail.com>.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+
+from typing import Dict, List
+
+import guessit
+
+from yamr.core import episode
+from yamr.core import movie
+
+
+# Scene style filenames, each is parsed once by Guessit and then reused
+EPISODE_TEMPLATE = 'Show.{0}.S{1:02}E{2:02}.1080p.WEB-DL.DDP5.1.H.264-GROUP.mkv'
+MOVIE_TEMPLATE = 'Movie.{0}.2015.1080p.BluRay.x264.DTS-GROUP.mkv'
+
+# How the media files are held in memory
+RECORDS = 'records'
+DICTS = 'dicts'
+
+EPISODES_PER_SHOW = 100
+
+
+class DictMedia():
+    """Class representing a media file as it was held before compact records,
+    with the full path and everything extracted by Guessit."""
+    def __init__(self, path: str, info: dict) -> None:
+        self._path = path
+        self._info = info
+        self._target = None
+        self._sidecars = []
+
+
+def build_library(size: int, mode: str) -> List[object]:
+    """Build the in memory representation of a library of episodes and movies.
+
+    Arguments:
+        size: The number of media files.
+        mode: Either 'records' to use yamr's media classes, or 'dicts' to keep
+            the full information extracted by Guessit.
+
+    Returns:
+        The media files.
+    """
+    templates = {
+        'episode': dict(guessit.guessit(EPISODE_TEMPLATE.format('Template', 1, 1))),
+        'movie': dict(guessit.guessit(MOVIE_TEMPLATE.format('Template'))),
+    }
+
+    library = []
+
+    for index in range(size):
+        show = index // EPISODES_PER_SHOW
+
+        # Every file gets its own strings, as it would when each filename is parsed
+        if index % 5:
+            path = os.path.join('/library/Show {0}/Season 1'.format(show),
+                                EPISODE_TEMPLATE.format(show, 1, index % EPISODES_PER_SHOW))
+            info = dict(templates['episode'], title='Show {0}'.format(show), episode=index % EPISODES_PER_SHOW)
+            cls = episode.Episode
+        else:
+            path = os.path.join('/library/Movies', MOVIE_TEMPLATE.format(index))
+            info = dict(templates['movie'], title='Movie {0}'.format(index))
+            cls = movie.Movie
+
+        library.append(DictMedia(path, info) if mode == DICTS else cls(path, info))
+
+    return library
+
+
+def measure(size: int, mode: str) -> int:
+    """Measure how much the peak memory use grows whilst building a library.
+
+    Arguments:
+        size: The number of media files.
+        mode: See 'build_library'.
+
+    Returns:
+        The growth in peak resident set size, in bytes.
+    """
+    # Importing and running Guessit happens before the baseline is taken
+    guessit.guessit(EPISODE_TEMPLATE.format('Warmup', 1, 1))
+
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    library = build_library(size, mode)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    del library
+
+    # Linux reports kilobytes, macOS reports bytes
+    return (peak - baseline) * (1 if sys.platform == 'darwin' else 1024)
+
+
+def run_benchmark(size: int = 100000) -> Dict:
+    """Measure the peak memory use of each representation, in a fresh interpreter.
+
+    Arguments:
+        size: The number of media files.
+
+    Returns:
+        The benchmark results, suitable for serializing as JSON.
+    """
+    results = {}
+
+    for mode in (DICTS, RECORDS):
+        measured = subprocess.run([sys.executable, '-m', 'benchmark.memory', '--child', mode, '--size', str(size)],
+                                  check=True, stdout=subprocess.PIPE, universal_newlines=True)
+
+        peak = int(measured.stdout)
+
+        results[mode] = {
+            'peak_rss_bytes': peak,
+            'peak_rss_mib_per_100k_files': peak / (1024 * 1024) * 100000 / size,
+        }
+
+    results['reduction'] = 1 - results[RECORDS]['peak_rss_bytes'] / max(1, results[DICTS]['peak_rss_bytes'])
+
+    return results
+
+
+def main() -> None:
+    """Run the memory benchmark from the command line."""
+    arguments = argparse.ArgumentParser(description='Benchmark how much memory yamr uses to hold a large library')
+    arguments.add_argument('--child', choices=[DICTS, RECORDS], default=None, help=argparse.SUPPRESS)
+    arguments.add_argument('--output', default=None, help='File to write the JSON results to', type=str)
+    arguments.add_argument('--size', default=100000, help='Number of media files', type=int)
+    arguments = arguments.parse_args()
+
+    if arguments.child is not None:
+        print(measure(arguments.size, arguments.child))
+        return
+
+    results = run_benchmark(arguments.size)
+
+    if arguments.output is None:
+        json.dump(results, sys.stdout, indent=4)
+        print()
+    else:
+        with open(arguments.output, 'w') as output:
+            json.dump(results, output, indent=4)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+This file is part of yamr "Yet Another Media Renamer".
+
+Copyright (C) 2019, James Lee <jamesl33info@gmail.com>.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+from typing import Dict, List
+
+
+# Each scenario is run in a fresh interpreter, so nothing is already imported
+SCENARIOS = {
+    'interpreter': 'pass',
+    'version': 'import sys; sys.argv = ["yamr", "--version"]\nfrom yamr.cli import main\ntry:\n    main.run_yamr()\n'
+               'except SystemExit:\n    pass',
+    'cli': 'import yamr.cli.main',
+    'renamer': 'import yamr.cli.yamr',
+}
+
+# Modules which are slow to import, and should only be imported when they're needed
+HEAVY_MODULES = ['guessit', 'imdb', 'musicbrainzngs']
+
+
+def time_scenario(code: str, repeat: int) -> List[float]:
+    """Time how long a fresh interpreter takes to run some code.
+
+    Arguments:
+        code: The code to run.
+        repeat: The number of times to run it.
+
+    Returns:
+        The wall time of each run, in seconds.
+    """
+    timings = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], check=True, stdout=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+
+    return timings
+
+
+def imported_modules(code: str) -> List[str]:
+    """Determine which of the heavy modules are imported by some code.
+
+    Arguments:
+        code: The code to run, in a fresh interpreter.
+
+    Returns:
+        The heavy modules which were imported.
+    """
+    # The scenario may write to stdout, so the modules are written to stderr
+    check = '{0}\nimport sys\nsys.stderr.write(" ".join(m for m in {1!r} if m in sys.modules))'.format(
+        code, HEAVY_MODULES)
+
+    result = subprocess.run([sys.executable, '-c', check], check=True, stdout=subprocess.DEVNULL,
+                            stderr=subprocess.PIPE, universal_newlines=True)
+
+    return result.stderr.split()
+
+
+def run_benchmark(repeat: int = 10) -> Dict:
+    """Time the cold start of each scenario.
+
+    Arguments:
+        repeat: The number of times to run each scenario.
+
+    Returns:
+        The benchmark results, suitable for serializing as JSON.
+    """
+    results = {}
+
+    for name, code in SCENARIOS.items():
+        timings = time_scenario(code, repeat)
+
+        results[name] = {
+            'median': statistics.median(timings),
+            'min': min(timings),
+            'max': max(timings),
+            'imports': imported_modules(code),
+        }
+
+    return results
+
+
+def main() -> None:
+    """Run the startup benchmark from the command line."""
+    arguments = argparse.ArgumentParser(description='Benchmark how long yamr takes to start')
+    arguments.add_argument('--max-seconds', default=None, help='Fail if "version" is slower than this, '
+                           'after subtracting the interpreter start up time', type=float)
+    arguments.add_argument('--output', default=None, help='File to write the JSON results to', type=str)
+    arguments.add_argument('--repeat', default=10, help='Number of times to run each scenario', type=int)
+    arguments = arguments.parse_args()
+
+    results = run_benchmark(arguments.repeat)
+
+    if arguments.output is None:
+        json.dump(results, sys.stdout, indent=4)
+        print()
+    else:
+        with open(arguments.output, 'w') as output:
+            json.dump(results, output, indent=4)
+
+    overhead = results['version']['median'] - results['interpreter']['median']
+
+    if arguments.max_seconds is not None and overhead > arguments.max_seconds:
+        print('Starting yamr took {0:.3f}s, more than {1:.3f}s'.format(overhead, arguments.max_seconds), file=sys.stderr)
+        exit(1)
+
+
+if __name__ == '__main__':
+    main()
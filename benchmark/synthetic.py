@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+This file is part of yamr "Yet Another Media Renamer".
+
+Copyright (C) 2019, James Lee <jamesl33info@gmail.com>.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+from typing import Dict
+from unittest import mock
+
+import yamr
+
+from benchmark import fake_providers
+
+from yamr.cli import yamr as cli
+from yamr.helper import parser
+from yamr.helper import planner
+from yamr.helper import scanner
+from yamr.helper import stats
+
+
+WORDS = [
+    'amber', 'blue', 'crimson', 'dark', 'echo', 'falcon', 'golden', 'hollow', 'iron', 'jade', 'kings', 'lost',
+    'midnight', 'north', 'ocean', 'paper', 'quiet', 'river', 'silver', 'thunder', 'urban', 'velvet', 'winter',
+    'young', 'zero', 'atlas', 'bridge', 'castle', 'desert', 'empire', 'forest', 'garden', 'harbor', 'island',
+]
+
+# The proportion of each kind of media in the generated library
+DEFAULT_MIX = {'episode': 0.55, 'movie': 0.15, 'subtitle': 0.1, 'track': 0.2}
+
+
+def _title(rng: random.Random, index: int) -> str:
+    """Generate a unique title, which Guessit can't mistake for anything else."""
+    words = []
+
+    while True:
+        words.append(WORDS[index % len(WORDS)])
+        index //= len(WORDS)
+
+        if not index:
+            break
+
+    return ' '.join(w.capitalize() for w in words + [rng.choice(WORDS)])
+
+
+def generate_library(root: str, size: int, imdb_backend: fake_providers.FakeIMDb,
+                     musicbrainz_backend: fake_providers.FakeMusicBrainz, mix: Dict[str, float] = None,
+                     seed: int = 0, normalized: bool = False) -> Dict[str, int]:
+    """Generate a synthetic library of empty media files.
+
+    Every generated title is also added to the fake providers, so each lookup
+    succeeds. A share of the filenames use awkward, scene style names, unless
+    the library has already been normalized by yamr.
+
+    Arguments:
+        root: The directory to create the library in.
+        size: The approximate number of files to create.
+        imdb_backend: Populated with the generated movies and shows.
+        musicbrainz_backend: Populated with the generated albums.
+        mix: The proportion of each kind of media.
+        seed: Seed for the random number generator, so libraries are reproducible.
+        normalized: Use yamr's own filename formats for every file.
+
+    Returns:
+        The number of files created of each kind.
+    """
+    rng = random.Random(seed)
+    mix = mix or DEFAULT_MIX
+    counts = {kind: 0 for kind in mix}
+    index = 0
+
+    def _touch(*parts: str) -> None:
+        path = os.path.join(root, *parts)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        open(path, 'w').close()
+
+    # Shows with a few seasons each, some with subtitles alongside the episodes
+    while counts['episode'] < size * mix['episode']:
+        index += 1
+        title = _title(rng, index)
+        seasons = {s: rng.randint(6, 13) for s in range(1, rng.randint(1, 4) + 1)}
+        imdb_backend.add_show(title, 2000 + index % 20, seasons)
+
+        for season, episodes in seasons.items():
+            for ep in range(1, episodes + 1):
+                if normalized:
+                    name = '{0} - S{1:02d}E{2:02d} - Episode {2}'.format(title, season, ep)
+                elif rng.random() < 0.5:
+                    name = '{0} S{1:02d}E{2:02d} 720p'.format(title, season, ep)
+                else:
+                    name = '{0}.s{1:02d}e{2:02d}.HDTV.x264-GRP'.format(title.replace(' ', '.').lower(), season, ep)
+
+                _touch(title, 'Season {0}'.format(season), name + '.mkv')
+                counts['episode'] += 1
+
+                if counts['subtitle'] < size * mix['subtitle']:
+                    _touch(title, 'Season {0}'.format(season), name + '.en.srt')
+                    counts['subtitle'] += 1
+
+    while counts['movie'] < size * mix['movie']:
+        index += 1
+        title = _title(rng, index)
+        year = 1950 + index % 70
+        imdb_backend.add_movie(title, year)
+
+        if normalized or rng.random() < 0.5:
+            _touch('Movies', '{0} ({1}).mkv'.format(title, year))
+        else:
+            _touch('Movies', '{0}.{1}.1080p.BluRay.x264-GRP.mkv'.format(title.replace(' ', '.'), year))
+
+        counts['movie'] += 1
+
+    # Albums, some of which span multiple discs
+    while counts['track'] < size * mix['track']:
+        index += 1
+        artist, title = _title(rng, index), _title(rng, index + 1)
+        discs = [['Track {0}'.format(t) for t in range(1, rng.randint(8, 14) + 1)]
+                 for _ in range(2 if rng.random() < 0.2 else 1)]
+        musicbrainz_backend.add_album(artist, title, discs)
+
+        for disc_number, disc in enumerate(discs, 1):
+            for track_number, _ in enumerate(disc, 1):
+                folder = [artist, title] + (['Disc {0}'.format(disc_number)] if len(discs) > 1 else [])
+                _touch(*folder, '{0} - {1} - {2:02d} - Untitled.flac'.format(artist, title, track_number))
+                counts['track'] += 1
+
+    return counts
+
+
+def run_benchmark(size: int, latency: float = 0.0, jobs: int = 1, mix: Dict[str, float] = None,
+                  seed: int = 0, normalized: bool = False) -> Dict:
+    """Generate a synthetic library and time each phase of renaming it.
+
+    Arguments:
+        size: The approximate number of files in the library.
+        latency: The number of seconds each fake provider request takes.
+        jobs: The number of worker processes used to parse filenames.
+        mix: The proportion of each kind of media.
+        seed: Seed for the random number generator.
+        normalized: Use yamr's own filename formats for every file.
+
+    Returns:
+        The benchmark results, suitable for serializing as JSON.
+    """
+    imdb_backend = fake_providers.FakeIMDb(latency)
+    musicbrainz_backend = fake_providers.FakeMusicBrainz(latency)
+
+    phases = {}
+
+    @contextlib.contextmanager
+    def _phase(name: str):
+        start = time.perf_counter()
+        yield
+        phases[name] = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory(prefix='yamr-benchmark-') as root:
+        counts = generate_library(root, size, imdb_backend, musicbrainz_backend, mix, seed, normalized)
+
+        config = {
+            'auto_threshold': 0.85,
+            'cache': False,
+            'dry_run': True,
+            'folder': root,
+            'imdb_backend': imdb_backend,
+            'jobs': jobs,
+            'musicbrainz_backend': musicbrainz_backend,
+        }
+
+        renamer = cli.YAMR(config, {})
+
+        # Output is discarded, so terminal speed doesn't skew the results
+        with contextlib.redirect_stdout(io.StringIO()):
+            with _phase('scan'):
+                files = list(scanner.scan(root))
+
+            with _phase('parse'):
+                infos = parser.parse_all([f.name for f in files], jobs)
+
+            with _phase('group'):
+                with mock.patch.object(parser, 'parse_stream', lambda items, *_: zip(items, infos)):
+                    albums, movies, tv_shows = renamer._process_media_files(files)
+
+            with _phase('lookup'):
+                for key in albums:
+                    albums[key].rename_tracks(True)
+
+                for key in movies:
+                    movies[key].rename_movies(True)
+
+                renamer._rename_tv_shows(tv_shows)
+
+            with _phase('plan'):
+                plan = planner.Planner()
+                plan.add(media for group in list(albums.values()) + list(movies.values()) + list(tv_shows.values())
+                         for media in group)
+                plan.check()
+
+            # Nothing chosen during the earlier phases is reused, so the total is end to end
+            stats.reset()
+            imdb_backend.calls.clear()
+            musicbrainz_backend.calls.clear()
+
+            with _phase('total'):
+                cli.YAMR(config, {}).rename_media_files()
+
+    file_count = sum(counts.values())
+
+    return {
+        'yamr_version': yamr.__version__,
+        'python_version': platform.python_version(),
+        'parameters': {'size': size, 'latency': latency, 'jobs': jobs, 'mix': mix or DEFAULT_MIX, 'seed': seed,
+                       'normalized': normalized},
+        'files': counts,
+        'phases': phases,
+        'files_per_second': {name: file_count / seconds for name, seconds in phases.items() if seconds},
+        'provider_calls': dict(imdb_backend.calls + musicbrainz_backend.calls),
+        'stats': stats.summary(),
+    }
+
+
+def main() -> None:
+    """Run the synthetic library benchmark from the command line."""
+    arguments = argparse.ArgumentParser(description='Benchmark yamr against a synthetic library')
+    arguments.add_argument('--jobs', default=1, help='Worker processes used to parse filenames', type=int)
+    arguments.add_argument('--latency', default=0.0, help='Seconds each fake provider request takes', type=float)
+    arguments.add_argument('--mix', default=None, help='JSON proportion of each kind of media', type=json.loads)
+    arguments.add_argument('--normalized', action='store_true', help="Only use yamr's own filename formats")
+    arguments.add_argument('--output', default=None, help='File to write the JSON results to', type=str)
+    arguments.add_argument('--seed', default=0, help='Seed for the random number generator', type=int)
+    arguments.add_argument('--size', default=1000, help='Approximate number of files to generate', type=int)
+    arguments = arguments.parse_args()
+
+    results = run_benchmark(arguments.size, arguments.latency, arguments.jobs, arguments.mix, arguments.seed,
+                            arguments.normalized)
+
+    if arguments.output is None:
+        json.dump(results, sys.stdout, indent=4)
+        print()
+    else:
+        with open(arguments.output, 'w') as output:
+            json.dump(results, output, indent=4)
+
+
+if __name__ == '__main__':
+    main()
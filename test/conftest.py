@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+This file is part of yamr "Yet Another Media Renamer".
+
+Copyright (C) 2019, James Lee <jamesl33info@gmail.com>.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import pytest
+
+from yamr.helper import parser
+
+
+@pytest.fixture(autouse=True)
+def isolated_state(tmp_path_factory, monkeypatch):
+    """Keep the cache and decisions of every test out of the user's home directory.
+
+    Tests which don't configure a cache directory would otherwise read, and
+    write, the real '~/.cache/yamr', so their results depend on earlier runs.
+    """
+    state = tmp_path_factory.mktemp('state')
+
+    monkeypatch.setenv('XDG_CACHE_HOME', str(state / 'cache'))
+    monkeypatch.setenv('XDG_DATA_HOME', str(state / 'data'))
+
+    yield
+
+    # The parse cache is module level, so it would otherwise leak into the next test
+    parser.use_cache(None)
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+This file is part of yamr "Yet Another Media Renamer".
+
+Copyright (C) 2019, James Lee <jamesl33info@gmail.com>.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from benchmark import fake_providers
+from benchmark import memory
+from benchmark import synthetic
+
+
+def test_generate_library_is_reproducible(tmp_path):
+    first, second = tmp_path / 'first', tmp_path / 'second'
+
+    counts = synthetic.generate_library(str(first), 50, fake_providers.FakeIMDb(), fake_providers.FakeMusicBrainz())
+    synthetic.generate_library(str(second), 50, fake_providers.FakeIMDb(), fake_providers.FakeMusicBrainz())
+
+    assert sorted(p.relative_to(first) for p in first.rglob('*.*')) == \
+        sorted(p.relative_to(second) for p in second.rglob('*.*'))
+
+    assert sum(counts.values()) == len(list(first.rglob('*.*')))
+
+
+def test_run_benchmark_reports_each_phase():
+    results = synthetic.run_benchmark(40)
+
+    assert set(results['phases']) == {'scan', 'parse', 'group', 'lookup', 'plan', 'total'}
+    assert results['provider_calls']['search_movie'] > 0
+
+    # The total phase is end to end, nothing chosen in the lookup phase is reused
+    assert results['provider_calls']['update_episodes'] > 0
+    assert 'lookup.show' in results['stats']['latencies']
+
+
+def test_memory_benchmark_builds_both_representations():
+    records = memory.build_library(10, memory.RECORDS)
+    dicts = memory.build_library(10, memory.DICTS)
+
+    assert [r.path for r in records] == [d._path for d in dicts]
+    assert set(records[1]._info.keys()) < set(dicts[1]._info)
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+This file is part of yamr "Yet Another Media Renamer".
+
+Copyright (C) 2019, James Lee <jamesl33info@gmail.com>.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from unittest import mock
+
+from yamr.helper import cache
+from yamr.helper import parser
+
+
+def test_cache_round_trip(tmp_path):
+    store = cache.Cache(str(tmp_path / 'cache.sqlite3'))
+    store.put('namespace', 'key', {'title': 'Game of Thrones'})
+    store.close()
+
+    store = cache.Cache(str(tmp_path / 'cache.sqlite3'))
+
+    assert store.get('namespace', 'key') == {'title': 'Game of Thrones'}
+    assert store.get('other', 'key') is None
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    store = cache.Cache(str(tmp_path / 'cache.sqlite3'), max_size=2048)
+
+    for index in range(8):
+        store.put('namespace', str(index), b'x' * 512)
+        store.get('namespace', '0')
+        store.flush()
+
+    assert store.get('namespace', '0') is not None
+    assert store.get('namespace', '1') is None
+    assert len(store) < 8
+
+
+def test_parse_uses_cache(tmp_path):
+    parser.use_cache(cache.Cache(str(tmp_path / 'cache.sqlite3')))
+
+    try:
+        first = parser.parse_all(['Game of Thrones S01E01.mp4'])
+
+        with mock.patch('guessit.guessit') as guess:
+            assert parser.parse_all(['Game of Thrones S01E01.mp4']) == first
+            assert parser.parse('Game of Thrones S01E01.mp4') == first[0]
+
+        guess.assert_not_called()
+    finally:
+        parser.use_cache(None)
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+This file is part of yamr "Yet Another Media Renamer".
+
+Copyright (C) 2019, James Lee <jamesl33info@gmail.com>.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import os
+
+from unittest import mock
+
+from benchmark import fake_providers
+from yamr.cli import main
+from yamr.cli import yamr
+from yamr.helper import decisions
+
+
+def test_store_round_trip(tmp_path):
+    store = decisions.DecisionStore(str(tmp_path / 'decisions.json'))
+    store.remember(decisions.MOVIE, 'Blade.Runner', 1982, 'tt0083658', 'Blade Runner')
+    store.save()
+
+    store = decisions.DecisionStore(str(tmp_path / 'decisions.json'))
+
+    # Titles are normalized, so cosmetic differences in filenames still match
+    assert store.get(decisions.MOVIE, 'blade runner', 1982) == 'tt0083658'
+    assert store.get(decisions.MOVIE, 'Blade Runner') is None
+    assert store.entries() == [{'key': 'movie:blade runner:1982', 'id': 'tt0083658', 'name': 'Blade Runner'}]
+
+    assert store.forget('movie:blade runner:1982')
+    assert not store.forget('movie:blade runner:1982')
+
+
+def test_decisions_skip_search_and_prompt(tmp_path):
+    imdb_backend = fake_providers.FakeIMDb()
+    imdb_backend.add_movie('Alien', 1979)
+    imdb_backend.add_movie('Alien', 1979)
+
+    musicbrainz_backend = fake_providers.FakeMusicBrainz()
+    musicbrainz_backend.add_album('Queen', 'Greatest Hits', [['Bohemian Rhapsody']])
+    musicbrainz_backend.add_album('Queen + Paul Rodgers', 'Greatest Hits', [['Bohemian Rhapsody']])
+
+    config = {'folder': str(tmp_path / 'media'), 'dry_run': False, 'cache': False, 'imdb_backend': imdb_backend,
+              'musicbrainz_backend': musicbrainz_backend, 'decisions': str(tmp_path / 'decisions.json')}
+
+    (tmp_path / 'media').mkdir()
+    (tmp_path / 'media' / 'alien.1979.mkv').touch()
+    (tmp_path / 'media' / 'Queen - Greatest Hits - 01 - Track.mp3').touch()
+
+    with mock.patch('builtins.input', side_effect=['1', '2']):
+        yamr.YAMR(config, {}).rename_media_files()
+
+    assert decisions.DecisionStore(config['decisions']).get(decisions.MOVIE, 'alien', 1979) == '0000002'
+    assert decisions.DecisionStore(config['decisions']).get(decisions.ALBUM, 'queen - greatest hits') == 'release-1'
+
+    imdb_backend.calls.clear()
+    musicbrainz_backend.calls.clear()
+
+    # The second run fetches the same choices by their ids
+    with mock.patch('builtins.input', side_effect=AssertionError):
+        yamr.YAMR(config, {}).rename_media_files()
+
+    assert imdb_backend.calls == {'get_movie': 1}
+    assert musicbrainz_backend.calls == {'get_release': 1}
+
+
+def test_unconfirmed_choices_are_not_remembered(tmp_path):
+    imdb_backend = fake_providers.FakeIMDb()
+    imdb_backend.add_movie('Alien', 1979)
+    imdb_backend.add_show('Doctor Who', 2005, {1: 1})
+
+    (tmp_path / 'media').mkdir()
+    (tmp_path / 'media' / 'alien.1979.mkv').touch()
+    (tmp_path / 'media' / 'Doctor.Who.2005.S01E01.mkv').touch()
+
+    config = {'folder': str(tmp_path / 'media'), 'dry_run': True, 'cache': False, 'imdb_backend': imdb_backend,
+              'decisions': str(tmp_path / 'decisions.json')}
+
+    # Neither a dry run, nor a guess made by --auto, is remembered
+    with mock.patch('builtins.input', side_effect=['1', '1']):
+        yamr.YAMR(config, {}).rename_media_files()
+
+    yamr.YAMR(dict(config, dry_run=False, auto_threshold=0.5), {}).rename_media_files()
+
+    assert not os.path.exists(config['decisions'])
+
+
+def test_only_result_is_not_remembered(tmp_path):
+    imdb_backend = fake_providers.FakeIMDb()
+    imdb_backend.add_movie('Alien', 1979)
+
+    (tmp_path / 'media').mkdir()
+    (tmp_path / 'media' / 'alien.1979.mkv').touch()
+
+    config = {'folder': str(tmp_path / 'media'), 'dry_run': False, 'cache': False, 'imdb_backend': imdb_backend,
+              'decisions': str(tmp_path / 'decisions.json')}
+
+    # The only search result is chosen without asking, so the user never confirmed it
+    with mock.patch('builtins.input', side_effect=AssertionError):
+        yamr.YAMR(config, {}).rename_media_files()
+
+    assert os.listdir(config['folder']) == ['Alien (1979).mkv']
+    assert decisions.DecisionStore(config['decisions']).entries() == []
+
+
+def test_show_decisions_include_the_year(tmp_path):
+    imdb_backend = fake_providers.FakeIMDb()
+    imdb_backend.add_show('Doctor Who', 1963, {1: 1})
+    imdb_backend.add_show('Doctor Who', 2005, {1: 1})
+
+    (tmp_path / 'media').mkdir()
+    (tmp_path / 'media' / 'Doctor.Who.2005.S01E01.mkv').touch()
+
+    config = {'folder': str(tmp_path / 'media'), 'dry_run': False, 'cache': False, 'imdb_backend': imdb_backend,
+              'decisions': str(tmp_path / 'decisions.json')}
+
+    main.run_decisions(['--decisions', config['decisions'], 'set', 'show', 'Doctor Who', '0000002', '--year', '2005'])
+
+    with mock.patch('builtins.input', side_effect=AssertionError):
+        yamr.YAMR(config, {}).rename_media_files()
+
+    assert imdb_backend.calls == {'get_movie': 1, 'update_episodes': 1}
+    assert os.listdir(config['folder']) == ['Doctor Who - S01E01 - Episode 1.mkv']
+
+
+def test_decisions_command(tmp_path, capsys):
+    path = str(tmp_path / 'decisions.json')
+
+    main.run_decisions(['--decisions', path, 'set', 'show', 'Game of Thrones', 'tt0944947'])
+    main.run_decisions(['--decisions', path, 'list'])
+
+    assert capsys.readouterr().out == 'show:game of thrones\ttt0944947\t\n'
+
+    main.run_decisions(['--decisions', path, 'forget', 'show:game of thrones'])
+
+    assert len(decisions.DecisionStore(path)) == 0
+    assert os.path.exists(path)
@@ -22,6 +22,8 @@ import os
 
 from unittest import mock
 
+import imdb
+
 from yamr.cli import yamr
 
 
@@ -51,3 +53,30 @@ def test_multiple_show_detection(tmp_path):
 
     assert 'Game of Thrones - S01E01 - Winter Is Coming.mp4' in files
     assert 'MythBusters - S01E01 - Pilot 1: Jet-Assisted Chevy-Pop Rocks and Soda.mp4' in files
+
+
+def test_episodes_fetched_in_background(tmp_path):
+    (tmp_path / 'Game of Thrones S01E01.mp4').touch()
+    (tmp_path / 'MythBusters - S01E01.mp4').touch()
+
+    config = {'folder': tmp_path, 'dry_run': False, 'cache_dir': tmp_path / 'cache', 'offline': True}
+
+    YAMR = yamr.YAMR(config, {})
+
+    shows = {
+        'game of thrones': ('0944947', 'Game of Thrones', 'Winter Is Coming'),
+        'mythbusters': ('0383126', 'MythBusters', 'Pilot'),
+    }
+
+    for query, (show_id, title, episode_title) in shows.items():
+        show = imdb.Movie.Movie(movieID=show_id, data={'title': title, 'kind': 'tv series', 'year': 2000})
+        YAMR._cache.put('imdb-search', query, [show, show])
+        YAMR._cache.put('imdb-season', show_id + ':1', {1: imdb.Movie.Movie(data={'title': episode_title})})
+
+    with mock.patch('builtins.input', side_effect=['1', '1']):
+        YAMR.rename_media_files()
+
+    files = [os.path.basename(f) for f in tmp_path.iterdir()]
+
+    assert 'Game of Thrones - S01E01 - Winter Is Coming.mp4' in files
+    assert 'MythBusters - S01E01 - Pilot.mp4' in files
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+This file is part of yamr "Yet Another Media Renamer".
+
+Copyright (C) 2019, James Lee <jamesl33info@gmail.com>.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import http.server
+import json
+import os
+import struct
+import threading
+
+from benchmark import fake_providers
+from yamr.cli import yamr
+from yamr.helper import fingerprint
+
+
+def _video(path, first: int = 0, last: int = 0) -> None:
+    block = b'\x00' * (fingerprint.BLOCK_SIZE - 8)
+    path.write_bytes(struct.pack('<Q', first) + block + b'\x00' * 1024 + block + struct.pack('<Q', last))
+
+
+def test_compute(tmp_path):
+    _video(tmp_path / 'movie.mkv', first=1, last=2)
+    (tmp_path / 'small.mkv').write_bytes(b'\x00' * 1024)
+
+    size = fingerprint.BLOCK_SIZE * 2 + 1024
+
+    assert fingerprint.compute(str(tmp_path / 'movie.mkv')) == '{0:016x}'.format(size + 3)
+    assert fingerprint.compute(str(tmp_path / 'small.mkv')) is None
+    assert fingerprint.compute(str(tmp_path / 'missing.mkv')) is None
+
+
+def test_compute_wraps_around(tmp_path):
+    _video(tmp_path / 'movie.mkv', first=0xffffffffffffffff)
+
+    assert fingerprint.compute(str(tmp_path / 'movie.mkv')) == '{0:016x}'.format(fingerprint.BLOCK_SIZE * 2 + 1024 - 1)
+
+
+def test_file_index(tmp_path):
+    (tmp_path / 'index.txt').write_text('# hash imdb_id\n\n00000000000200FF tt0289043\n')
+
+    index = fingerprint.open_index(str(tmp_path / 'index.txt'))
+
+    assert index.lookup('00000000000200ff') == 'tt0289043'
+    assert index.lookup('0000000000000000') is None
+
+
+def test_http_index():
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != '/hashes/00000000000200ff':
+                self.send_error(404)
+                return
+
+            self.send_response(200)
+            self.end_headers()
+            self.wfile.write(json.dumps({'imdb_id': 'tt0289043'}).encode('utf-8'))
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.HTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    try:
+        index = fingerprint.open_index('http://127.0.0.1:{0}/hashes'.format(server.server_port))
+
+        assert index.lookup('00000000000200FF') == 'tt0289043'
+        assert index.lookup('0000000000000000') is None
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_http_index_offline(monkeypatch):
+    def urlopen(*args, **kwargs):
+        raise AssertionError('the index service was queried while offline')
+
+    monkeypatch.setattr(fingerprint.urllib.request, 'urlopen', urlopen)
+    index = fingerprint.open_index('http://127.0.0.1:1/hashes', offline=True)
+
+    assert index.lookup('00000000000200FF') is None
+
+
+def test_rename_fingerprinted_movie(tmp_path):
+    imdb_backend = fake_providers.FakeIMDb()
+    movie_id = imdb_backend.add_movie('28 Days Later', 2002).movieID
+
+    (tmp_path / 'media').mkdir()
+    _video(tmp_path / 'media' / 'abc-xyz.mkv', first=7)
+
+    (tmp_path / 'index.txt').write_text('{0} tt{1}\n'.format(fingerprint.compute(str(tmp_path / 'media' / 'abc-xyz.mkv')),
+                                                              movie_id))
+
+    config = {'folder': str(tmp_path / 'media'), 'dry_run': False, 'cache': False, 'imdb_backend': imdb_backend,
+              'fingerprint_index': str(tmp_path / 'index.txt')}
+
+    # Nothing is searched for, and the user isn't prompted
+    yamr.YAMR(config, {}).rename_media_files()
+
+    assert os.listdir(str(tmp_path / 'media')) == ['28 Days Later (2002).mkv']
+    assert imdb_backend.calls == {'get_movie': 1}
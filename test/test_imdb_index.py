@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+This file is part of yamr "Yet Another Media Renamer".
+
+Copyright (C) 2019, James Lee <jamesl33info@gmail.com>.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import os
+
+from unittest import mock
+
+from yamr.cli import yamr
+from yamr.helper import imdb_index
+
+
+TITLE_BASICS = '''tconst\ttitleType\tprimaryTitle\toriginalTitle\tisAdult\tstartYear\tendYear\truntimeMinutes\tgenres
+tt0289043\tmovie\t28 Days Later...\t28 Days Later...\t0\t2002\t\\N\t113\tDrama,Horror,Sci-Fi
+tt0463854\tmovie\t28 Weeks Later\t28 Weeks Later\t0\t2007\t\\N\t100\tHorror,Sci-Fi
+tt0944947\ttvSeries\tGame of Thrones\tGame of Thrones\t0\t2011\t2019\t57\tAction,Adventure,Drama
+tt1480055\ttvEpisode\tWinter Is Coming\tWinter Is Coming\t0\t2011\t\\N\t62\tAction,Adventure,Drama
+tt1668746\ttvEpisode\tThe Kingsroad\tThe Kingsroad\t0\t2011\t\\N\t56\tAction,Adventure,Drama
+'''
+
+TITLE_EPISODE = '''tconst\tparentTconst\tseasonNumber\tepisodeNumber
+tt1480055\ttt0944947\t1\t1
+tt1668746\ttt0944947\t1\t2
+'''
+
+
+def _build_index(tmp_path):
+    (tmp_path / 'title.basics.tsv').write_text(TITLE_BASICS)
+    (tmp_path / 'title.episode.tsv').write_text(TITLE_EPISODE)
+
+    return imdb_index.IMDbIndex.build(str(tmp_path / 'imdb.sqlite3'), str(tmp_path))
+
+
+def test_search_movie(tmp_path):
+    index = _build_index(tmp_path)
+
+    results = index.search_movie('28 Days Later', 2002)
+
+    assert results[0].movieID == '0289043'
+    assert results[0]['title'] == '28 Days Later...'
+    assert results[0]['kind'] == 'movie'
+    assert results[0]['year'] == 2002
+
+    # Episodes aren't searchable, only their shows are
+    assert [r['title'] for r in index.search_movie('Winter Is Coming')] == []
+
+
+def test_update_episodes(tmp_path):
+    index = _build_index(tmp_path)
+
+    show = index.search_movie('Game of Thrones')[0]
+    index.update_episodes(show)
+
+    assert show['episodes'][1][1]['title'] == 'Winter Is Coming'
+    assert show['episodes'][1][2]['title'] == 'The Kingsroad'
+
+
+def test_update_episodes_for_seasons(tmp_path):
+    index = _build_index(tmp_path)
+
+    show = index.search_movie('Game of Thrones')[0]
+    show['episodes'] = {2: {1: 'The North Remembers'}}
+    index.update_episodes(show, [1, 3])
+
+    # Previously fetched seasons are kept, requested seasons without any episodes are empty
+    assert show['episodes'][1][1]['title'] == 'Winter Is Coming'
+    assert show['episodes'][2] == {1: 'The North Remembers'}
+    assert show['episodes'][3] == {}
+
+
+def test_rename_episode_with_index(tmp_path):
+    _build_index(tmp_path).close()
+
+    (tmp_path / 'media').mkdir()
+    (tmp_path / 'media' / 'Game of Thrones S01E02.mp4').touch()
+
+    config = {'folder': tmp_path / 'media', 'dry_run': False, 'cache': False,
+              'imdb_index': str(tmp_path / 'imdb.sqlite3')}
+
+    with mock.patch('imdb.IMDb') as ia:
+        yamr.YAMR(config, {}).rename_media_files()
+
+    ia.assert_not_called()
+
+    files = [os.path.basename(f) for f in (tmp_path / 'media').iterdir()]
+
+    assert 'Game of Thrones - S01E02 - The Kingsroad.mp4' in files
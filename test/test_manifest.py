@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+This file is part of yamr "Yet Another Media Renamer".
+
+Copyright (C) 2019, James Lee <jamesl33info@gmail.com>.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import os
+
+from unittest import mock
+
+import imdb
+
+from yamr.cli import yamr
+from yamr.helper import manifest
+
+
+def test_manifest_round_trip(tmp_path):
+    path = tmp_path / 'Game of Thrones - S01E01 - Winter Is Coming.mp4'
+    path.touch()
+
+    state = manifest.Manifest(manifest.Manifest.location(str(tmp_path)))
+    state.record(str(path))
+    state.save()
+
+    state = manifest.Manifest(manifest.Manifest.location(str(tmp_path)))
+
+    assert state.is_settled(str(path))
+
+    os.utime(str(path), ns=(0, 0))
+
+    assert not state.is_settled(str(path))
+
+
+def test_incremental_skips_settled_files(tmp_path):
+    (tmp_path / '28.Days.Later.2002.1080p.mkv').touch()
+
+    config = {'folder': tmp_path, 'dry_run': False, 'cache_dir': tmp_path / 'cache', 'offline': True,
+              'incremental': True, 'state_dir': tmp_path / 'state'}
+
+    YAMR = yamr.YAMR(config, {})
+
+    results = [imdb.Movie.Movie(movieID='0289043', data={'title': '28 Days Later...', 'kind': 'movie', 'year': 2002})]
+    YAMR._cache.put('imdb-search', '28 Days Later 2002', results)
+
+    YAMR.rename_media_files()
+
+    assert '28 Days Later... (2002).mkv' in [os.path.basename(f) for f in tmp_path.iterdir()]
+
+    with mock.patch('yamr.helper.parser.parse_stream', return_value=iter([])) as parse_stream:
+        YAMR.rename_media_files()
+
+    assert list(parse_stream.call_args[0][0]) == []
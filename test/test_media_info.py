@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+This file is part of yamr "Yet Another Media Renamer".
+
+Copyright (C) 2019, James Lee <jamesl33info@gmail.com>.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import pytest
+
+from yamr.helper import media_info
+
+
+def test_only_used_fields_are_kept():
+    info = media_info.MediaInfo({'title': 'Game of Thrones', 'season': 1, 'episode': [1, 2], 'type': 'episode',
+                                 'screen_size': '720p', 'container': 'mkv'})
+
+    assert dict(info.items()) == {'title': 'Game of Thrones', 'season': 1, 'episode': (1, 2), 'type': 'episode'}
+    assert 'screen_size' not in info and 'year' not in info
+    assert info.get('year', 2011) == 2011
+
+    with pytest.raises(KeyError):
+        info['year']
+
+    with pytest.raises(AttributeError):
+        info.__dict__
+
+
+def test_titles_are_interned():
+    first = media_info.MediaInfo({'title': ''.join(['Game of ', 'Thrones'])})
+    second = media_info.MediaInfo({'title': ''.join(['Game of Thr', 'ones'])})
+
+    assert first['title'] is second['title']
+
+
+def test_overrides_and_deletion():
+    info = media_info.MediaInfo({'title': 'Blade Runner'})
+    info['year'] = 1982
+    info['unused'] = True
+
+    assert info == media_info.MediaInfo({'title': 'Blade Runner', 'year': 1982})
+
+    del info['year']
+
+    assert list(info) == ['title']
@@ -22,6 +22,7 @@ import os
 
 from unittest import mock
 
+from benchmark import fake_providers
 from yamr.cli import yamr
 
 
@@ -51,3 +52,54 @@ def test_multiple_movie_detection(tmp_path):
 
     assert '28 Days Later... (2002).mkv' in files
     assert '28 Weeks Later (2007).mkv' in files
+
+
+def test_subtitles_renamed_with_movie(tmp_path):
+    imdb_backend = fake_providers.FakeIMDb()
+    imdb_backend.add_movie('Alien', 1979)
+
+    for name in ['alien.1979.720p.mkv', 'alien.1979.720p.en.srt', 'alien.1979.720p.fr.srt']:
+        (tmp_path / name).touch()
+
+    config = {'folder': str(tmp_path), 'dry_run': False, 'cache': False, 'auto_threshold': 0.5,
+              'imdb_backend': imdb_backend}
+
+    yamr.YAMR(config, {}).rename_media_files()
+
+    assert sorted(os.listdir(str(tmp_path))) == ['Alien (1979).en.srt', 'Alien (1979).fr.srt', 'Alien (1979).mkv']
+    assert imdb_backend.calls['search_movie'] == 1
+
+
+def test_movie_parts_searched_once(tmp_path):
+    imdb_backend = fake_providers.FakeIMDb()
+    imdb_backend.add_movie('Alien', 1979)
+
+    for name in ['Alien.1979.CD1.avi', 'alien.1979.cd2.avi', 'Alien (1979) - cd3.avi']:
+        (tmp_path / name).touch()
+
+    config = {'folder': str(tmp_path), 'dry_run': False, 'cache': False, 'imdb_backend': imdb_backend}
+
+    # Every part is renamed after a single prompt
+    with mock.patch('builtins.input', side_effect=['1']):
+        yamr.YAMR(config, {}).rename_media_files()
+
+    assert sorted(os.listdir(str(tmp_path))) == ['Alien (1979) - cd1.avi', 'Alien (1979) - cd2.avi',
+                                                 'Alien (1979) - cd3.avi']
+    assert imdb_backend.calls['search_movie'] == 1
+
+
+def test_skipped_movie_prompted_once(tmp_path):
+    imdb_backend = fake_providers.FakeIMDb()
+    imdb_backend.add_movie('Alien', 1979)
+    imdb_backend.add_movie('Alien', 1979)
+
+    (tmp_path / 'alien.1979.mkv').touch()
+
+    config = {'folder': str(tmp_path), 'dry_run': False, 'cache': False, 'imdb_backend': imdb_backend}
+
+    with mock.patch('builtins.input', side_effect=['s']) as prompt:
+        yamr.YAMR(config, {}).rename_media_files()
+
+    assert prompt.call_count == 1
+    assert imdb_backend.calls['search_movie'] == 1
+    assert os.listdir(str(tmp_path)) == ['alien.1979.mkv']
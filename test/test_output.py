@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+This file is part of yamr "Yet Another Media Renamer".
+
+Copyright (C) 2019, James Lee <jamesl33info@gmail.com>.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import io
+import json
+
+from yamr.helper import output
+
+
+def test_jsonl_output_is_buffered():
+    stream = io.StringIO()
+    renderer = output.JSONLRenderer(stream)
+
+    renderer.event('a.mkv', 'b.mkv', output.RENAME)
+    renderer.unmatched(['c.mp3', 'd.mp3'], 'album skipped or not found', 'Album "e" skipped or not found')
+    renderer.message('Discovered 1 Albums')
+
+    assert stream.getvalue() == ''
+
+    renderer.finish()
+
+    assert [json.loads(line) for line in stream.getvalue().splitlines()] == [
+        {'source': 'a.mkv', 'target': 'b.mkv', 'status': 'rename', 'reason': None},
+        {'source': 'c.mp3', 'target': None, 'status': 'unmatched', 'reason': 'album skipped or not found'},
+        {'source': 'd.mp3', 'target': None, 'status': 'unmatched', 'reason': 'album skipped or not found'},
+    ]
+
+
+def test_quiet_output_summarises():
+    stream = io.StringIO()
+    renderer = output.QuietRenderer(stream)
+
+    renderer.event('a.mkv', 'b.mkv', output.RENAME)
+    renderer.event('c.mkv', 'c.mkv', output.UNCHANGED)
+    renderer.event('d.mkv', 'c.mkv', output.EXISTS, 'already exists')
+    renderer.message('Discovered 0 Albums')
+    renderer.finish()
+
+    assert stream.getvalue() == '1 exists, 1 rename, 1 unchanged\n'
+
+
+def test_human_output_writes_messages_immediately():
+    stream = io.StringIO()
+    renderer = output.HumanRenderer(stream)
+
+    renderer.event('media/a.mkv', 'media/b.mkv', output.RENAME)
+    renderer.message('Discovered 0 Albums')
+
+    assert 'a.mkv' in stream.getvalue() and stream.getvalue().endswith('Discovered 0 Albums\n')
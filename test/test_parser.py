@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+This file is part of yamr "Yet Another Media Renamer".
+
+Copyright (C) 2019, James Lee <jamesl33info@gmail.com>.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import guessit
+import pytest
+
+from yamr.helper import parser
+from yamr.helper import stats
+
+
+def test_parse_all_preserves_order():
+    filenames = [
+        'Game of Thrones S01E01.mp4',
+        '28.Days.Later.2002.1080p.mkv',
+        '01 Whenever You Need Somebody.mp3',
+    ]
+
+    serial = parser.parse_all(filenames)
+    parallel = parser.parse_all(filenames, jobs=2)
+
+    assert serial == parallel
+    assert [info['title'] for info in parallel] == ['Game of Thrones', '28 Days Later', 'Whenever You Need Somebody']
+
+
+def test_parse_stream_batches():
+    filenames = ['Game of Thrones S01E{0:02d}.mp4'.format(e) for e in range(1, 8)]
+
+    parsed = list(parser.parse_stream(iter(filenames), lambda f: f, jobs=2, batch_size=3))
+
+    assert [f for f, _ in parsed] == filenames
+    assert [info['episode'] for _, info in parsed] == list(range(1, 8))
+
+
+@pytest.mark.parametrize('filename', [
+    'Game of Thrones - S01E02 - The Kingsroad.mkv',
+    'Game of Thrones - S01E01 - S01E02 - Winter Is Coming.mp4',
+    'Doctor Who (2005) - S01E01 - Rose.mkv',
+    'Doctor Who (2005) - S01E01 - S01E02 - Rose.en.srt',
+    'Battlestar Galactica (2004) - S02E10 - Pegasus.mkv',
+    'Blade Runner 2049 (2017).mkv',
+    'Alien (1979) - cd2.avi',
+    'Rick Astley - Whenever You Need Somebody - 01 - Never Gonna Give You Up.mp3',
+])
+def test_fast_path_matches_guessit(filename):
+    info = parser.match(filename)
+    guessed = dict(guessit.guessit(filename))
+
+    assert info == {key: guessed[key] for key in info}
+
+
+@pytest.mark.parametrize('filename', [
+    'The Office (US) - S01E01 - Pilot.mkv',
+    'Shameless (UK) - S01E01 - Episode 1.mkv',
+    'Game of Thrones - S01E01 - Winter Is Coming (1).mkv',
+    'Blade Runner (Final Cut) (1982).mkv',
+    'Queen - Greatest Hits - 01 - Bohemian Rhapsody (Live).mp3',
+])
+def test_fast_path_leaves_parentheses_to_guessit(filename):
+    assert parser.match(filename) is None
+
+
+def test_fast_path_matches_disc_number():
+    info = parser.match('Queen - Greatest Hits - 2-01 - A Kind of Magic.flac')
+
+    assert (info['disc'], info['episode'], info['episode_title']) == (2, 1, 'A Kind of Magic')
+
+
+def test_fast_path_falls_back_to_guessit():
+    parser.use_cache(None)
+    stats.reset()
+
+    infos = parser.parse_all(['Game of Thrones - S01E02 - The Kingsroad.en.srt', 'Game.of.Thrones.S01E03.720p.mkv'])
+
+    assert parser.match('Game.of.Thrones.S01E03.720p.mkv') is None
+    assert [(info['title'], info['episode']) for info in infos] == [('Game of Thrones', 2), ('Game of Thrones', 3)]
+    assert stats.summary()['fast_path_hit_rate'] == 0.5
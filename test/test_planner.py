@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+This file is part of yamr "Yet Another Media Renamer".
+
+Copyright (C) 2019, James Lee <jamesl33info@gmail.com>.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import json
+import os
+
+from unittest import mock
+
+from yamr.core import movie
+from yamr.helper import planner
+
+
+def _movie(tmp_path, filename, target):
+    (tmp_path / filename).touch()
+
+    mo = movie.Movie(str(tmp_path / filename), {'title': filename, 'type': 'movie'})
+    mo._rename(target, dry_run=False)
+
+    return mo
+
+
+def test_detects_collisions(tmp_path):
+    (tmp_path / 'Existing (2000).mkv').touch()
+
+    plan = planner.Planner()
+    plan.add([
+        _movie(tmp_path, 'a.mkv', 'Movie (2000).mkv'),
+        _movie(tmp_path, 'b.mkv', 'Movie (2000).mkv'),
+        _movie(tmp_path, 'c.mkv', 'Existing (2000).mkv'),
+        _movie(tmp_path, 'd.mkv', 'Other (2000).mkv'),
+        _movie(tmp_path, 'Correct (2000).mkv', 'Correct (2000).mkv'),
+    ])
+
+    plan.execute(str(tmp_path / 'journal.jsonl'), dry_run=False)
+
+    files = sorted(os.path.basename(f) for f in tmp_path.iterdir())
+
+    assert files == ['Correct (2000).mkv', 'Existing (2000).mkv', 'Other (2000).mkv', 'a.mkv', 'b.mkv', 'c.mkv']
+    assert not (tmp_path / 'journal.jsonl').exists()
+
+
+def test_orders_chained_renames(tmp_path):
+    first = _movie(tmp_path, 'a.mkv', 'b.mkv')
+    second = _movie(tmp_path, 'b.mkv', 'c.mkv')
+    (tmp_path / 'b.mkv').write_text('b')
+
+    plan = planner.Planner()
+    plan.add([first, second])
+    plan.execute(str(tmp_path / 'journal.jsonl'), dry_run=False)
+
+    assert (tmp_path / 'c.mkv').read_text() == 'b'
+    assert first.settled and second.settled
+
+
+def test_rejected_rename_blocks_chain(tmp_path):
+    first = _movie(tmp_path, 'a.mkv', 'b.mkv')
+    second = _movie(tmp_path, 'b.mkv', 'c.mkv')
+
+    for name in ['a', 'b', 'c']:
+        (tmp_path / '{0}.mkv'.format(name)).write_text(name)
+
+    plan = planner.Planner()
+    plan.add([first, second])
+    plan.execute(str(tmp_path / 'journal.jsonl'), dry_run=False)
+
+    assert [r.status for r in plan] == [planner.EXISTS, planner.EXISTS]
+    assert {f.name: f.read_text() for f in tmp_path.iterdir()} == {'a.mkv': 'a', 'b.mkv': 'b', 'c.mkv': 'c'}
+
+
+def test_sidecars_follow_their_media_file(tmp_path):
+    (tmp_path / 'Alien (1979).mkv').touch()
+    (tmp_path / 'alien.1979.720p.en.srt').touch()
+    (tmp_path / 'blade.runner.en.srt').touch()
+
+    blocked = _movie(tmp_path, 'alien.1979.720p.mkv', 'Alien (1979).mkv')
+    blocked.attach([str(tmp_path / 'alien.1979.720p.en.srt')])
+
+    renamed = _movie(tmp_path, 'blade.runner.mkv', 'Blade Runner (1982).mkv')
+    renamed.attach([str(tmp_path / 'blade.runner.en.srt')])
+
+    plan = planner.Planner()
+    plan.add([blocked, renamed])
+    plan.execute(str(tmp_path / 'journal.jsonl'), dry_run=False)
+
+    assert [r.status for r in plan] == [planner.EXISTS, planner.EXISTS, planner.RENAME, planner.RENAME]
+    assert sorted(os.path.basename(f) for f in tmp_path.iterdir()) == [
+        'Alien (1979).mkv', 'Blade Runner (1982).en.srt', 'Blade Runner (1982).mkv', 'alien.1979.720p.en.srt',
+        'alien.1979.720p.mkv']
+
+
+def test_rollback_only_undoes_performed_renames(tmp_path):
+    (tmp_path / 'A.mkv').touch()
+    (tmp_path / 'C.mkv').touch()
+
+    # 'c.mkv' was never renamed, 'C.mkv' was created by something else since
+    with open(str(tmp_path / 'journal.jsonl'), 'w') as journal:
+        for index, name in enumerate(['a', 'b', 'c']):
+            journal.write(json.dumps({'id': index, 'source': str(tmp_path / (name + '.mkv')),
+                                      'target': str(tmp_path / (name.upper() + '.mkv'))}) + '\n')
+
+        journal.write(json.dumps({'done': 0}) + '\n')
+
+    planner.rollback(str(tmp_path / 'journal.jsonl'))
+
+    assert sorted(os.path.basename(f) for f in tmp_path.iterdir()) == ['C.mkv', 'a.mkv']
+
+
+def test_resume_and_rollback(tmp_path):
+    first = _movie(tmp_path, 'a.mkv', 'A (2000).mkv')
+    second = _movie(tmp_path, 'b.mkv', 'B (2000).mkv')
+
+    plan = planner.Planner()
+    plan.add([first, second])
+
+    renames = []
+
+    def _interrupt_second_rename(source, target):
+        if renames:
+            raise KeyboardInterrupt
+
+        renames.append(source)
+        os.replace(source, target)
+
+    with mock.patch('os.rename', side_effect=_interrupt_second_rename):
+        try:
+            plan.execute(str(tmp_path / 'journal.jsonl'), dry_run=False)
+        except KeyboardInterrupt:
+            pass
+
+    with open(str(tmp_path / 'journal.jsonl')) as journal:
+        assert [json.loads(line) for line in journal][-1] == {'done': 0}
+
+    planner.rollback(str(tmp_path / 'journal.jsonl'))
+
+    assert sorted(os.path.basename(f) for f in tmp_path.iterdir()) == ['a.mkv', 'b.mkv']
+
+    renames.clear()
+
+    plan = planner.Planner()
+    plan.add([_movie(tmp_path, 'a.mkv', 'A (2000).mkv'), _movie(tmp_path, 'b.mkv', 'B (2000).mkv')])
+
+    with mock.patch('os.rename', side_effect=_interrupt_second_rename):
+        try:
+            plan.execute(str(tmp_path / 'journal.jsonl'), dry_run=False)
+        except KeyboardInterrupt:
+            pass
+
+    planner.resume(str(tmp_path / 'journal.jsonl'))
+
+    assert sorted(os.path.basename(f) for f in tmp_path.iterdir()) == ['A (2000).mkv', 'B (2000).mkv']
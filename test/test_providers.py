@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+This file is part of yamr "Yet Another Media Renamer".
+
+Copyright (C) 2019, James Lee <jamesl33info@gmail.com>.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import argparse
+import os
+
+from unittest import mock
+
+import imdb
+import pytest
+
+from yamr.cli import main
+from yamr.cli import yamr
+from yamr.helper import cache
+from yamr.helper import providers
+
+
+def test_search_is_cached(tmp_path):
+    providers.configure(cache.Cache(str(tmp_path / 'cache.sqlite3')))
+
+    results = [imdb.Movie.Movie(movieID='0289043', data={'title': '28 Days Later...', 'kind': 'movie', 'year': 2002})]
+
+    with mock.patch('imdb.IMDb') as ia:
+        ia.return_value.search_movie.return_value = results
+
+        assert providers.search_movie('28 Days Later', 2002)[0]['title'] == '28 Days Later...'
+        assert providers.search_movie('28 Days Later', 2002)[0]['title'] == '28 Days Later...'
+
+    ia.return_value.search_movie.assert_called_once_with('28 Days Later 2002')
+
+
+def test_expired_search_is_refetched(tmp_path):
+    providers.configure(cache.Cache(str(tmp_path / 'cache.sqlite3')), ttls={'search': -1})
+
+    with mock.patch('imdb.IMDb') as ia:
+        ia.return_value.search_movie.return_value = []
+
+        providers.search_movie('28 Days Later')
+        providers.search_movie('28 Days Later')
+
+    assert ia.return_value.search_movie.call_count == 2
+
+
+def test_offline_rename_from_cache(tmp_path):
+    (tmp_path / '28.Days.Later.2002.1080p.mkv').touch()
+
+    config = {'folder': tmp_path, 'dry_run': False, 'cache_dir': tmp_path / 'cache', 'offline': True}
+
+    YAMR = yamr.YAMR(config, {})
+
+    results = [imdb.Movie.Movie(movieID='0289043', data={'title': '28 Days Later...', 'kind': 'movie', 'year': 2002})]
+    YAMR._cache.put('imdb-search', '28 Days Later 2002', results)
+
+    with mock.patch('imdb.IMDb') as ia:
+        YAMR.rename_media_files()
+
+    ia.assert_not_called()
+
+    files = [os.path.basename(f) for f in tmp_path.iterdir()]
+
+    assert '28 Days Later... (2002).mkv' in files
+
+
+def test_prefetched_search_is_reused():
+    providers.configure(prefetch_workers=2)
+
+    with mock.patch('imdb.IMDb') as ia:
+        ia.return_value.search_movie.return_value = []
+
+        providers.prefetch(providers.search_movie, 'Game of Thrones')
+        providers.prefetch(providers.search_movie, 'Game of Thrones')
+
+        assert providers.search_movie('Game of Thrones') == []
+
+    ia.return_value.search_movie.assert_called_once_with('Game of Thrones')
+
+
+def test_cache_ttl_overrides_are_validated():
+    assert main._cache_ttl('search=3600') == ('search', 3600.0)
+
+    for value in ['search', 'search=abc', 'unknown=60']:
+        with pytest.raises(argparse.ArgumentTypeError):
+            main._cache_ttl(value)
+
+
+def test_prefetch_workers_are_validated():
+    assert main._non_negative_int('0') == 0
+
+    for value in ['-1', 'many']:
+        with pytest.raises(argparse.ArgumentTypeError):
+            main._non_negative_int(value)
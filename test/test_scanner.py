@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+This file is part of yamr "Yet Another Media Renamer".
+
+Copyright (C) 2019, James Lee <jamesl33info@gmail.com>.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import os
+
+from unittest import mock
+
+from benchmark import fake_providers
+from yamr.cli import yamr
+from yamr.helper import planner
+from yamr.helper import scanner
+
+
+def test_scan_classifies_media_files(tmp_path):
+    (tmp_path / 'Season 1').mkdir()
+    (tmp_path / 'Season 1' / 'Game of Thrones S01E01.mp4').touch()
+    (tmp_path / 'Season 1' / 'Game of Thrones S01E01.en.srt').touch()
+    (tmp_path / '01 Whenever You Need Somebody.mp3').touch()
+    (tmp_path / 'cover.jpg').touch()
+
+    files = sorted(scanner.scan(tmp_path))
+
+    assert [(f.name, f.kind) for f in files] == [
+        ('01 Whenever You Need Somebody.mp3', scanner.AUDIO),
+        ('Game of Thrones S01E01.mp4', scanner.VIDEO),
+    ]
+
+    assert files[1].sidecars == (str(tmp_path / 'Season 1' / 'Game of Thrones S01E01.en.srt'),)
+
+
+def test_pair_by_stem_and_directory(tmp_path):
+    (tmp_path / 'Other').mkdir()
+
+    for name in ['Alien.mkv', 'Alien.en.srt', 'Alien.forced.en.srt', 'Alien 3.mkv', 'Alien 3.srt', 'Aliens.srt',
+                 'Other/Alien.srt']:
+        (tmp_path / name).touch()
+
+    files = {f.name: f for f in scanner.scan(tmp_path)}
+
+    assert sorted(files) == ['Alien 3.mkv', 'Alien.mkv', 'Alien.srt', 'Aliens.srt']
+    assert sorted(files['Alien.mkv'].sidecars) == [str(tmp_path / 'Alien.en.srt'), str(tmp_path / 'Alien.forced.en.srt')]
+    assert files['Alien 3.mkv'].sidecars == (str(tmp_path / 'Alien 3.srt'),)
+    assert files['Aliens.srt'].sidecars == ()
+
+
+def test_group_by_device(tmp_path):
+    (tmp_path / 'a').mkdir()
+    (tmp_path / 'b').mkdir()
+
+    devices = scanner.group_by_device([tmp_path / 'a', tmp_path / 'missing', tmp_path / 'b'])
+
+    assert list(devices.values()) == [[str(tmp_path / 'a'), str(tmp_path / 'b')], [str(tmp_path / 'missing')]]
+
+
+def test_distinct_roots(tmp_path):
+    (tmp_path / 'lib' / 'Shows').mkdir(parents=True)
+    (tmp_path / 'other').mkdir()
+
+    roots = [tmp_path / 'lib' / 'Shows', tmp_path / 'lib', tmp_path / 'other', str(tmp_path / 'lib') + os.sep]
+
+    assert scanner.distinct_roots(roots) == [str(tmp_path / 'lib'), str(tmp_path / 'other')]
+
+
+def test_scan_roots_scans_each_device(tmp_path):
+    for root in ['a', 'b']:
+        (tmp_path / root).mkdir()
+        (tmp_path / root / 'Game of Thrones S01E01.mkv').touch()
+
+    # Pretend each root is on a separate device, so they're scanned concurrently
+    devices = {1: [str(tmp_path / 'a')], 2: [str(tmp_path / 'b')]}
+
+    with mock.patch.object(scanner, 'group_by_device', return_value=devices):
+        files = sorted(scanner.scan_roots([tmp_path / 'a', tmp_path / 'b']))
+
+    assert [f.path for f in files] == [str(tmp_path / 'a' / 'Game of Thrones S01E01.mkv'),
+                                       str(tmp_path / 'b' / 'Game of Thrones S01E01.mkv')]
+
+
+def test_shows_are_grouped_across_folders(tmp_path):
+    imdb_backend = fake_providers.FakeIMDb()
+    imdb_backend.add_show('Game of Thrones', 2011, {1: 10})
+
+    for root, number in [('a', 1), ('b', 2)]:
+        (tmp_path / root).mkdir()
+        (tmp_path / root / 'Game of Thrones S01E0{0}.mkv'.format(number)).touch()
+
+    config = {'folders': [str(tmp_path / 'a'), str(tmp_path / 'b')], 'dry_run': False, 'cache': False,
+              'auto_threshold': 0.85, 'imdb_backend': imdb_backend}
+
+    yamr.YAMR(config, {}).rename_media_files()
+
+    assert (tmp_path / 'a' / 'Game of Thrones - S01E01 - Episode 1.mkv').exists()
+    assert (tmp_path / 'b' / 'Game of Thrones - S01E02 - Episode 2.mkv').exists()
+
+    # Each folder has its own journal, which is removed once its renames are complete
+    assert not os.path.exists(planner.journal_location(str(tmp_path / 'a')))
+    assert not os.path.exists(planner.journal_location(str(tmp_path / 'b')))
+
+    assert imdb_backend.calls['search_movie'] == 1
+
+
+def test_nested_folders_are_renamed_once(tmp_path):
+    imdb_backend = fake_providers.FakeIMDb()
+    imdb_backend.add_show('Game of Thrones', 2011, {1: 10})
+
+    (tmp_path / 'Shows').mkdir()
+    (tmp_path / 'Shows' / 'Game of Thrones S01E01.mkv').touch()
+
+    config = {'folders': [str(tmp_path), str(tmp_path / 'Shows')], 'dry_run': False, 'cache': False,
+              'auto_threshold': 0.85, 'imdb_backend': imdb_backend}
+
+    yamr.YAMR(config, {}).rename_media_files()
+
+    assert os.listdir(str(tmp_path / 'Shows')) == ['Game of Thrones - S01E01 - Episode 1.mkv']
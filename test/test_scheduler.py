@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+This file is part of yamr "Yet Another Media Renamer".
+
+Copyright (C) 2019, James Lee <jamesl33info@gmail.com>.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import threading
+import time
+
+import pytest
+
+from yamr.helper import scheduler
+
+
+def test_requests_are_rate_limited():
+    started = []
+
+    requests = scheduler.Scheduler(rate=20.0)
+
+    results = [requests.submit(index, lambda i: started.append(time.monotonic()) or i, index) for index in range(5)]
+
+    assert [r.result() for r in results] == list(range(5))
+
+    # Four gaps of 1/20th of a second between the five requests
+    assert started[-1] - started[0] >= 0.15
+
+    requests.shutdown()
+
+
+def test_duplicate_requests_are_coalesced():
+    calls = []
+    release = threading.Event()
+
+    def _request(release_id):
+        calls.append(release_id)
+        release.wait(1)
+        return release_id
+
+    requests = scheduler.Scheduler(rate=100.0)
+
+    first = requests.submit(('release', 'abc'), _request, 'abc')
+    second = requests.submit(('release', 'abc'), _request, 'abc')
+
+    release.set()
+
+    assert first is second
+    assert first.result() == 'abc'
+    assert calls == ['abc']
+
+    requests.shutdown()
+
+
+def test_rate_must_be_positive():
+    for rate in [0, -1]:
+        with pytest.raises(ValueError):
+            scheduler.Scheduler(rate)
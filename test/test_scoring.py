@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+This file is part of yamr "Yet Another Media Renamer".
+
+Copyright (C) 2019, James Lee <jamesl33info@gmail.com>.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import json
+import os
+
+import imdb
+
+from yamr.cli import yamr
+from yamr.helper import scoring
+from yamr.helper import user_input
+
+
+def test_normalize():
+    assert scoring.normalize('The Lord of the Rings: The Two Towers') == 'lord of the rings the two towers'
+    assert scoring.normalize('Amélie') == 'amelie'
+    assert scoring.normalize('Law & Order') == 'law and order'
+
+
+def test_score_movie_prefers_matching_year():
+    original = {'title': 'The Italian Job', 'kind': 'movie', 'year': 1969}
+    remake = {'title': 'The Italian Job', 'kind': 'movie', 'year': 2003}
+
+    assert scoring.score_movie(remake, 'The Italian Job', 2003) == 1.0
+    assert scoring.score_movie(original, 'The Italian Job', 2003) < scoring.DEFAULT_THRESHOLD
+
+
+def test_score_show_prefers_matching_year():
+    original = {'title': 'Doctor Who', 'kind': 'tv series', 'year': 1963}
+    revival = {'title': 'Doctor Who', 'kind': 'tv series', 'year': 2005}
+
+    assert scoring.score_show(original, 'Doctor Who') == scoring.score_show(revival, 'Doctor Who')
+    assert scoring.score_show(revival, 'Doctor Who', 2005) == 1.0
+    assert scoring.score_show(original, 'Doctor Who', 2005) < scoring.DEFAULT_THRESHOLD
+
+
+def test_auto_choice_defers_ambiguous_matches():
+    user_input.configure(scoring.DEFAULT_THRESHOLD)
+
+    try:
+        shows = [{'title': 'The Office', 'year': 2001}, {'title': 'The Office', 'year': 2005}]
+
+        assert user_input.auto_choice(shows, lambda i, c: None, lambda c: 1.0) is None
+        assert user_input.auto_choice(shows, lambda i, c: None, lambda c: c['year'] - 2004) is shows[1]
+    finally:
+        user_input.configure()
+
+
+def test_score_album_uses_track_count():
+    full = {'title': 'Whenever You Need Somebody', 'medium-list': [{'track-count': '10'}]}
+    single = {'title': 'Whenever You Need Somebody', 'medium-list': [{'track-count': '2'}]}
+
+    assert scoring.score_album(full, 'Whenever You Need Somebody', 10) == 1.0
+    assert scoring.score_album(single, 'Whenever You Need Somebody', 10) < scoring.score_album(full, 'Whenever You Need Somebody', 10)
+
+
+def test_auto_match_defers_low_confidence(tmp_path):
+    (tmp_path / '28.Days.Later.2002.1080p.mkv').touch()
+    (tmp_path / 'The.Italian.Job.2003.mkv').touch()
+
+    config = {'folder': tmp_path, 'dry_run': False, 'cache_dir': tmp_path / 'cache', 'offline': True,
+              'auto_threshold': scoring.DEFAULT_THRESHOLD, 'review_queue': str(tmp_path / 'review.jsonl')}
+
+    YAMR = yamr.YAMR(config, {})
+
+    YAMR._cache.put('imdb-search', '28 Days Later 2002', [
+        imdb.Movie.Movie(movieID='0289043', data={'title': '28 Days Later...', 'kind': 'movie', 'year': 2002}),
+        imdb.Movie.Movie(movieID='0463854', data={'title': '28 Weeks Later', 'kind': 'movie', 'year': 2007}),
+    ])
+
+    YAMR._cache.put('imdb-search', 'The Italian Job 2003', [
+        imdb.Movie.Movie(movieID='0064505', data={'title': 'The Italian Job', 'kind': 'movie', 'year': 1969}),
+    ])
+
+    YAMR.rename_media_files()
+
+    files = [os.path.basename(f) for f in tmp_path.iterdir()]
+
+    assert '28 Days Later... (2002).mkv' in files
+    assert 'The.Italian.Job.2003.mkv' in files
+
+    with open(str(tmp_path / 'review.jsonl')) as review_file:
+        review = [json.loads(line) for line in review_file]
+
+    assert review[0]['query']['title'] == 'The Italian Job'
+    assert review[0]['candidates'][0]['id'] == '0064505'
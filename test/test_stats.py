@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+This file is part of yamr "Yet Another Media Renamer".
+
+Copyright (C) 2019, James Lee <jamesl33info@gmail.com>.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import json
+
+from yamr.helper import cache
+from yamr.helper import stats
+
+
+def test_timings_and_counters_are_summarised():
+    stats.reset()
+
+    with stats.timer('phase.lookup'):
+        stats.increment('files', 3)
+
+    for _ in range(2):
+        with stats.timer('request.imdb-search'):
+            pass
+
+    summary = stats.summary()
+
+    assert list(summary['phases']) == ['lookup']
+    assert summary['latencies']['request.imdb-search']['count'] == 2
+    assert summary['counters'] == {'files': 3}
+    assert summary['files_per_second'] is None
+
+
+def test_latencies_are_running_totals():
+    stats.reset()
+
+    for seconds in [0.5, 2.0, 1.0]:
+        stats.record('tags.read', seconds)
+
+    assert stats.summary()['latencies']['tags.read'] == {'count': 3, 'total': 3.5, 'mean': 3.5 / 3, 'max': 2.0}
+    assert stats._timings['tags.read'] == [3, 3.5, 2.0]
+
+
+def test_timed_iter_excludes_consumer_time():
+    stats.reset()
+
+    def _slow_consumer():
+        for _ in stats.timed_iter('scan', range(3)):
+            with stats.timer('consumer'):
+                sum(range(100000))
+
+    _slow_consumer()
+
+    latencies = stats.summary()['latencies']
+
+    assert latencies['scan']['count'] == 1
+    assert latencies['scan']['total'] < latencies['consumer']['total']
+
+
+def test_cache_hit_rate(tmp_path):
+    stats.reset()
+
+    store = cache.Cache(str(tmp_path / 'cache.sqlite3'))
+    store.put('imdb-search', 'Inception', ['result'])
+
+    store.get('imdb-search', 'Inception')
+    store.get('imdb-search', 'Inception')
+    store.get('imdb-search', 'Memento')
+
+    assert stats.summary()['caches']['imdb-search'] == {'hits': 2, 'misses': 1, 'hit_rate': 2 / 3}
+
+    stats.dump(str(tmp_path / 'stats.json'))
+
+    with open(str(tmp_path / 'stats.json')) as stats_file:
+        assert json.load(stats_file)['caches']['imdb-search']['hits'] == 2
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+This file is part of yamr "Yet Another Media Renamer".
+
+Copyright (C) 2019, James Lee <jamesl33info@gmail.com>.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import os
+import struct
+
+from benchmark import fake_providers
+from yamr.cli import yamr
+from yamr.helper import tags
+
+
+def _id3_frame(frame_id: bytes, text: str) -> bytes:
+    value = b'\x03' + text.encode('utf-8')
+    return frame_id + struct.pack('>I', len(value)) + b'\x00\x00' + value
+
+
+def _id3(*frames: bytes) -> bytes:
+    body = b''.join(frames) + b'\x00' * 64
+    size = bytes((len(body) >> shift) & 0x7f for shift in (21, 14, 7, 0))
+    return b'ID3\x03\x00\x00' + size + body
+
+
+def _vorbis_comment(fields: dict) -> bytes:
+    comments = [('{0}={1}'.format(k, v)).encode('utf-8') for k, v in fields.items()]
+    return (struct.pack('<I', 4) + b'yamr' + struct.pack('<I', len(comments)) +
+            b''.join(struct.pack('<I', len(c)) + c for c in comments))
+
+
+def _flac_block(kind: int, data: bytes, last: bool = False) -> bytes:
+    return bytes([kind | (0x80 if last else 0)]) + len(data).to_bytes(3, 'big') + data
+
+
+def _ogg_page(packet: bytes, sequence: int) -> bytes:
+    segments = [255] * (len(packet) // 255) + [len(packet) % 255]
+    return (b'OggS\x00\x00' + b'\x00' * 8 + struct.pack('<II', 1, sequence) + b'\x00' * 4 +
+            bytes([len(segments)]) + bytes(segments) + packet)
+
+
+def test_read_id3(tmp_path):
+    path = tmp_path / 'track.mp3'
+    path.write_bytes(_id3(_id3_frame(b'TPE1', 'Rick Astley'), _id3_frame(b'TALB', 'Whenever You Need Somebody'),
+                          _id3_frame(b'TIT2', 'Never Gonna Give You Up'), _id3_frame(b'TRCK', '1/10')) + b'\xff' * 4096)
+
+    assert tags.read(str(path)) == {'artist': 'Rick Astley', 'album': 'Whenever You Need Somebody',
+                                    'title': 'Never Gonna Give You Up', 'track': 1}
+
+
+def test_read_flac_skips_pictures(tmp_path):
+    path = tmp_path / 'track.flac'
+    path.write_bytes(b'fLaC' + _flac_block(0, b'\x00' * 34) + _flac_block(6, b'\x00' * 100000) +
+                     _flac_block(4, _vorbis_comment({'ALBUMARTIST': 'Queen', 'ARTIST': 'Queen & David Bowie',
+                                                     'ALBUM': 'Hot Space', 'TRACKNUMBER': '11',
+                                                     'DISCNUMBER': '2'}), last=True))
+
+    assert tags.read(str(path)) == {'artist': 'Queen', 'album': 'Hot Space', 'track': 11, 'disc': 2}
+
+
+def test_read_ogg(tmp_path):
+    path = tmp_path / 'track.ogg'
+    comment = b'\x03vorbis' + _vorbis_comment({'title': 'Trees of Green', 'tracknumber': '1', 'padding': 'x' * 300})
+    path.write_bytes(_ogg_page(b'\x01vorbis' + b'\x00' * 23, 0) + _ogg_page(comment + b'\x01', 1))
+
+    assert tags.read(str(path)) == {'title': 'Trees of Green', 'track': 1}
+
+
+def test_read_untagged(tmp_path):
+    (tmp_path / 'empty.mp3').touch()
+    (tmp_path / 'truncated.mp3').write_bytes(b'ID3\x04\x00\x00\x00\x00\x10\x00TPE1')
+
+    assert tags.read(str(tmp_path / 'empty.mp3')) == {}
+    assert tags.read(str(tmp_path / 'truncated.mp3')) == {}
+    assert tags.read(str(tmp_path / 'missing.mp3')) == {}
+
+
+def test_rename_tagged_tracks(tmp_path):
+    musicbrainz_backend = fake_providers.FakeMusicBrainz()
+    musicbrainz_backend.add_album('Queen', 'Greatest Hits', [['Bohemian Rhapsody'], ['A Kind of Magic']])
+
+    # The filenames alone don't say which album or disc the tracks are from
+    for name, disc in [('01.mp3', '1'), ('01 (1).mp3', '2')]:
+        (tmp_path / name).write_bytes(_id3(_id3_frame(b'TPE2', 'Queen'), _id3_frame(b'TALB', 'Greatest Hits'),
+                                           _id3_frame(b'TRCK', '1'), _id3_frame(b'TPOS', disc + '/2')))
+
+    config = {'folder': str(tmp_path), 'dry_run': False, 'cache': False, 'auto_threshold': 0.5,
+              'musicbrainz_backend': musicbrainz_backend}
+
+    yamr.YAMR(config, {}).rename_media_files()
+
+    assert sorted(os.listdir(str(tmp_path))) == ['Queen - Greatest Hits - 1-01 - Bohemian Rhapsody.mp3',
+                                                 'Queen - Greatest Hits - 2-01 - A Kind of Magic.mp3']
+
+
+def test_albums_are_grouped_by_artist(tmp_path):
+    musicbrainz_backend = fake_providers.FakeMusicBrainz()
+    musicbrainz_backend.add_album('Queen', 'Greatest Hits', [['Bohemian Rhapsody']])
+    musicbrainz_backend.add_album('ABBA', 'Greatest Hits', [['Waterloo']])
+
+    for directory, artist in [('queen', 'Queen'), ('abba', 'ABBA')]:
+        (tmp_path / directory).mkdir()
+        (tmp_path / directory / '01.mp3').write_bytes(_id3(_id3_frame(b'TPE1', artist),
+                                                           _id3_frame(b'TALB', 'Greatest Hits'),
+                                                           _id3_frame(b'TRCK', '1')))
+
+    config = {'folder': str(tmp_path), 'dry_run': False, 'cache': False, 'auto_threshold': 0.85,
+              'musicbrainz_backend': musicbrainz_backend}
+
+    yamr.YAMR(config, {}).rename_media_files()
+
+    assert os.listdir(str(tmp_path / 'queen')) == ['Queen - Greatest Hits - 01 - Bohemian Rhapsody.mp3']
+    assert os.listdir(str(tmp_path / 'abba')) == ['ABBA - Greatest Hits - 01 - Waterloo.mp3']
+    assert musicbrainz_backend.calls['search_releases'] == 2
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+This file is part of yamr "Yet Another Media Renamer".
+
+Copyright (C) 2019, James Lee <jamesl33info@gmail.com>.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import os
+import threading
+
+import pytest
+
+from benchmark import fake_providers
+from yamr.cli import yamr
+from yamr.helper import planner
+from yamr.helper import scanner
+from yamr.helper import watcher
+
+
+def _create_later(path, delay=0.2):
+    timer = threading.Timer(delay, lambda: open(str(path), 'w').close())
+    timer.start()
+
+    return timer
+
+
+def test_polling_watcher_reports_settled_media_files(tmp_path):
+    folder_watcher = watcher.Watcher(str(tmp_path), interval=0.05, settle=0.1, polling=True)
+
+    _create_later(tmp_path / 'notes.txt')
+    _create_later(tmp_path / 'Inception (2010).mkv').join()
+
+    assert next(folder_watcher.batches()) == [str(tmp_path / 'Inception (2010).mkv')]
+
+
+def test_inotify_watcher_reports_moved_directories(tmp_path):
+    folder_watcher = watcher.Watcher(str(tmp_path), interval=0.05, settle=0.1)
+
+    if not isinstance(folder_watcher._backend, watcher.InotifyBackend):
+        pytest.skip('inotify is not available')
+
+    (tmp_path / 'incoming').mkdir()
+    (tmp_path / 'download').mkdir()
+    (tmp_path / 'download' / 'Inception (2010).mkv').touch()
+
+    os.rename(str(tmp_path / 'download'), str(tmp_path / 'incoming' / 'download'))
+
+    assert next(folder_watcher.batches()) == [str(tmp_path / 'incoming' / 'download' / 'Inception (2010).mkv')]
+
+
+def test_watcher_ignores_renamed_files(tmp_path):
+    folder_watcher = watcher.Watcher(str(tmp_path), interval=0.05, settle=0.1, polling=True)
+    folder_watcher.ignore([str(tmp_path / 'Inception (2010).mkv')])
+
+    _create_later(tmp_path / 'Inception (2010).mkv')
+    _create_later(tmp_path / 'Memento (2000).mkv').join()
+
+    assert next(folder_watcher.batches()) == [str(tmp_path / 'Memento (2000).mkv')]
+
+
+def test_chosen_shows_are_reused(tmp_path):
+    imdb_backend = fake_providers.FakeIMDb()
+    imdb_backend.add_show('Game of Thrones', 2011, {1: 10})
+
+    config = {'folder': str(tmp_path), 'dry_run': False, 'cache': False, 'watch': True,
+              'auto_threshold': 0.85, 'imdb_backend': imdb_backend}
+
+    renamer = yamr.YAMR(config, {})
+    journal = planner.journal_location(str(tmp_path))
+
+    for number in [1, 2]:
+        (tmp_path / 'Game of Thrones S01E0{0}.mkv'.format(number)).touch()
+
+        renamed = renamer._rename_files([scanner.media_file(str(tmp_path / 'Game of Thrones S01E0{0}.mkv'.format(number)))],
+                                        {str(tmp_path): journal})
+
+        assert renamed == [str(tmp_path / 'Game of Thrones - S01E0{0} - Episode {0}.mkv'.format(number))]
+
+    assert imdb_backend.calls['search_movie'] == 1
+    assert imdb_backend.calls['update_episodes'] == 1
+
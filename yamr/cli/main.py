@@ -19,19 +19,210 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
 import argparse
+import contextlib
 import json
+import os.path
 import sys
 
-from .yamr import YAMR
+from typing import List, Tuple
+
+from ..helper import decisions
+from ..helper import output
+from ..helper import planner
+from ..helper import providers
+from ..helper import scoring
+from ..helper import stats
+from ..helper import watcher
+
+
+def _cache_ttl(value: str) -> Tuple[str, float]:
+    """Parse a cache time to live override given on the command line.
+
+    Arguments:
+        value: The override in the form 'KIND=SECONDS'.
+
+    Returns:
+        The kind of response and how long it's valid for in seconds.
+    """
+    kind, _, seconds = value.partition('=')
+
+    if kind not in providers.TTLS:
+        raise argparse.ArgumentTypeError('unknown kind "{0}", expected one of {1}'.format(
+            kind, ', '.join(sorted(providers.TTLS))))
+
+    try:
+        return kind, float(seconds)
+    except ValueError:
+        raise argparse.ArgumentTypeError('invalid number of seconds "{0}" for "{1}"'.format(seconds, kind))
+
+
+def _positive_float(value: str) -> float:
+    """Parse a number given on the command line which must be greater than zero.
+
+    Arguments:
+        value: The number as it was given.
+
+    Returns:
+        The number.
+    """
+    try:
+        number = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError('invalid number "{0}"'.format(value))
+
+    if number <= 0:
+        raise argparse.ArgumentTypeError('must be greater than 0, not {0}'.format(value))
+
+    return number
+
+
+def _non_negative_int(value: str) -> int:
+    """Parse a count given on the command line which mustn't be negative.
+
+    Arguments:
+        value: The count as it was given.
+
+    Returns:
+        The count.
+    """
+    try:
+        count = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError('invalid integer "{0}"'.format(value))
+
+    if count < 0:
+        raise argparse.ArgumentTypeError('must be 0 or more, not {0}'.format(value))
+
+    return count
 
 
 def run_yamr() -> None:
     """Run the command line user interface for yamr."""
+    # 'decisions' is a command with its own arguments, unlike 'watch'
+    if sys.argv[1:2] == ['decisions']:
+        run_decisions(sys.argv[2:])
+        return
+
     parser = argparse.ArgumentParser(
         description='yamr "Yet Another Media Renamer"',
+        epilog='Run "yamr watch [options] folder" to keep running, renaming new media files as they arrive, '
+               'or "yamr decisions" to manage the choices yamr remembers',
         prog='yamr'
     )
 
+    parser.add_argument(
+        '-a',
+        '--auto',
+        action='store_true',
+        default=False,
+        help='Do not prompt, automatically accept confident matches and defer the rest'
+    )
+
+    parser.add_argument(
+        '--auto-margin',
+        action='store',
+        default=scoring.DEFAULT_MARGIN,
+        help='How far ahead of the runner-up a match must score to be accepted when using --auto',
+        metavar='MARGIN',
+        type=float
+    )
+
+    parser.add_argument(
+        '--auto-threshold',
+        action='store',
+        default=scoring.DEFAULT_THRESHOLD,
+        help='Confidence between 0 and 1 required to accept a match when using --auto',
+        metavar='THRESHOLD',
+        type=float
+    )
+
+    parser.add_argument(
+        '--cache-dir',
+        action='store',
+        default=None,
+        help='Directory used to store cached information (default: ~/.cache/yamr)',
+        type=str
+    )
+
+    parser.add_argument(
+        '--cache-ttl',
+        action='append',
+        default=[],
+        help='Override how long a kind of cached response is valid for e.g. "search=3600"',
+        metavar='KIND=SECONDS',
+        type=_cache_ttl
+    )
+
+    parser.add_argument(
+        '--decisions',
+        action='store',
+        default=None,
+        help='File the choices made for each title are remembered in (default: ~/.local/share/yamr/decisions.json)',
+        metavar='PATH',
+        type=str
+    )
+
+    parser.add_argument(
+        '--fingerprint-index',
+        action='store',
+        default=None,
+        help='Identify movies by the hash of their contents, using an index file or service of hashes to IMDB ids',
+        metavar='PATH_OR_URL',
+        type=str
+    )
+
+    parser.add_argument(
+        '-f',
+        '--format',
+        action='store',
+        choices=[output.HUMAN, output.JSONL],
+        default=output.HUMAN,
+        help='Display the outcome for each file as colorized text or as one JSON object per line'
+    )
+
+    parser.add_argument(
+        '--imdb-index',
+        action='store',
+        default=None,
+        help='Use a local index of the IMDB datasets instead of the IMDB web api',
+        metavar='PATH',
+        type=str
+    )
+
+    parser.add_argument(
+        '--import-imdb',
+        action='store',
+        default=None,
+        help='Build the --imdb-index from the "title.basics" and "title.episode" datasets in DIR then exit',
+        metavar='DIR',
+        type=str
+    )
+
+    parser.add_argument(
+        '-i',
+        '--incremental',
+        action='store_true',
+        default=False,
+        help='Skip files which are unchanged since yamr last settled them'
+    )
+
+    parser.add_argument(
+        '-j',
+        '--jobs',
+        action='store',
+        default=1,
+        help='Number of worker processes used to parse filenames',
+        type=int
+    )
+
+    parser.add_argument(
+        '--musicbrainz-rate',
+        action='store',
+        default=1.0,
+        help='Maximum number of MusicBrainz requests per second',
+        type=_positive_float
+    )
+
     parser.add_argument(
         '-n',
         '--dry-run',
@@ -40,6 +231,34 @@ def run_yamr() -> None:
         help='Do not perform any action, just show what would be done'
     )
 
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        default=False,
+        help='Do not read or write any cached information'
+    )
+
+    parser.add_argument(
+        '--no-decisions',
+        action='store_true',
+        default=False,
+        help='Do not use or remember the choices made for each title'
+    )
+
+    parser.add_argument(
+        '--no-tags',
+        action='store_true',
+        default=False,
+        help='Do not read the embedded tags of audio files, only use their filenames'
+    )
+
+    parser.add_argument(
+        '--offline',
+        action='store_true',
+        default=False,
+        help='Do not make any network requests, only use cached responses'
+    )
+
     parser.add_argument(
         '-o',
         '--overrides',
@@ -49,6 +268,92 @@ def run_yamr() -> None:
         type=str
     )
 
+    parser.add_argument(
+        '--polling',
+        action='store_true',
+        default=False,
+        help='When watching, scan the folder for new files rather than using inotify'
+    )
+
+    parser.add_argument(
+        '--prefetch',
+        action='store',
+        default=8,
+        help='Number of concurrent search requests made ahead of the prompts, zero disables prefetching',
+        type=_non_negative_int
+    )
+
+    parser.add_argument(
+        '-q',
+        '--quiet',
+        action='store_true',
+        default=False,
+        help='Only display a summary of the outcomes, rather than the outcome for each file'
+    )
+
+    parser.add_argument(
+        '--refresh',
+        action='store_true',
+        default=False,
+        help='Ignore cached responses from IMDB and MusicBrainz'
+    )
+
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        default=False,
+        help='Complete the renames of an interrupted run then exit'
+    )
+
+    parser.add_argument(
+        '--review-queue',
+        action='store',
+        default=None,
+        help='File which low confidence matches are appended to when using --auto',
+        metavar='PATH',
+        type=str
+    )
+
+    parser.add_argument(
+        '--rollback',
+        action='store_true',
+        default=False,
+        help='Undo the renames of an interrupted run then exit'
+    )
+
+    parser.add_argument(
+        '--settle',
+        action='store',
+        default=watcher.DEFAULT_SETTLE,
+        help='When watching, seconds a new file must be unchanged for before it is renamed',
+        metavar='SECONDS',
+        type=float
+    )
+
+    parser.add_argument(
+        '--state-dir',
+        action='store',
+        default=None,
+        help='Directory used to store the incremental manifest (default: the target folder)',
+        type=str
+    )
+
+    parser.add_argument(
+        '--stats',
+        action='store_true',
+        default=False,
+        help='Display timings, provider latencies and cache hit rates once renaming has finished'
+    )
+
+    parser.add_argument(
+        '--stats-json',
+        action='store',
+        default=None,
+        help='Write timings, provider latencies and cache hit rates to PATH as JSON',
+        metavar='PATH',
+        type=str
+    )
+
     parser.add_argument(
         '-v',
         '--version',
@@ -57,18 +362,49 @@ def run_yamr() -> None:
     )
 
     parser.add_argument(
-        'folder',
+        '--watch-interval',
         action='store',
-        help='Target folder, should contain some media files',
-        nargs='?',
+        default=watcher.DEFAULT_INTERVAL,
+        help='When watching, seconds between checks for new files',
+        metavar='SECONDS',
+        type=float
+    )
+
+    parser.add_argument(
+        'folders',
+        action='store',
+        help='Target folders, should contain some media files',
+        metavar='folder',
+        nargs='*',
         type=str
     )
 
-    arguments = parser.parse_args()
+    # 'watch' is a command rather than an option, so it's handled before parsing
+    watch = sys.argv[1:2] == ['watch']
+    arguments = parser.parse_args(sys.argv[1 + watch:])
 
     config = {
+        'auto_margin': arguments.auto_margin,
+        'auto_threshold': arguments.auto_threshold if arguments.auto else None,
+        'cache': not arguments.no_cache,
+        'cache_dir': arguments.cache_dir,
+        'cache_ttls': dict(arguments.cache_ttl),
+        'decisions': None if arguments.no_decisions else arguments.decisions or decisions.default_location(),
         'dry_run': arguments.dry_run,
-        'folder': arguments.folder
+        'fingerprint_index': arguments.fingerprint_index,
+        'folder': arguments.folders[0] if arguments.folders else None,
+        'folders': arguments.folders,
+        'imdb_index': arguments.imdb_index,
+        'incremental': arguments.incremental,
+        'jobs': arguments.jobs,
+        'musicbrainz_rate': arguments.musicbrainz_rate,
+        'offline': arguments.offline,
+        'prefetch': arguments.prefetch,
+        'refresh': arguments.refresh,
+        'review_queue': arguments.review_queue,
+        'state_dir': arguments.state_dir,
+        'tags': not arguments.no_tags,
+        'watch': watch
     }
 
     overrides = json.loads(arguments.overrides)
@@ -78,9 +414,112 @@ def run_yamr() -> None:
         print('{0} {1}'.format(yamr.__title__, yamr.__version__))
         exit(0)
 
+    if arguments.import_imdb is not None:
+        if arguments.imdb_index is None:
+            parser.error('--import-imdb requires --imdb-index')
+
+        from ..helper import imdb_index
+        imdb_index.IMDbIndex.build(arguments.imdb_index, arguments.import_imdb).close()
+        exit(0)
+
     if config['folder'] is None:
         parser.print_help()
         exit(0)
 
-    yamr = YAMR(config, overrides)
-    yamr.rename_media_files()
+    if watch and len(config['folders']) > 1:
+        parser.error('watch only supports a single folder')
+
+    output_format = output.QUIET if arguments.quiet else arguments.format
+    output.configure(output_format, sys.stdout)
+
+    # Prompts are written to stderr, so stdout only contains the structured output
+    console = sys.stdout if output_format == output.HUMAN else sys.stderr
+
+    if arguments.resume or arguments.rollback:
+        journals = [planner.journal_location(folder, arguments.state_dir) for folder in config['folders']]
+        journals = [journal for journal in journals if os.path.exists(journal)]
+
+        if not journals:
+            print('There is no interrupted run to {0}'.format('resume' if arguments.resume else 'rollback'))
+            exit(1)
+
+        with contextlib.redirect_stdout(console):
+            for journal in journals:
+                if arguments.resume:
+                    planner.resume(journal)
+                else:
+                    planner.rollback(journal)
+
+        exit(0)
+
+    # Importing YAMR imports Guessit, so it's deferred until there is something to rename
+    from .yamr import YAMR
+
+    with contextlib.redirect_stdout(console):
+        yamr = YAMR(config, overrides)
+
+        if watch:
+            yamr.watch(arguments.watch_interval, arguments.settle, arguments.polling)
+        else:
+            yamr.rename_media_files()
+
+    if arguments.stats:
+        stats.print_summary(console)
+
+    if arguments.stats_json is not None:
+        stats.dump(arguments.stats_json)
+
+
+def run_decisions(argv: List[str]) -> None:
+    """Run the command line user interface for the choices yamr remembers.
+
+    Arguments:
+        argv: The arguments which followed 'yamr decisions'.
+    """
+    parser = argparse.ArgumentParser(
+        description='List, set or forget the choices yamr remembers for each title',
+        prog='yamr decisions'
+    )
+
+    parser.add_argument(
+        '--decisions',
+        action='store',
+        default=None,
+        help='File the choices are remembered in (default: ~/.local/share/yamr/decisions.json)',
+        metavar='PATH',
+        type=str
+    )
+
+    commands = parser.add_subparsers(dest='command', metavar='command')
+    commands.required = True
+
+    commands.add_parser('list', help='List every remembered choice')
+
+    set_parser = commands.add_parser('set', help='Remember a choice, so the title is never searched for')
+    set_parser.add_argument('kind', choices=decisions.KINDS, help='The kind of media')
+    set_parser.add_argument('title', help='The title, as it is parsed from the filenames')
+    set_parser.add_argument('id', help='The IMDB id, or MusicBrainz release id, to use for the title')
+    set_parser.add_argument('--year', default=None, type=int,
+                            help='The year, as it is parsed from the filenames, for movies and shows which have one')
+
+    forget_parser = commands.add_parser('forget', help='Forget a choice, so the user is asked again')
+    forget_parser.add_argument('key', help='The key of the choice, as displayed by "list"')
+
+    arguments = parser.parse_args(argv)
+    store = decisions.DecisionStore(arguments.decisions or decisions.default_location())
+
+    if arguments.command == 'list':
+        for entry in store.entries():
+            print('{0}\t{1}\t{2}'.format(entry['key'], entry['id'], entry['name'] or ''))
+    elif arguments.command == 'set':
+        # Albums are only told apart by their artist, see 'YAMR._album_title'
+        if arguments.kind == decisions.ALBUM and arguments.year is not None:
+            parser.error('--year is not used for albums, give the title as "ARTIST - ALBUM" instead')
+
+        store.remember(arguments.kind, arguments.title, arguments.year, arguments.id)
+        store.save()
+    elif not store.forget(arguments.key):
+        print('There is no remembered choice for "{0}"'.format(arguments.key))
+        exit(1)
+    else:
+        store.save()
@@ -18,26 +18,39 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
+import collections
+import itertools
 import os.path
 
-from typing import List, Tuple, Dict, TypeVar
+from concurrent import futures
+from typing import Callable, Iterable, Iterator, List, Tuple, Dict, TypeVar
 
 import colorama
-import guessit
 
 from ..core import album
 from ..core import episode
 from ..core import movie
+from ..core import movie_group
 from ..core import track
 from ..core import tv_show
+from ..helper import cache
+from ..helper import decisions
+from ..helper import fingerprint
+from ..helper import manifest
+from ..helper import output
+from ..helper import parser
+from ..helper import planner
+from ..helper import providers
+from ..helper import scanner
+from ..helper import scoring
+from ..helper import stats
+from ..helper import tags
+from ..helper import user_input
+from ..helper import watcher
 
 
-AUDIO_EXTENSIONS = ['.flac', '.mp3', '.ogg']
-SUBTITLE_EXTENSIONS = ['.srt']
-VIDEO_EXTENSIONS = ['.avi', '.mkv', '.mp4']
-FILE_EXTENSIONS = set(AUDIO_EXTENSIONS + SUBTITLE_EXTENSIONS + VIDEO_EXTENSIONS)
-
 T = TypeVar('T')  # Generic type
+K = TypeVar('K')  # Generic key type
 
 
 class YAMR():
@@ -52,85 +65,536 @@ class YAMR():
         self._config = config
         self._overrides = overrides
 
+        # Several directories can be renamed at once, each is a separate library
+        self._folders = scanner.distinct_roots(config.get('folders') or [config['folder']])
+
+        self._cache = None
+
+        if config.get('cache', True):
+            cache_dir = config.get('cache_dir') or cache.default_directory()
+            self._cache = cache.Cache(os.path.join(cache_dir, 'cache.sqlite3'))
+        elif config.get('watch', False):
+            # A resident process still benefits from caching, even if nothing is persisted
+            self._cache = cache.Cache(':memory:')
+
+        parser.use_cache(self._cache)
+
+        imdb_backend = config.get('imdb_backend')
+
+        if imdb_backend is None and config.get('imdb_index') is not None:
+            from ..helper import imdb_index
+            imdb_backend = imdb_index.IMDbIndex(config['imdb_index'])
+
+        providers.configure(self._cache, config.get('refresh', False), config.get('offline', False),
+                            config.get('cache_ttls'), config.get('prefetch', providers.DEFAULT_PREFETCH_WORKERS),
+                            imdb_backend, config.get('musicbrainz_rate', providers.DEFAULT_MUSICBRAINZ_RATE),
+                            config.get('musicbrainz_backend'))
+
+        user_input.configure(config.get('auto_threshold'), config.get('review_queue'),
+                             config.get('auto_margin', scoring.DEFAULT_MARGIN))
+
+        self._decisions = None
+
+        if config.get('decisions') is not None:
+            self._decisions = decisions.DecisionStore(config['decisions'])
+
+        self._fingerprints = None
+
+        if config.get('fingerprint_index') is not None:
+            self._fingerprints = fingerprint.open_index(config['fingerprint_index'], config.get('offline', False))
+
+        # When watching, the shows, movies and albums chosen so far are kept, keyed
+        # by title, so they're not chosen again for later batches of new files
+        self._chosen_movies = {}
+        self._chosen_releases = {}
+        self._chosen_shows = {}
+
+    @stats.timed('phase.total')
     def rename_media_files(self):
-        """Rename all the media files in the given directory."""
-        media_files = self._get_media_files(self._config['folder'])
-        albums, movies, tv_shows = self._process_media_files(media_files)
+        """Rename all the media files in the given directories.
+
+        Directories on different devices are scanned, and renamed, concurrently
+        whilst shows, movies and albums are grouped across every directory.
+        """
+        journals = self._journals()
+
+        if any(os.path.exists(journal) for journal in journals.values()):
+            print('An interrupted run was found, use --resume or --rollback before renaming again')
+            return
+
+        # Scanning is interleaved with parsing, so only time spent walking the folders is recorded
+        media_files = stats.timed_iter('scan', scanner.scan_roots(self._folders))
+
+        states = None
+
+        if self._config.get('incremental', False):
+            states = {folder: manifest.Manifest(manifest.Manifest.location(folder, self._config.get('state_dir')))
+                      for folder in self._folders}
+            media_files = self._skip_settled(media_files, states)
+
+        self._rename_files(media_files, journals, states)
+
+    def watch(self, interval: float = watcher.DEFAULT_INTERVAL, settle: float = watcher.DEFAULT_SETTLE,
+              polling: bool = False) -> None:
+        """Rename new media files as they arrive in the given directory, forever.
+
+        The shows and albums which have been chosen are remembered, along with
+        parsed filenames and provider responses, so files which belong to them
+        are renamed without prompting or making any requests.
+
+        Arguments:
+            interval: How often to check for new media files in seconds.
+            settle: How long a new file must be unchanged for before it's renamed.
+            polling: Always scan the directory, rather than trying to use inotify.
+        """
+        journals = self._journals()
+
+        if any(os.path.exists(journal) for journal in journals.values()):
+            print('An interrupted run was found, use --resume or --rollback before renaming again')
+            return
+
+        folder_watcher = watcher.Watcher(self._folders[0], interval, settle, polling)
+
+        output.message('Watching "{0}" for new media files'.format(self._folders[0]))
+        output.flush()
+
+        try:
+            for paths in folder_watcher.batches():
+                media_files = scanner.pair(f for f in map(scanner.media_file, paths) if f is not None)
+                renamed = self._rename_files(media_files, journals)
+
+                # yamr's own renames would otherwise be detected as new files
+                folder_watcher.ignore(renamed)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            folder_watcher.close()
+
+    def _journals(self) -> Dict[str, str]:
+        """Determine where the rename journal of each directory is stored.
+
+        Returns:
+            The path to the journal of each directory, keyed by directory.
+        """
+        return {folder: planner.journal_location(folder, self._config.get('state_dir')) for folder in self._folders}
+
+    def _folder_of(self, path: str) -> str:
+        """Determine which of the given directories a media file is in.
+
+        Arguments:
+            path: The path to the media file.
+
+        Returns:
+            The directory.
+        """
+        for folder in self._folders:
+            if path.startswith(os.path.join(folder, '')):
+                return folder
+
+        return self._folders[0]
+
+    def _rename_files(self, media_files: Iterable[scanner.MediaFile], journals: Dict[str, str],
+                      states: Dict[str, manifest.Manifest] = None) -> List[str]:
+        """Rename some media files.
+
+        Arguments:
+            media_files: Records for the media files, as yielded by the scanner.
+            journals: The path to write the journal of each directory to.
+            states: The manifest of each directory to record settled media files in, if any.
+
+        Returns:
+            The paths of the media files which were renamed.
+        """
+        with stats.timer('phase.discover'):
+            albums, movies, tv_shows = self._process_media_files(media_files)
+
+        with stats.timer('phase.lookup'):
+            if self._fingerprints is not None:
+                self._identify_movies(itertools.chain(*movies.values()))
+
+            # Fire off every search up front, in the order they will be prompted for,
+            # so the user doesn't wait on the network between prompts.
+            for group in ([albums[k] for k in albums if k not in self._chosen_releases and
+                           not self._decided(decisions.ALBUM, self._album_title(k))] +
+                          [movies[k] for k in movies if k not in self._chosen_movies and
+                           not self._decided(decisions.MOVIE, *k)] +
+                          [tv_shows[t] for t in tv_shows if t not in self._chosen_shows and
+                           not self._decided(decisions.SHOW, t, tv_shows[t].year)]):
+                group.prefetch()
+
+            for key in albums:
+                release = (self._chosen_releases.get(key) or
+                           self._fetch_decided(decisions.ALBUM, self._album_title(key), None, albums[key].release_by_id))
+
+                if release is None:
+                    release = albums[key].choose_release()
+
+                    if release is not None:
+                        self._remember(decisions.ALBUM, self._album_title(key), None, release[0]['id'], release[0]['title'])
+
+                if release is not None:
+                    self._choose(self._chosen_releases, key, release)
+                    albums[key].rename_tracks(self._config['dry_run'], release)
+
+            for key in movies:
+                imdb_movie = self._chosen_movies.get(key) or self._fetch_decided(decisions.MOVIE, *key, providers.get_movie)
+
+                if imdb_movie is None and not movies[key].identified:
+                    imdb_movie = movies[key].choose_movie()
+
+                    if imdb_movie is not None:
+                        self._remember(decisions.MOVIE, *key, imdb_movie.movieID, imdb_movie['title'])
+
+                if imdb_movie is not None:
+                    self._choose(self._chosen_movies, key, imdb_movie)
+
+                movies[key].rename_movies(self._config['dry_run'], imdb_movie, choose=False)
+
+            self._rename_tv_shows(tv_shows)
+
+        with stats.timer('phase.rename'):
+            # Every rename has been proposed, check them for collisions then perform them
+            plans = collections.OrderedDict((folder, planner.Planner()) for folder in self._folders)
+
+            for media in itertools.chain(*albums.values(), *movies.values(), *tv_shows.values()):
+                plans[self._folder_of(media.path)].add([media])
+
+            self._execute(plans, journals)
+
+        renamed = []
+
+        if not self._config['dry_run']:
+            renamed = [r.target for plan in plans.values() for r in plan if r.status == planner.RENAME]
+
+        if states is not None and not self._config['dry_run']:
+            for media in itertools.chain(*movies.values(), *albums.values(), *tv_shows.values()):
+                state = states[self._folder_of(media.path)]
+
+                if media.settled:
+                    state.record(media.path)
+
+                    for sc in media.sidecars:
+                        if sc.settled:
+                            state.record(sc.path)
+
+            for state in states.values():
+                state.save()
+
+        if self._decisions is not None and not self._config['dry_run']:
+            self._decisions.save()
+
+        output.finish()
+
+        if self._cache is not None:
+            self._cache.flush()
+
+        return renamed
+
+    @classmethod
+    def _album_title(cls, key: Tuple[str, str]) -> str:
+        """Get the title an album's decision is remembered under.
+
+        Arguments:
+            key: The artist, if it's known, and title of the album.
+
+        Returns:
+            The title e.g. "queen - greatest hits".
+        """
+        artist, title = key
+
+        return title if artist is None else '{0} - {1}'.format(artist, title)
 
-        for title in albums:
-            albums[title].rename_tracks(self._config['dry_run'])
+    def _choose(self, chosen: Dict[K, T], key: K, choice: T) -> None:
+        """Keep a choice for the later batches of a watch, other runs only see
+        each title once so nothing is kept.
+
+        Arguments:
+            chosen: The choices made so far.
+            key: Identifies what was chosen e.g. the title.
+            choice: What was chosen.
+        """
+        if self._config.get('watch', False):
+            chosen[key] = choice
+
+    def _decided(self, kind: str, title: str, year: int = None) -> bool:
+        """Determine whether a choice was made for a title in a previous run.
+
+        Arguments:
+            kind: The kind of media e.g. 'movie'.
+            title: The title parsed from the filename.
+            year: The year parsed from the filename, if any.
+
+        Returns:
+            Whether there is a remembered decision.
+        """
+        return self._decisions is not None and self._decisions.get(kind, title, year) is not None
+
+    def _fetch_decided(self, kind: str, title: str, year: int, fetch: Callable[[str], T]) -> T:
+        """Fetch the choice made for a title in a previous run by its id, so
+        there's no need to search or prompt.
+
+        Arguments:
+            kind: The kind of media e.g. 'movie'.
+            title: The title parsed from the filename.
+            year: The year parsed from the filename, if any.
+            fetch: Function which fetches the choice by its id.
+
+        Returns:
+            The choice, or None if one wasn't made or it couldn't be fetched.
+        """
+        if not self._decided(kind, title, year):
+            return None
+
+        choice = fetch(self._decisions.get(kind, title, year))
+
+        stats.increment('decisions.reused' if choice is not None else 'decisions.unavailable')
+
+        return choice
+
+    def _remember(self, kind: str, title: str, year: int, provider_id: str, name: str) -> None:
+        """Remember the choice just made for a title, so it isn't asked again.
+
+        Arguments:
+            kind: The kind of media e.g. 'movie'.
+            title: The title parsed from the filename.
+            year: The year parsed from the filename, if any.
+            provider_id: The IMDB or MusicBrainz id which was chosen.
+            name: A human readable description of the choice.
+        """
+        # Guesses made by --auto, or the only search result, haven't been confirmed
+        # by the user, and a dry run mustn't change anything
+        if not user_input.last_choice_confirmed() or self._config['dry_run']:
+            return
+
+        if self._decisions is not None:
+            self._decisions.remember(kind, title, year, provider_id, name)
+
+    def _identify_movies(self, movies: Iterable[movie.Movie]) -> None:
+        """Identify movies by the fingerprint of their contents, so badly named
+        movies are renamed without searching or prompting.
+
+        Arguments:
+            movies: The movies to identify.
+        """
+        movies = list(movies)
+
+        with stats.timer('lookup.fingerprint'):
+            fingerprints = fingerprint.compute_all([mo.path for mo in movies],
+                                                   self._config.get('fingerprint_workers', fingerprint.DEFAULT_WORKERS))
+
+        identified = []
 
         for mo in movies:
-            mo.rename(self._config['dry_run'])
+            movie_id = None if mo.path not in fingerprints else self._fingerprints.lookup(fingerprints[mo.path])
+
+            if movie_id is not None:
+                providers.prefetch(providers.get_movie, movie_id)
+                identified.append((mo, movie_id))
+
+        for mo, movie_id in identified:
+            imdb_movie = providers.get_movie(movie_id)
+
+            if imdb_movie is not None:
+                mo.identify(imdb_movie)
+                stats.increment('fingerprint.identified')
+
+    def _execute(self, plans: Dict[str, planner.Planner], journals: Dict[str, str]) -> None:
+        """Display the plan of each directory, then perform them.
+
+        The plans of directories on the same device are performed one after
+        another, whilst each device is worked on concurrently.
+
+        Arguments:
+            plans: The plan of each directory.
+            journals: The path to write the journal of each directory to.
+        """
+        # Plans are displayed in order, so output isn't interleaved
+        ordered = {folder: plan.report() for folder, plan in plans.items()}
+
+        if self._config['dry_run']:
+            return
+
+        def _perform(folders: List[str]) -> None:
+            for folder in folders:
+                planner.Planner.perform(ordered[folder], journals[folder])
+
+        devices = list(scanner.group_by_device(plans).values())
 
-        for title in tv_shows:
-            tv_shows[title].rename_episodes(self._config['dry_run'])
+        with futures.ThreadPoolExecutor(max_workers=len(devices), thread_name_prefix='yamr-rename') as executor:
+            for performed in [executor.submit(_perform, folders) for folders in devices]:
+                performed.result()
 
-    def _process_media_files(self, files: List[str]) -> Tuple[Dict[str, List[album.Album]], Dict[str, List[tv_show.TVShow]], List[movie.Movie]]:
-        """Process a list of media files into Ablum, Movie, TVShow objects.
+    def _skip_settled(self, files: Iterable[scanner.MediaFile],
+                      states: Dict[str, manifest.Manifest]) -> Iterator[scanner.MediaFile]:
+        """Filter out the media files which haven't changed since they were settled.
 
         Arguments:
-            files: List of paths to any supported media files.
+            files: Records for any supported media files, as yielded by the scanner.
+            states: The manifest of each directory from the previous run.
 
         Returns:
-            A tuple containing the media files in a format yamr can understand.
+            The media files which still need to be processed.
+        """
+        skipped = 0
+
+        for file in files:
+            state = states[self._folder_of(file.path)]
+
+            # A new subtitle for a settled video means the video is processed again
+            if all(state.is_settled(path) for path in (file.path,) + file.sidecars):
+                skipped += 1
+            else:
+                yield file
+
+        if skipped:
+            output.message('Skipped {0} unchanged files'.format(colorama.Fore.LIGHTGREEN_EX + str(skipped) + colorama.Fore.RESET))
+
+    def _rename_tv_shows(self, tv_shows: Dict[str, tv_show.TVShow]) -> None:
+        """Rename the episodes of each TV show.
+
+        The episode list of a chosen show is fetched in the background whilst
+        the user is choosing the next show. Renames are proposed, in order,
+        between prompts so the output is still grouped per show. Shows which
+        have already been chosen are reused, along with the seasons which have
+        already been fetched.
+
+        Arguments:
+            tv_shows: The TV shows to rename.
         """
-        albums, tv_shows = {}, {}
-        episodes, movies, tracks = [], [], []
+        pending = collections.deque()
+        workers = max(1, self._config.get('prefetch', providers.DEFAULT_PREFETCH_WORKERS))
+
+        def _rename_fetched(block: bool) -> None:
+            while pending and (block or pending[0][1].done()):
+                title, fetched = pending.popleft()
+                self._choose(self._chosen_shows, title, fetched.result())
+                tv_shows[title].rename_episodes(self._config['dry_run'], fetched.result())
 
-        for file in [f for f in files if os.path.splitext(f)[-1] in AUDIO_EXTENSIONS]:
-            tracks.append(track.Track(file, overrides=self._overrides))
+        with futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix='yamr-episodes') as executor:
+            for title in tv_shows:
+                _rename_fetched(block=False)
 
-        for file in [f for f in files if os.path.splitext(f)[-1] in set(VIDEO_EXTENSIONS + SUBTITLE_EXTENSIONS)]:
-            file_info = guessit.guessit(os.path.basename(file))
+                imdb_show = (self._chosen_shows.get(title) or
+                             self._fetch_decided(decisions.SHOW, title, tv_shows[title].year, providers.get_movie))
 
-            if file_info['type'] == 'movie':
-                movies.append(movie.Movie(file, file_info, self._overrides))
-            elif file_info['type'] == 'episode':
-                episodes.append(episode.Episode(file, file_info, self._overrides))
+                if imdb_show is None:
+                    imdb_show = tv_shows[title].choose_show()
 
-        # Separate the episodes into individual shows
-        for ep in episodes:
-            show_title = ep._info['title'].lower()
+                    if imdb_show is not None:
+                        self._remember(decisions.SHOW, title, tv_shows[title].year, imdb_show.movieID, imdb_show['title'])
 
-            if show_title not in tv_shows:
-                tv_shows[show_title] = tv_show.TVShow(show_title)
+                if imdb_show is not None:
+                    pending.append((title, executor.submit(tv_shows[title].fetch_episodes, imdb_show)))
 
-            tv_shows[show_title].add(ep)
+            _rename_fetched(block=True)
 
-        # Separate the tracks into individual albums
-        for tr in tracks:
-            try:
-                album_title = tr._info['alternative_title'].lower()
-            except KeyError:
-                album_title = tr._info['title'].lower()
+    def _process_media_files(self, files: Iterable[scanner.MediaFile]) -> Tuple[Dict[Tuple[str, str], album.Album], Dict[Tuple[str, int], movie_group.MovieGroup], Dict[str, tv_show.TVShow]]:
+        """Process a stream of media files into Album, Movie, TVShow objects.
 
-            if album_title not in albums:
-                albums[album_title] = album.Album(album_title)
+        Arguments:
+            files: Records for any supported media files, as yielded by the scanner.
+
+        Returns:
+            A tuple containing the media files in a format yamr can understand.
+        """
+        albums, movies, tv_shows = {}, {}, {}
+        tracks = []
 
-            albums[album_title].add(tr)
+        workers = self._config.get('tag_workers', tags.DEFAULT_WORKERS)
+
+        # Tags are read by a thread pool whilst filenames are still being parsed
+        with futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix='yamr-tags') as executor:
+            # Parsing is the CPU bound stage, so it's fanned out to the worker processes
+            for file, file_info in parser.parse_stream(files, lambda f: f.name, self._config.get('jobs', 1)):
+                stats.increment('files', len(file.sidecars) + 1)
+
+                if file.kind == scanner.AUDIO:
+                    read = executor.submit(tags.read, file.path) if self._config.get('tags', True) else None
+                    tracks.append((file, file_info, read))
+                elif file_info['type'] == 'movie':
+                    self._add_movie(movies, self._attach(movie.Movie(file.path, file_info, self._overrides), file))
+                elif file_info['type'] == 'episode':
+                    self._add_episode(tv_shows, self._attach(episode.Episode(file.path, file_info, self._overrides), file))
+
+            for file, file_info, read in tracks:
+                if read is not None:
+                    file_info = tags.track_info(file_info, read.result())
+
+                self._add_track(albums, self._attach(track.Track(file.path, file_info, self._overrides), file))
 
         album_count = colorama.Fore.LIGHTGREEN_EX + str(len(albums)) + colorama.Fore.RESET
         movie_count = colorama.Fore.LIGHTGREEN_EX + str(len(movies)) + colorama.Fore.RESET
         tv_show_count = colorama.Fore.LIGHTGREEN_EX + str(len(tv_shows)) + colorama.Fore.RESET
 
-        print('Discovered {0} Albums / {1} Movies / {2} TV Shows'.format(album_count, movie_count, tv_show_count))
+        output.message('Discovered {0} Albums / {1} Movies / {2} TV Shows'.format(album_count, movie_count, tv_show_count))
 
         return albums, movies, tv_shows
 
     @classmethod
-    def _get_media_files(cls, directory: str) -> List[str]:
-        """Search for all the media files in a given directory.
+    def _attach(cls, media: T, file: scanner.MediaFile) -> T:
+        """Attach the sidecars of a media file, so they're renamed with it
+        rather than being identified by themselves.
 
         Arguments:
-            directory: The directory to search in.
+            media: The media file.
+            file: The record for the media file, as yielded by the scanner.
 
         Returns:
-            The paths to any media files which are supported by yamr.
+            The same media file.
+        """
+        media.attach(file.sidecars)
+        stats.increment('sidecars', len(file.sidecars))
+
+        return media
+
+    @classmethod
+    def _add_movie(cls, movies: Dict[Tuple[str, int], movie_group.MovieGroup], mo: movie.Movie) -> None:
+        """Add a movie file to the movie it belongs to, so each movie is only
+        searched for once.
+
+        Arguments:
+            movies: The movies discovered so far, keyed by normalized title and year.
+            mo: The movie file to add.
+        """
+        key = (scoring.normalize(mo._info['title']), mo._info.get('year'))
+
+        if key not in movies:
+            movies[key] = movie_group.MovieGroup(mo._info['title'], mo._info.get('year'))
+
+        movies[key].add(mo)
+
+    @classmethod
+    def _add_episode(cls, tv_shows: Dict[str, tv_show.TVShow], ep: episode.Episode) -> None:
+        """Add an episode to the TV show it belongs to.
+
+        Arguments:
+            tv_shows: The TV shows discovered so far, keyed by title.
+            ep: The episode to add.
+        """
+        show_title = ep._info['title'].lower()
+
+        if show_title not in tv_shows:
+            tv_shows[show_title] = tv_show.TVShow(show_title)
+
+        tv_shows[show_title].add(ep)
+
+    @classmethod
+    def _add_track(cls, albums: Dict[Tuple[str, str], album.Album], tr: track.Track) -> None:
+        """Add a track to the album it belongs to.
+
+        Albums are told apart by their artist as well as their title, so
+        e.g. "Greatest Hits" by different artists aren't merged together.
+
+        Arguments:
+            albums: The albums discovered so far, keyed by artist and title.
+            tr: The track to add.
         """
-        media_files = []
+        try:
+            key = (tr._info['title'].lower(), tr._info['alternative_title'].lower())
+        except KeyError:
+            key = (None, tr._info['title'].lower())
 
-        for dirpath, _, filenames in os.walk(directory):
-            media_files += [os.path.join(dirpath, f) for f in filenames if os.path.splitext(f)[-1] in FILE_EXTENSIONS]
+        if key not in albums:
+            albums[key] = album.Album(key[1], key[0])
 
-        return media_files
+        albums[key].add(tr)
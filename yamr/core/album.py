@@ -18,14 +18,15 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
-import sys
-
 from typing import List, Tuple, Dict
 
 import colorama
-import musicbrainzngs
 
 from . import track
+from ..helper import output
+from ..helper import providers
+from ..helper import scoring
+from ..helper import stats
 from ..helper import user_input
 
 
@@ -35,13 +36,15 @@ class Album():
     Container class which represents a complete album. The instance will contain
     multiple 'Track' instances.
     """
-    def __init__(self, title: str) -> None:
+    def __init__(self, title: str, artist: str = None) -> None:
         """Instantiate the Album class.
 
         Arguments:
             title: The title of the album that this instance is representing.
+            artist: The artist of the album, if it's known.
         """
         self._title = title
+        self._artist = artist
         self._tracks = []
 
     def add(self, tr: track.Track) -> None:
@@ -52,25 +55,73 @@ class Album():
         """
         self._tracks.append(tr)
 
-    def rename_tracks(self, dry_run: bool) -> None:
-        """Rename all of the tracks in the album.
+    def prefetch(self) -> None:
+        """Start searching MusicBrainz for this album in the background."""
+        providers.prefetch(providers.search_releases, self._title, self._artist)
 
-        Arguments:
-            dry_run: Whether or not make any changes.
+    @stats.timed('lookup.album')
+    def choose_release(self) -> Tuple[Dict, List[List[Dict]]]:
+        """Determine which MusicBrainz release this instance represents, and
+        get the track list of each of its discs.
+
+        Returns:
+            The album chosen by the user and its track lists, or None if it was
+            skipped, not found or the release isn't available.
         """
         album = self._determine_album(self._title)
 
         # There weren't any search results
         if album is None:
-            print('Album "{0}" skipped or not found (no changes made)'.format(self._title))
+            output.unmatched([tr.path for tr in self._tracks], 'album skipped or not found',
+                             'Album "{0}" skipped or not found (no changes made)'.format(self._title))
+            return
+
+        release = providers.get_release(album['id'])
+
+        if release is None:
+            output.unmatched([tr.path for tr in self._tracks], 'release not available',
+                             'Album "{0}" release not available (no changes made)'.format(self._title))
+            return
+
+        return album, [medium['track-list'] for medium in release['release']['medium-list']]
+
+    def release_by_id(self, release_id: str) -> Tuple[Dict, List[List[Dict]]]:
+        """Get a MusicBrainz release which is already known, without searching.
+
+        Arguments:
+            release_id: The MusicBrainz id of the release.
+
+        Returns:
+            The album and its track lists, in the same form as 'choose_release',
+            or None if the release isn't available.
+        """
+        release = providers.get_release(release_id)
+
+        # Releases cached by older versions of yamr don't include their artists
+        if release is None or 'artist-credit' not in release['release']:
             return
 
-        release = musicbrainzngs.get_release_by_id(album['id'], includes='recordings')
-        track_list = release['release']['medium-list'][0]['track-list']
+        return release['release'], [medium['track-list'] for medium in release['release']['medium-list']]
+
+    def rename_tracks(self, dry_run: bool, release: Tuple[Dict, List[List[Dict]]] = None) -> None:
+        """Rename all of the tracks in the album.
+
+        Arguments:
+            dry_run: Whether or not make any changes.
+            release: The chosen album and its track lists, if not given the
+                album will be chosen now.
+        """
+        if release is None:
+            release = self.choose_release()
+
+            if release is None:
+                return
+
+        album, track_lists = release
 
         # rename tracks in order to make visual checks simpler
         for tr in sorted(self._tracks, key=lambda t: t.sortable_data()):
-            tr.rename(dry_run, album=album, track_list=track_list)
+            tr.rename(dry_run, album=album, track_lists=track_lists)
 
     def _determine_album(self, title: str) -> Dict:
         """Use the MusicBrainz api and information extracted by Guessit to
@@ -82,10 +133,7 @@ class Album():
         Returns:
             The album we are renaming, as chosen by the user.
         """
-        yamr = sys.modules[__name__.split('.')[0]]
-        musicbrainzngs.set_useragent(yamr.__title__, yamr.__version__, yamr.__homepage__)
-
-        musicbrainz_albums = musicbrainzngs.search_releases(self._title, limit=100)['release-list']
+        musicbrainz_albums = providers.search_releases(self._title, self._artist)
 
         known_albums = []
         valid_musicbrainz_albums = []
@@ -101,7 +149,9 @@ class Album():
         if not valid_musicbrainz_albums:
             return
 
-        print('\nMusicBrainz search results for "{0}"'.format(colorama.Fore.LIGHTBLUE_EX + self._title + colorama.Fore.RESET))
+        query = self._title if self._artist is None else '{0} - {1}'.format(self._artist, self._title)
+
+        print('\nMusicBrainz search results for "{0}"'.format(colorama.Fore.LIGHTBLUE_EX + query + colorama.Fore.RESET))
 
         def _print_album(index: int, album: dict) -> None:
             number = colorama.Fore.LIGHTBLUE_EX + str(index) + '.' + colorama.Fore.RESET
@@ -119,17 +169,28 @@ class Album():
             else:
                 print('{0} {1} - {2} ({3})'.format(number, artist_name, album_title, album_release))
 
-        return user_input.prompt_choice(valid_musicbrainz_albums, _print_album)
+        def _describe_album(album: dict) -> dict:
+            return {'id': album['id'], 'title': album['title'], 'artist': album.get('artist-credit-phrase')}
+
+        return user_input.prompt_choice(valid_musicbrainz_albums, _print_album,
+                                        score=lambda al: scoring.score_album(al, title, len(self._tracks),
+                                                                             self._artist),
+                                        describe=_describe_album,
+                                        query={'kind': 'album', 'title': title, 'artist': self._artist,
+                                               'files': [tr.path for tr in self._tracks]})
 
     def sortable_data(self) -> Tuple[str, int, List[int]]:
         """See super class."""
         return self._info['title'], self._info['episode_title'], self._info['episode']
 
+    def __iter__(self):
+        return iter(sorted(self._tracks, key=lambda t: t.sortable_data()))
+
     def __len__(self) -> int:
         return len(self._tracks)
 
     def __repr__(self) -> str:
-        album_title = self._title
+        album_title = self._title if self._artist is None else '{0} - {1}'.format(self._artist, self._title)
         track_count = len(self._tracks)
 
         return 'Album "{0}" with {1} tracks'.format(album_title, track_count)
@@ -21,13 +21,15 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 import re
 
 import colorama
-import imdb
 
 from . import media_abc
+from ..helper import output
 
 
 class Episode(media_abc.Media):
     """Class which represents a single episode from a tv show."""
+    __slots__ = ()
+
     def __init__(self, path: str, info: dict = None, overrides: dict = None) -> None:
         """See super class."""
         super().__init__(path, info, overrides)
@@ -36,9 +38,9 @@ class Episode(media_abc.Media):
         for req in [r for r in ['title', 'season', 'episode'] if r not in self._info]:
             raise ValueError('Error: Filename lacks a {0}.'.format(req))
 
-        # Ensure the 'episode' key corresponds to a list object
-        if not isinstance(self._info['episode'], list):
-            self._info['episode'] = [self._info['episode']]
+        # Ensure the 'episode' key corresponds to a sequence of episodes
+        if not isinstance(self._info['episode'], (list, tuple)):
+            self._info['episode'] = (self._info['episode'],)
 
     def rename(self, dry_run: bool, **kwargs) -> None:
         """See super class."""
@@ -54,7 +56,8 @@ class Episode(media_abc.Media):
             se_num = str(season_num).zfill(2)
             ep_num = str(self._info['episode'][0]).zfill(2)
 
-            print('"{0}S{1}E{2}{3}" not found (no changes made)'.format(colorama.Fore.LIGHTRED_EX, se_num, ep_num, colorama.Fore.RESET))
+            output.unmatched([self.path], 'episode not found', '"{0}S{1}E{2}{3}" not found (no changes made)'.format(
+                colorama.Fore.LIGHTRED_EX, se_num, ep_num, colorama.Fore.RESET))
             return
 
         try:
@@ -63,7 +66,8 @@ class Episode(media_abc.Media):
             se_num = str(season_num).zfill(2)
             ep_num = str(self._info['episode'][0]).zfill(2)
 
-            print('"{0}S{1}E{2}{3}" not found (no changes made)'.format(colorama.Fore.LIGHTRED_EX, se_num, ep_num, colorama.Fore.RESET))
+            output.unmatched([self.path], 'episode not found', '"{0}S{1}E{2}{3}" not found (no changes made)'.format(
+                colorama.Fore.LIGHTRED_EX, se_num, ep_num, colorama.Fore.RESET))
             return
 
         episode_info = ''
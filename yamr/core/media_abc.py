@@ -23,8 +23,12 @@ import os.path
 import re
 import sys
 
-import colorama
-import guessit
+from typing import Iterable, Tuple
+
+from . import sidecar
+from ..helper import media_info
+from ..helper import parser
+from ..helper import stats
 
 
 LANGUAGE_CODES = ['en']
@@ -35,7 +39,12 @@ class Media(metaclass=abc.ABCMeta):
 
     Abstract class which outlines the functions that a class must implement to
     be supported by yamr.
+
+    Libraries can contain millions of media files, so instances are slotted and
+    the directory, which is shared by many media files, is interned.
     """
+    __slots__ = ('_directory', '_name', '_info', '_target', '_sidecars')
+
     def __init__(self, path: str, info: dict = None, overrides: dict = None) -> None:
         """Instantiate the Media abstract class.
 
@@ -44,11 +53,17 @@ class Media(metaclass=abc.ABCMeta):
             info: Filename info generated by guessit.
             overrides: Overriding values for the info dictionary.
         """
-        self._path = path
-        self._info = info
+        self._directory, self._name = os.path.split(path)
+        self._directory = sys.intern(self._directory)
+        self._target = None
+        self._sidecars = ()
 
         if info is None:
-            self._info = guessit.guessit(self.filename)
+            self._info = parser.parse(self.filename)
+        elif isinstance(info, media_info.MediaInfo):
+            self._info = info
+        else:
+            self._info = media_info.MediaInfo(info)
 
         if overrides is not None:
             for key in overrides:
@@ -56,17 +71,45 @@ class Media(metaclass=abc.ABCMeta):
 
     @property
     def path(self) -> str:
-        return self._path
+        return os.path.join(self._directory, self._name)
 
     @path.setter
     def path(self, value: str) -> None:
-        if self._path != value:
-            os.rename(self._path, value)
-            self._path = value
+        if self.path != value:
+            os.rename(self.path, value)
+            self._directory, self._name = os.path.split(value)
+            self._directory = sys.intern(self._directory)
+
+    @property
+    def sidecars(self) -> Tuple[sidecar.Sidecar, ...]:
+        """The files which accompany this media file, and are renamed with it."""
+        return self._sidecars
+
+    def attach(self, paths: Iterable[str]) -> None:
+        """Attach files which accompany this media file e.g. its subtitles.
+
+        Arguments:
+            paths: The paths to the files, which must be named after this media file.
+        """
+        self._sidecars += tuple(sidecar.Sidecar(path, self) for path in paths)
+
+    @property
+    def target(self) -> str:
+        """The path proposed by 'rename', or None if a rename wasn't proposed."""
+        if self._target is None:
+            return None
+
+        # Only the filename is stored, media files are renamed within their directory
+        return os.path.join(self._directory, self._target)
+
+    @property
+    def settled(self) -> bool:
+        """Whether the file has been renamed, or was found to already be correct."""
+        return self._target is not None and self._name == self._target
 
     @property
     def filename(self) -> str:
-        return os.path.basename(self._path)
+        return self._name
 
     @filename.setter
     def filename(self, value: str) -> None:
@@ -92,30 +135,17 @@ class Media(metaclass=abc.ABCMeta):
         raise NotImplementedError
 
     def _rename(self, new_filename: str, dry_run: bool) -> None:
-        """Perform the rename at the filesystem level.
+        """Propose a new filename for the media file.
 
-        Prettify the rename and display it to the user.
+        The rename is performed later by the planner, once every proposed
+        rename has been checked for collisions.
 
         Arguments:
             new_filename: The filename generated by YAMR.
-            dry_run: Whether or not to *actually* perform the rename.
+            dry_run: Unused, dry runs are handled by the planner.
         """
-        if self.filename == new_filename:
-            original = colorama.Fore.LIGHTGREEN_EX + self.filename + colorama.Fore.RESET
-
-            print('Filename "{0}" is already correct (no changes made)'.format(original))
-        elif os.path.exists(new_filename):
-            new_filename = colorama.Fore.LIGHTRED_EX + new_filename + colorama.Fore.RESET
-
-            print('Filename "{0}" already exists (no changes made)'.format(new_filename))
-        else:
-            original = colorama.Fore.LIGHTRED_EX + self.filename + colorama.Fore.RESET
-            new = colorama.Fore.LIGHTGREEN_EX + os.path.basename(new_filename) + colorama.Fore.RESET
-
-            print('"{0}" -> "{1}"'.format(original, new))
-
-            if not dry_run:
-                self.filename = new_filename
+        self._target = new_filename
+        stats.increment('media.proposed')
 
     @abc.abstractmethod
     def sortable_data(self) -> tuple:
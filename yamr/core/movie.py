@@ -18,17 +18,19 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
-import re
-
-import colorama
-import imdb
+from typing import TYPE_CHECKING
 
 from . import media_abc
-from ..helper import user_input
+
+# IMDbPY is imported by the providers, only once a search is made
+if TYPE_CHECKING:
+    import imdb
 
 
 class Movie(media_abc.Media):
     """Class which represents a single movie."""
+    __slots__ = ('_imdb_movie',)
+
     def __init__(self, path: str, info: dict = None, overrides: dict = None) -> None:
         """See super class."""
         super().__init__(path, info, overrides)
@@ -37,17 +39,25 @@ class Movie(media_abc.Media):
         for req in [r for r in ['title'] if r not in self._info]:
             raise ValueError('Error: Filename lacks a {0}.'.format(req))
 
+        # The movie, when it was identified without searching e.g. by its fingerprint
+        self._imdb_movie = None
+
+    @property
+    def identified(self) -> bool:
+        return self._imdb_movie is not None
+
+    def identify(self, imdb_movie: 'imdb.Movie.Movie') -> None:
+        """Rename this movie after an IMDB title which is already known, rather
+        than searching for it.
+
+        Arguments:
+            imdb_movie: The IMDB title this movie is.
+        """
+        self._imdb_movie = imdb_movie
+
     def rename(self, dry_run: bool, **kwargs) -> None:
         """See super class."""
-        try:
-            imdb_movie = self._determine_movie(self._info['title'], self._info['year'])
-        except KeyError:
-            imdb_movie = self._determine_movie(self._info['title'])
-
-        # There weren't any search results
-        if imdb_movie is None:
-            print('Movie "{0}" skipped or not found (no changes made)'.format(self._info['title']))
-            return
+        imdb_movie = self._imdb_movie or kwargs['imdb_movie']
 
         movie_title = imdb_movie['title']
 
@@ -57,55 +67,19 @@ class Movie(media_abc.Media):
             movie_year = None
 
         if movie_year is None:
-            new_filename = '{0}{1}'.format(movie_title, self.file_extension)
+            new_filename = movie_title
         else:
-            new_filename = '{0} ({1}){2}'.format(movie_title, movie_year, self.file_extension)
+            new_filename = '{0} ({1})'.format(movie_title, movie_year)
+
+        # Movies which are split across several files keep their part number
+        for part in [p for p in ['cd', 'part'] if p in self._info]:
+            new_filename += ' - {0}{1}'.format(part, self._info[part])
 
-        self._rename(new_filename, dry_run)
+        self._rename(new_filename + self.file_extension, dry_run)
 
     def sortable_data(self) -> tuple:
         """See super class."""
-        try:
-            # Attempt to return 'year' to allow for better sorting.
-            return (self._info['title'], self._info['year'])
-        except KeyError:
-            return self._info['title']
-
-    def _determine_movie(self, title: str, year: bool = None) -> imdb.Movie.Movie:
-        """Use the IMDB api and information extracted by Guessit to
-        determine which movie we are renaming.
-
-        Arguments:
-            title: The title of the movie extracted by Guessit.
-            year: The year of the movie extracted by Guessit.
-
-        Returns:
-            The movie we are renaming, as chosen by the user.
-        """
-        if year is None:
-            imdb_movies = imdb.IMDb().search_movie(title)
-        else:
-            imdb_movies = imdb.IMDb().search_movie('{0} {1}'.format(title, year))
-
-        valid_imdb_movies = [mo for mo in imdb_movies if re.search('movie', mo['kind'])]
-
-        if not valid_imdb_movies:
-            return
-
-        if year is None:
-            print('\nIMDB search results for "{0}{1}{2}"'.format(colorama.Fore.LIGHTBLUE_EX, title, colorama.Fore.RESET))
-        else:
-            print('\nIMDB search results for "{0}{1} ({2}){3}"'.format(colorama.Fore.LIGHTBLUE_EX, title, year, colorama.Fore.RESET))
-
-        def _print_movie(index: int, movie: imdb.Movie.Movie) -> None:
-            number = colorama.Fore.LIGHTBLUE_EX + str(index) + '.' + colorama.Fore.RESET
-
-            try:
-                print('{0} {1} ({2})'.format(number, movie['title'], movie['year']))
-            except KeyError:
-                print('{0} {1}'.format(number, movie['title']))
-
-        return user_input.prompt_choice(valid_imdb_movies, _print_movie)
+        return (self._info['title'], self._info.get('year') or 0, self._info.get('cd') or self._info.get('part') or 0)
 
     def __repr__(self):
         title = self._info['title']
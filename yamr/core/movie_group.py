@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+This file is part of yamr "Yet Another Media Renamer".
+
+Copyright (C) 2019, James Lee <jamesl33info@gmail.com>.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import re
+
+from typing import TYPE_CHECKING
+
+import colorama
+
+from . import movie
+from ..helper import output
+from ..helper import providers
+from ..helper import scoring
+from ..helper import stats
+from ..helper import user_input
+
+# IMDbPY is imported by the providers, only once a search is made
+if TYPE_CHECKING:
+    import imdb
+
+
+class MovieGroup():
+    """Class representing the files of an individual movie.
+
+    Container class which represents every file named after the same movie e.g.
+    each part of a movie split across several discs. The instance will contain
+    multiple 'Movie' instances, which are identified by a single search.
+    """
+    def __init__(self, title: str, year: int = None) -> None:
+        """Instantiate the MovieGroup class.
+
+        Arguments:
+            title: The title of the movie that this instance is representing.
+            year: The year of the movie, if known.
+        """
+        self._title = title
+        self._year = year
+        self._movies = []
+
+    def add(self, mo: movie.Movie) -> None:
+        """Add a new file to the movie.
+
+        Arguments:
+            mo: The file being added to the movie.
+        """
+        self._movies.append(mo)
+
+    @property
+    def identified(self) -> bool:
+        """Whether every file has been identified without searching."""
+        return all(mo.identified for mo in self._movies)
+
+    def prefetch(self) -> None:
+        """Start searching IMDB for this movie in the background."""
+        if self.identified:
+            return
+
+        providers.prefetch(providers.search_movie, self._title, self._year)
+
+    @stats.timed('lookup.movie')
+    def choose_movie(self) -> 'imdb.Movie.Movie':
+        """Determine which IMDB movie this instance represents.
+
+        Returns:
+            The movie chosen by the user, or None if it was skipped or not found.
+        """
+        imdb_movie = self._determine_movie(self._title, self._year)
+
+        # There weren't any search results
+        if imdb_movie is None:
+            output.unmatched([mo.path for mo in self._movies if not mo.identified], 'movie skipped or not found',
+                             'Movie "{0}" skipped or not found (no changes made)'.format(self._title))
+
+        return imdb_movie
+
+    def rename_movies(self, dry_run: bool, imdb_movie: 'imdb.Movie.Movie' = None, choose: bool = True) -> None:
+        """Rename all the files of the movie.
+
+        Arguments:
+            dry_run: Whether or not make any changes.
+            imdb_movie: The chosen movie, if not given the movie will be chosen
+                now, unless every file has already been identified.
+            choose: Whether to choose the movie when it isn't given, False if
+                the caller has already chosen and the movie was skipped.
+        """
+        if choose and imdb_movie is None and not self.identified:
+            imdb_movie = self.choose_movie()
+
+        for mo in self:
+            if mo.identified or imdb_movie is not None:
+                mo.rename(dry_run, imdb_movie=imdb_movie)
+
+    def _determine_movie(self, title: str, year: int = None) -> 'imdb.Movie.Movie':
+        """Use the IMDB api and information extracted by Guessit to
+        determine which movie we are renaming.
+
+        Arguments:
+            title: The title of the movie extracted by Guessit.
+            year: The year of the movie extracted by Guessit.
+
+        Returns:
+            The movie we are renaming, as chosen by the user.
+        """
+        imdb_movies = providers.search_movie(title, year)
+
+        valid_imdb_movies = [mo for mo in imdb_movies if re.search('movie', mo['kind'])]
+
+        if not valid_imdb_movies:
+            return
+
+        if year is None:
+            print('\nIMDB search results for "{0}{1}{2}"'.format(colorama.Fore.LIGHTBLUE_EX, title, colorama.Fore.RESET))
+        else:
+            print('\nIMDB search results for "{0}{1} ({2}){3}"'.format(colorama.Fore.LIGHTBLUE_EX, title, year, colorama.Fore.RESET))
+
+        def _print_movie(index: int, movie: 'imdb.Movie.Movie') -> None:
+            number = colorama.Fore.LIGHTBLUE_EX + str(index) + '.' + colorama.Fore.RESET
+
+            try:
+                print('{0} {1} ({2})'.format(number, movie['title'], movie['year']))
+            except KeyError:
+                print('{0} {1}'.format(number, movie['title']))
+
+        def _describe_movie(movie: 'imdb.Movie.Movie') -> dict:
+            return {'id': movie.movieID, 'title': movie['title'], 'year': movie.get('year')}
+
+        return user_input.prompt_choice(valid_imdb_movies, _print_movie,
+                                        score=lambda mo: scoring.score_movie(mo, title, year),
+                                        describe=_describe_movie,
+                                        query={'kind': 'movie', 'title': title, 'year': year,
+                                               'files': [mo.path for mo in self._movies]})
+
+    def __iter__(self):
+        return iter(sorted(self._movies, key=lambda m: m.sortable_data()))
+
+    def __len__(self) -> int:
+        return len(self._movies)
+
+    def __repr__(self):
+        title = self._title
+        file_count = len(self._movies)
+
+        return 'Movie "{0}" with {1} files'.format(title, file_count)
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+This file is part of yamr "Yet Another Media Renamer".
+
+Copyright (C) 2019, James Lee <jamesl33info@gmail.com>.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import os.path
+
+from typing import TYPE_CHECKING
+
+# Only needed for type hints, 'media_abc' imports this module
+if TYPE_CHECKING:
+    from . import media_abc
+
+
+class Sidecar():
+    """Class representing a file which accompanies a media file e.g. its subtitles.
+
+    Sidecars aren't identified by themselves, they're renamed after the media
+    file they accompany, keeping whatever followed its name e.g. '.en.srt'.
+    """
+    __slots__ = ('_path', '_media', '_suffix')
+
+    def __init__(self, path: str, media: 'media_abc.Media') -> None:
+        """Instantiate the Sidecar class.
+
+        Arguments:
+            path: The path to the sidecar on disk.
+            media: The media file which this sidecar accompanies.
+        """
+        self._path = path
+        self._media = media
+        self._suffix = os.path.basename(path)[len(os.path.splitext(media.filename)[0]):]
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @path.setter
+    def path(self, value: str) -> None:
+        if self._path != value:
+            os.rename(self._path, value)
+            self._path = value
+
+    @property
+    def target(self) -> str:
+        """The path the media file will be renamed to, with this sidecar's suffix."""
+        if self._media.target is None:
+            return None
+
+        stem = os.path.splitext(os.path.basename(self._media.target))[0]
+
+        return os.path.join(os.path.dirname(self._path), stem + self._suffix)
+
+    @property
+    def settled(self) -> bool:
+        """See 'media_abc.Media.settled'."""
+        return self.target is not None and self._path == self.target
+
+    def __repr__(self):
+        return 'Sidecar "{0}" of {1}'.format(os.path.basename(self._path), self._media)
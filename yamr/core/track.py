@@ -20,10 +20,13 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 
 from .media_abc import Media
+from ..helper import output
 
 
 class Track(Media):
     """Class which represents a single track from an artists album."""
+    __slots__ = ()
+
     def __init__(self, path, info=None, overrides=None):
         """See super class."""
         super().__init__(path, info, overrides)
@@ -38,12 +41,19 @@ class Track(Media):
         """See super class."""
         artist_name = kwargs['album']['artist-credit'][0]['artist']['name']
         album_name = kwargs['album']['title']
+        track_lists = kwargs['track_lists']
+        disc = self._info.get('disc', 1)
         track_num = str(self._info['episode']).zfill(2)
 
+        # The disc is only included for albums which have more than one
+        if len(track_lists) > 1:
+            track_num = '{0}-{1}'.format(disc, track_num)
+
         try:
-            track_name = kwargs['track_list'][self._info['episode'] - 1]['recording']['title']
+            track_name = track_lists[disc - 1][self._info['episode'] - 1]['recording']['title']
         except IndexError:
-            print('"{0}" track {1} not found (no changes made)'.format(album_name, track_num))
+            output.unmatched([self.path], 'track not found',
+                             '"{0}" track {1} not found (no changes made)'.format(album_name, track_num))
             return
 
         new_filename = '{0} - {1} - {2} - {3}{4}'.format(artist_name, album_name, track_num,
@@ -54,7 +64,7 @@ class Track(Media):
 
     def sortable_data(self):
         """See super class."""
-        return self._info['title'], self._info['episode']
+        return self._info['title'], self._info.get('disc', 1), self._info['episode']
 
     def __repr__(self):
         track_num = self._info['episode']
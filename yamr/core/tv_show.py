@@ -20,12 +20,21 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import re
 
+from typing import TYPE_CHECKING
+
 import colorama
-import imdb
 
 from . import episode
+from ..helper import output
+from ..helper import providers
+from ..helper import scoring
+from ..helper import stats
 from ..helper import user_input
 
+# IMDbPY is imported by the providers, only once a search is made
+if TYPE_CHECKING:
+    import imdb
+
 
 class TVShow():
     """Class representing an individual TV show.
@@ -33,13 +42,15 @@ class TVShow():
     Container class which represents a full TV show. The instance will contain
     multiple 'Episode' instances.
     """
-    def __init__(self, title: str) -> None:
+    def __init__(self, title: str, year: int = None) -> None:
         """Instantiate the TVShow class.
 
         Arguments:
             title: The title of the TV show that this instance is representing.
+            year: The year the TV show started, if it's in the filenames.
         """
         self._title = title
+        self._year = year
         self._episodes = []
 
     def add(self, episode: episode.Episode) -> None:
@@ -50,26 +61,77 @@ class TVShow():
         """
         self._episodes.append(episode)
 
-    def rename_episodes(self, dry_run: bool) -> None:
-        """Rename all the episodes in the TV show.
+        if self._year is None:
+            self._year = episode._info.get('year')
 
-        Arguments:
-            dry_run: Whether or not make any changes.
+    @property
+    def year(self) -> int:
+        """The year the TV show started, if it's in the filenames."""
+        return self._year
+
+    def prefetch(self) -> None:
+        """Start searching IMDB for this TV show in the background."""
+        providers.prefetch(providers.search_movie, self._title)
+
+    @stats.timed('lookup.show')
+    def choose_show(self) -> 'imdb.Movie.Movie':
+        """Determine which IMDB TV show this instance represents.
+
+        Returns:
+            The show chosen by the user, or None if it was skipped or not found.
         """
         imdb_show = self._determine_show(self._title)
 
         # There weren't any search results
         if imdb_show is None:
-            print('TV show "{0}" skipped or not found (no changes made)'.format(self._title))
-            return
+            output.unmatched([ep.path for ep in self._episodes], 'show skipped or not found',
+                             'TV show "{0}" skipped or not found (no changes made)'.format(self._title))
+
+        return imdb_show
+
+    @stats.timed('lookup.episodes')
+    def fetch_episodes(self, imdb_show: 'imdb.Movie.Movie') -> 'imdb.Movie.Movie':
+        """Fetch the episodes of the chosen show, this is safe to run in a
+        background thread.
+
+        Only the seasons which the episodes belong to are fetched, seasons
+        which were fetched for an earlier batch of episodes are kept.
+
+        Arguments:
+            imdb_show: The show returned by 'choose_show'.
 
-        imdb.IMDb().update(imdb_show, 'episodes')
+        Returns:
+            The same show, with its 'episodes' populated.
+        """
+        fetched = imdb_show.get('episodes') or {}
+        seasons = sorted(set(ep._info['season'] for ep in self._episodes) - set(fetched))
+
+        if seasons:
+            providers.update_episodes(imdb_show, seasons)
+
+        return imdb_show
+
+    def rename_episodes(self, dry_run: bool, imdb_show: 'imdb.Movie.Movie' = None) -> None:
+        """Rename all the episodes in the TV show.
+
+        Arguments:
+            dry_run: Whether or not make any changes.
+            imdb_show: The chosen show with its episodes fetched, if not given
+                the show will be chosen and fetched now.
+        """
+        if imdb_show is None:
+            imdb_show = self.choose_show()
+
+            if imdb_show is None:
+                return
+
+            self.fetch_episodes(imdb_show)
 
         # rename episodes in season/episode sorted order to make visual checks simpler
         for ep in sorted(self._episodes, key=lambda e: e.sortable_data()):
             ep.rename(dry_run, imdb_show=imdb_show)
 
-    def _determine_show(self, title: str) -> imdb.Movie.Movie:
+    def _determine_show(self, title: str) -> 'imdb.Movie.Movie':
         """Use the IMDB api and information extracted by Guessit to
         determine which TV show we are renaming.
 
@@ -79,7 +141,7 @@ class TVShow():
         Returns:
             The show we are renaming, as chosen by the user.
         """
-        imdb_shows = imdb.IMDb().search_movie(title)
+        imdb_shows = providers.search_movie(title)
 
         valid_imdb_shows = [mo for mo in imdb_shows if re.search('tv series', mo['kind'])]
 
@@ -91,12 +153,22 @@ class TVShow():
         def _print_show(index: int, show: dict) -> None:
             number = colorama.Fore.LIGHTBLUE_EX + str(index) + '.' + colorama.Fore.RESET
 
-            if show['year'] == '':
+            if not show.get('year'):
                 print('{0} {1}'.format(number, show['title']))
             else:
                 print('{0} {1} ({2})'.format(number, show['title'], show['year']))
 
-        return user_input.prompt_choice(valid_imdb_shows, _print_show)
+        def _describe_show(show: 'imdb.Movie.Movie') -> dict:
+            return {'id': show.movieID, 'title': show['title'], 'year': show.get('year')}
+
+        return user_input.prompt_choice(valid_imdb_shows, _print_show,
+                                        score=lambda sh: scoring.score_show(sh, title, self._year),
+                                        describe=_describe_show,
+                                        query={'kind': 'tv show', 'title': title, 'year': self._year,
+                                               'files': [ep.path for ep in self._episodes]})
+
+    def __iter__(self):
+        return iter(sorted(self._episodes, key=lambda e: e.sortable_data()))
 
     def __len__(self) -> int:
         return len(self._episodes)
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+This file is part of yamr "Yet Another Media Renamer".
+
+Copyright (C) 2019, James Lee <jamesl33info@gmail.com>.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from typing import TypeVar
+
+from . import stats
+
+
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024  # Bytes
+
+MAX_PENDING_WRITES = 1024
+
+T = TypeVar('T')  # Generic type
+
+
+def default_directory() -> str:
+    """Get the directory yamr should store its cache in by default.
+
+    Returns:
+        The path to the cache directory, following the XDG specification.
+    """
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+
+    return os.path.join(base, 'yamr')
+
+
+class Cache():
+    """Class representing a persistent key/value cache.
+
+    Values are pickled and stored in a SQLite database, once the total size of
+    the stored values exceeds the maximum size the least recently used entries
+    are evicted. Writes are buffered in memory and committed in one short
+    transaction by 'flush', so the database is never locked for long when
+    it's shared with other yamr processes.
+    """
+    def __init__(self, path: str, max_size: int = DEFAULT_MAX_SIZE) -> None:
+        """Instantiate the Cache class.
+
+        Arguments:
+            path: The path to the SQLite database, it will be created if missing.
+            max_size: The maximum total size of the stored values in bytes.
+        """
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self._max_size = max_size
+        self._lock = threading.Lock()
+
+        self._accessed = {}
+        self._written = {}
+
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('CREATE TABLE IF NOT EXISTS entries (namespace TEXT, key TEXT, value BLOB, '
+                                 'size INTEGER, created REAL, accessed REAL, PRIMARY KEY (namespace, key))')
+        self._connection.execute('CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)')
+        self._connection.commit()
+
+        self._size = self._connection.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+
+    def get(self, namespace: str, key: str, ttl: float = None) -> T:
+        """Get a value from the cache.
+
+        Arguments:
+            namespace: The namespace the key belongs to.
+            key: The key the value was stored under.
+            ttl: How long the value is valid for in seconds, None means forever.
+
+        Returns:
+            The cached value or None if there isn't a valid one.
+        """
+        with self._lock:
+            row = self._written.get((namespace, key))
+
+            if row is None:
+                row = self._connection.execute('SELECT value, created FROM entries WHERE namespace = ? AND key = ?',
+                                               (namespace, key)).fetchone()
+
+            if row is not None and (ttl is None or time.time() - row[1] <= ttl):
+                self._accessed[(namespace, key)] = time.time()
+            else:
+                row = None
+
+        stats.increment('cache.{0}.{1}'.format(namespace, 'misses' if row is None else 'hits'))
+
+        return None if row is None else pickle.loads(row[0])
+
+    def put(self, namespace: str, key: str, value: T) -> None:
+        """Store a value in the cache, it's written to disk by the next 'flush'.
+
+        Arguments:
+            namespace: The namespace the key belongs to.
+            key: The key to store the value under.
+            value: Any value which can be pickled.
+        """
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+        with self._lock:
+            self._written[(namespace, key)] = (blob, time.time())
+            pending = len(self._written)
+
+        if pending >= MAX_PENDING_WRITES:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write any buffered changes to disk, evicting old entries if required."""
+        with self._lock:
+            if not self._written and not self._accessed:
+                return
+
+            with self._connection:
+                self._connection.executemany('UPDATE entries SET accessed = ? WHERE namespace = ? AND key = ?',
+                                             [(t, n, k) for (n, k), t in self._accessed.items()
+                                              if (n, k) not in self._written])
+
+                for (namespace, key), (blob, created) in self._written.items():
+                    row = self._connection.execute('SELECT size FROM entries WHERE namespace = ? AND key = ?',
+                                                   (namespace, key)).fetchone()
+
+                    if row is not None:
+                        self._size -= row[0]
+
+                    accessed = self._accessed.get((namespace, key), created)
+
+                    self._connection.execute('INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)',
+                                             (namespace, key, blob, len(blob), created, accessed))
+
+                    self._size += len(blob)
+
+                if self._size > self._max_size:
+                    self._evict()
+
+            self._accessed.clear()
+            self._written.clear()
+
+    def close(self) -> None:
+        """Write any buffered changes and close the underlying database."""
+        self.flush()
+        self._connection.close()
+
+    def _evict(self) -> None:
+        """Remove the least recently used entries until there is some headroom."""
+        target = self._max_size * 0.9
+
+        rows = self._connection.execute('SELECT namespace, key, size FROM entries ORDER BY accessed').fetchall()
+
+        evicted = []
+
+        for namespace, key, size in rows:
+            if self._size <= target:
+                break
+
+            evicted.append((namespace, key))
+            self._size -= size
+
+        self._connection.executemany('DELETE FROM entries WHERE namespace = ? AND key = ?', evicted)
+
+    def __len__(self) -> int:
+        self.flush()
+
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
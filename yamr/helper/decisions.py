@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+This file is part of yamr "Yet Another Media Renamer".
+
+Copyright (C) 2019, James Lee <jamesl33info@gmail.com>.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import json
+import os
+
+from typing import Dict, List
+
+from . import scoring
+
+
+FILENAME = 'decisions.json'
+VERSION = 1
+
+ALBUM = 'album'
+MOVIE = 'movie'
+SHOW = 'show'
+
+KINDS = [ALBUM, MOVIE, SHOW]
+
+
+def default_location() -> str:
+    """Get the path yamr should store decisions in by default.
+
+    Returns:
+        The path to the decision store, following the XDG specification.
+    """
+    base = os.environ.get('XDG_DATA_HOME') or os.path.join(os.path.expanduser('~'), '.local', 'share')
+
+    return os.path.join(base, 'yamr', FILENAME)
+
+
+class DecisionStore():
+    """Class representing the choices the user has made in previous runs.
+
+    Each decision maps a parsed title, and year when it's known, to the IMDB id
+    or MusicBrainz release id which was chosen for it. Titles are normalized
+    so cosmetic differences in filenames still match. Unlike the cache, the
+    decisions are never expired.
+    """
+    def __init__(self, path: str) -> None:
+        """Instantiate the DecisionStore class.
+
+        Arguments:
+            path: The path to the decision store, it will be created on save.
+        """
+        self._path = path
+        self._decisions = {}
+        self._changed = False
+
+        try:
+            with open(path) as decisions_file:
+                decisions = json.load(decisions_file)
+        except (OSError, ValueError):
+            return
+
+        if decisions.get('version') == VERSION:
+            self._decisions = decisions['decisions']
+
+    @classmethod
+    def key(cls, kind: str, title: str, year: int = None) -> str:
+        """Get the key a decision is stored under.
+
+        Arguments:
+            kind: The kind of media e.g. 'movie'.
+            title: The title parsed from the filename.
+            year: The year parsed from the filename, if any.
+
+        Returns:
+            The key e.g. "movie:blade runner:1982".
+        """
+        if year is None:
+            return '{0}:{1}'.format(kind, scoring.normalize(title))
+
+        return '{0}:{1}:{2}'.format(kind, scoring.normalize(title), year)
+
+    def get(self, kind: str, title: str, year: int = None) -> str:
+        """Get the id which was chosen for a title.
+
+        Arguments:
+            kind: The kind of media e.g. 'movie'.
+            title: The title parsed from the filename.
+            year: The year parsed from the filename, if any.
+
+        Returns:
+            The IMDB or MusicBrainz id, or None if a choice hasn't been made.
+        """
+        decision = self._decisions.get(self.key(kind, title, year))
+
+        return None if decision is None else decision['id']
+
+    def remember(self, kind: str, title: str, year: int, provider_id: str, name: str = None) -> None:
+        """Remember the id which was chosen for a title.
+
+        Arguments:
+            kind: The kind of media e.g. 'movie'.
+            title: The title parsed from the filename.
+            year: The year parsed from the filename, if any.
+            provider_id: The IMDB or MusicBrainz id which was chosen.
+            name: A human readable description of the choice.
+        """
+        decision = {'id': str(provider_id), 'name': name}
+
+        if self._decisions.get(self.key(kind, title, year)) != decision:
+            self._decisions[self.key(kind, title, year)] = decision
+            self._changed = True
+
+    def forget(self, key: str) -> bool:
+        """Forget a decision, so the user is asked again.
+
+        Arguments:
+            key: The key of the decision, see 'key'.
+
+        Returns:
+            Whether there was a decision to forget.
+        """
+        if self._decisions.pop(key, None) is None:
+            return False
+
+        self._changed = True
+
+        return True
+
+    def entries(self) -> List[Dict]:
+        """Get every decision, sorted by key.
+
+        Returns:
+            Each decision, with its 'key', 'id' and 'name'.
+        """
+        return [dict(self._decisions[key], key=key) for key in sorted(self._decisions)]
+
+    def save(self) -> None:
+        """Atomically write the decisions to disk, if any have changed."""
+        if not self._changed:
+            return
+
+        if os.path.dirname(self._path):
+            os.makedirs(os.path.dirname(self._path), exist_ok=True)
+
+        temporary = self._path + '.tmp'
+
+        with open(temporary, 'w') as decisions_file:
+            json.dump({'version': VERSION, 'decisions': self._decisions}, decisions_file, indent=4, sort_keys=True)
+
+        os.replace(temporary, self._path)
+        self._changed = False
+
+    def __len__(self) -> int:
+        return len(self._decisions)
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+This file is part of yamr "Yet Another Media Renamer".
+
+Copyright (C) 2019, James Lee <jamesl33info@gmail.com>.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import json
+import os
+import struct
+import urllib.parse
+import urllib.request
+
+from concurrent import futures
+from typing import Dict, Iterable, Optional, Union
+
+from . import stats
+
+
+# The hash used by subtitle databases covers this much of each end of the file
+BLOCK_SIZE = 64 * 1024
+
+DEFAULT_WORKERS = 8
+
+HTTP_TIMEOUT = 10.0
+
+
+def compute(path: str) -> Optional[str]:
+    """Compute the fingerprint of a video file.
+
+    This is the hash used by OpenSubtitles and other subtitle databases; the
+    size of the file plus the sum of the little endian 64 bit words in its first
+    and last 64 KiB. Only those two blocks are read, regardless of file size.
+
+    Arguments:
+        path: The path to the video file.
+
+    Returns:
+        The fingerprint as 16 hexadecimal digits, or None if the file couldn't
+        be read or is too small to fingerprint.
+    """
+    with stats.timer('fingerprint.compute'):
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            return None
+
+        try:
+            size = os.fstat(fd).st_size
+
+            if size < BLOCK_SIZE * 2:
+                return None
+
+            head = os.pread(fd, BLOCK_SIZE, 0)
+            tail = os.pread(fd, BLOCK_SIZE, size - BLOCK_SIZE)
+        except OSError:
+            return None
+        finally:
+            os.close(fd)
+
+    words = struct.unpack('<{0}Q'.format(BLOCK_SIZE // 8), head) + struct.unpack('<{0}Q'.format(BLOCK_SIZE // 8), tail)
+
+    return '{0:016x}'.format((size + sum(words)) & 0xffffffffffffffff)
+
+
+def compute_all(paths: Iterable[str], workers: int = DEFAULT_WORKERS) -> Dict[str, str]:
+    """Compute the fingerprints of many video files in parallel.
+
+    Hashing is dominated by seeking to the end of each file, so a thread pool
+    keeps several reads in flight at once.
+
+    Arguments:
+        paths: The paths to the video files.
+        workers: The number of threads to use.
+
+    Returns:
+        The fingerprint of each file which could be fingerprinted, keyed by path.
+    """
+    paths = list(paths)
+
+    with futures.ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='yamr-fingerprint') as executor:
+        fingerprints = dict(zip(paths, executor.map(compute, paths)))
+
+    return {path: fingerprint for path, fingerprint in fingerprints.items() if fingerprint is not None}
+
+
+def open_index(location: str, offline: bool = False) -> Union['FileIndex', 'HTTPIndex']:
+    """Open a fingerprint index, which maps fingerprints to IMDB ids.
+
+    Arguments:
+        location: The path to an index file, or the URL of an index service.
+        offline: Whether an index service should never be queried.
+
+    Returns:
+        The index, which has a 'lookup' method.
+    """
+    if urllib.parse.urlparse(location).scheme in ('http', 'https'):
+        return HTTPIndex(location, offline=offline)
+
+    return FileIndex(location)
+
+
+class FileIndex():
+    """Class representing a fingerprint index stored in a local file.
+
+    Each line of the file contains a fingerprint and an IMDB id, separated by
+    whitespace. Blank lines, and lines starting with '#', are ignored.
+    """
+    def __init__(self, path: str) -> None:
+        """Instantiate the FileIndex class.
+
+        Arguments:
+            path: The path to the index file.
+        """
+        self._ids = {}
+
+        with open(path, 'r') as file:
+            for line in file:
+                fields = line.split()
+
+                if len(fields) >= 2 and not fields[0].startswith('#'):
+                    self._ids[fields[0].lower()] = fields[1]
+
+    def lookup(self, fingerprint: str) -> Optional[str]:
+        """Find the IMDB id of a video file.
+
+        Arguments:
+            fingerprint: The fingerprint of the video file.
+
+        Returns:
+            The IMDB id, or None if the fingerprint isn't in the index.
+        """
+        return self._ids.get(fingerprint.lower())
+
+
+class HTTPIndex():
+    """Class representing a fingerprint index served over HTTP.
+
+    The fingerprint is appended to the base URL, the service responds with a
+    JSON object containing an 'imdb_id' or a 404 if the fingerprint is unknown.
+    """
+    def __init__(self, url: str, timeout: float = HTTP_TIMEOUT, offline: bool = False) -> None:
+        """Instantiate the HTTPIndex class.
+
+        Arguments:
+            url: The base URL of the service.
+            timeout: How long to wait for each response in seconds.
+            offline: Whether to answer every lookup with no result instead of
+                querying the service.
+        """
+        self._url = url.rstrip('/') + '/'
+        self._timeout = timeout
+        self._offline = offline
+
+    def lookup(self, fingerprint: str) -> Optional[str]:
+        """See 'FileIndex.lookup'."""
+        if self._offline:
+            return None
+
+        with stats.timer('request.fingerprint'):
+            try:
+                with urllib.request.urlopen(self._url + fingerprint.lower(), timeout=self._timeout) as response:
+                    return json.loads(response.read().decode('utf-8')).get('imdb_id')
+            except (OSError, ValueError, AttributeError):
+                # Unknown fingerprints and an unavailable service are treated the same
+                return None
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+This file is part of yamr "Yet Another Media Renamer".
+
+Copyright (C) 2019, James Lee <jamesl33info@gmail.com>.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import csv
+import gzip
+import os
+import re
+import sqlite3
+
+from typing import Iterable, Iterator, List
+
+import imdb
+
+
+# Maps the 'titleType' used by the IMDB datasets to the 'kind' used by imdbpy
+KINDS = {
+    'movie': 'movie',
+    'short': 'short',
+    'tvEpisode': 'episode',
+    'tvMiniSeries': 'tv mini series',
+    'tvMovie': 'tv movie',
+    'tvSeries': 'tv series',
+    'tvSpecial': 'tv special',
+    'video': 'video movie',
+}
+
+SEARCH_LIMIT = 20
+
+NULL = '\\N'
+
+
+class IMDbIndex():
+    """Class representing a local index of the public IMDB datasets.
+
+    The 'title.basics' and 'title.episode' datasets are imported into a SQLite
+    database, with a full text search index over the titles. The index can be
+    used in place of the IMDB web api e.g. on machines without network access.
+    """
+    def __init__(self, path: str) -> None:
+        """Instantiate the IMDbIndex class.
+
+        Arguments:
+            path: The path to an index created by 'IMDbIndex.build'.
+        """
+        if not os.path.isfile(path):
+            raise FileNotFoundError('Error: IMDB index "{0}" does not exist.'.format(path))
+
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+
+    @classmethod
+    def build(cls, path: str, dataset_dir: str) -> 'IMDbIndex':
+        """Import the IMDB datasets into a new index.
+
+        Arguments:
+            path: The path to create the index at, an existing index is replaced.
+            dataset_dir: Directory containing 'title.basics.tsv' and 'title.episode.tsv',
+                which may be gzipped.
+
+        Returns:
+            The newly built index.
+        """
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        temporary = path + '.tmp'
+
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+        connection = sqlite3.connect(temporary)
+        connection.execute('PRAGMA synchronous=OFF')
+        connection.execute('CREATE TABLE titles (id INTEGER PRIMARY KEY, kind TEXT, title TEXT, year INTEGER)')
+        connection.execute('CREATE TABLE episodes (parent INTEGER, season INTEGER, episode INTEGER, id INTEGER)')
+        connection.execute("CREATE VIRTUAL TABLE titles_fts USING fts5(title, content='titles', content_rowid='id')")
+
+        def _titles() -> Iterator[tuple]:
+            for row in _read_dataset(dataset_dir, 'title.basics'):
+                if row['titleType'] in KINDS:
+                    yield (_title_id(row['tconst']), KINDS[row['titleType']], row['primaryTitle'],
+                           _integer(row['startYear']))
+
+        def _episodes() -> Iterator[tuple]:
+            for row in _read_dataset(dataset_dir, 'title.episode'):
+                yield (_title_id(row['parentTconst']), _integer(row['seasonNumber']),
+                       _integer(row['episodeNumber']), _title_id(row['tconst']))
+
+        connection.executemany('INSERT OR REPLACE INTO titles VALUES (?, ?, ?, ?)', _titles())
+        connection.executemany('INSERT INTO episodes VALUES (?, ?, ?, ?)', _episodes())
+
+        # Episodes are looked up through their show, only searchable titles need full text search
+        connection.execute("INSERT INTO titles_fts (rowid, title) SELECT id, title FROM titles WHERE kind != 'episode'")
+        connection.execute('CREATE INDEX episodes_parent ON episodes (parent, season)')
+        connection.commit()
+        connection.close()
+
+        os.replace(temporary, path)
+
+        return cls(path)
+
+    def search_movie(self, title: str, year: int = None) -> List[imdb.Movie.Movie]:
+        """Search the index for movies and TV shows, see 'imdb.IMDb.search_movie'.
+
+        Arguments:
+            title: The title to search for.
+            year: The year of release, if known.
+
+        Returns:
+            The matching titles, best matches first.
+        """
+        terms = re.findall(r'\w+', title.lower())
+
+        if not terms:
+            return []
+
+        query = ' '.join('"{0}"'.format(term) for term in terms)
+
+        rows = self._connection.execute('SELECT titles.id, kind, titles.title, year FROM titles_fts '
+                                        'JOIN titles ON titles.id = titles_fts.rowid '
+                                        'WHERE titles_fts MATCH ? ORDER BY bm25(titles_fts) LIMIT ?',
+                                        (query, SEARCH_LIMIT * 5)).fetchall()
+
+        if year is not None:
+            # Stable sort, so matching years are promoted without losing the search ranking
+            rows.sort(key=lambda r: r[3] != int(year))
+
+        return [_movie(*row) for row in rows[:SEARCH_LIMIT]]
+
+    def get_movie(self, movie_id: str) -> imdb.Movie.Movie:
+        """Get a title from the index by its IMDB id.
+
+        Arguments:
+            movie_id: The IMDB id, with or without the 'tt' prefix.
+
+        Returns:
+            The title, or None if it isn't in the index.
+        """
+        row = self._connection.execute('SELECT id, kind, title, year FROM titles WHERE id = ?',
+                                       (_title_id(movie_id),)).fetchone()
+
+        return None if row is None else _movie(*row)
+
+    def update_episodes(self, imdb_show: imdb.Movie.Movie, seasons: Iterable[int] = None) -> None:
+        """Populate the 'episodes' key of a TV show, see 'imdb.IMDb.update'.
+
+        Arguments:
+            imdb_show: The TV show, the episodes will be stored on this object.
+            seasons: Only populate these seasons, keeping any which were
+                populated before, None means populate every season.
+        """
+        query = ('SELECT season, episode, titles.id, titles.title, titles.year FROM episodes '
+                 'JOIN titles ON titles.id = episodes.id WHERE parent = ?')
+        parameters = [_title_id(imdb_show.movieID)]
+        episodes = {}
+
+        if seasons is not None:
+            seasons = list(seasons)
+            query += ' AND season IN ({0})'.format(', '.join('?' * len(seasons)))
+            parameters += seasons
+            episodes = dict(imdb_show.get('episodes') or {})
+            episodes.update((season, {}) for season in seasons)
+
+        rows = self._connection.execute(query, parameters)
+
+        for season, episode, movie_id, title, year in rows:
+            if season is None or episode is None:
+                continue
+
+            imdb_episode = _movie(movie_id, 'episode', title, year)
+            imdb_episode['season'] = season
+            imdb_episode['episode'] = episode
+
+            episodes.setdefault(season, {})[episode] = imdb_episode
+
+        imdb_show['episodes'] = episodes
+
+    def close(self) -> None:
+        """Close the underlying database."""
+        self._connection.close()
+
+
+def _read_dataset(dataset_dir: str, name: str) -> Iterator[dict]:
+    """Read the rows of an IMDB dataset, which may be gzipped.
+
+    Arguments:
+        dataset_dir: The directory containing the dataset.
+        name: The name of the dataset e.g. 'title.basics'.
+
+    Returns:
+        Each row of the dataset.
+    """
+    path = os.path.join(dataset_dir, name + '.tsv')
+
+    if os.path.isfile(path + '.gz'):
+        dataset = gzip.open(path + '.gz', 'rt', encoding='utf-8', newline='')
+    else:
+        dataset = open(path, encoding='utf-8', newline='')
+
+    with dataset:
+        yield from csv.DictReader(dataset, delimiter='\t', quoting=csv.QUOTE_NONE)
+
+
+def _title_id(tconst: str) -> int:
+    return int(tconst[2:] if tconst.startswith('tt') else tconst)
+
+
+def _integer(value: str) -> int:
+    return None if value in (NULL, '') else int(value)
+
+
+def _movie(movie_id: int, kind: str, title: str, year: int) -> imdb.Movie.Movie:
+    data = {'kind': kind, 'title': title}
+
+    if year is not None:
+        data['year'] = year
+
+    return imdb.Movie.Movie(movieID=str(movie_id).zfill(7), data=data)
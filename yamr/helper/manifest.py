@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+This file is part of yamr "Yet Another Media Renamer".
+
+Copyright (C) 2019, James Lee <jamesl33info@gmail.com>.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import hashlib
+import json
+import os
+
+
+FILENAME = '.yamr-manifest.json'
+VERSION = 1
+
+
+class Manifest():
+    """Class representing the state of a library between runs of yamr.
+
+    Each file which yamr has settled, either renamed or found to already be
+    correct, is recorded by its device, inode, modification time and final
+    name. Files which are unchanged since they were recorded can be skipped.
+    """
+    def __init__(self, path: str) -> None:
+        """Instantiate the Manifest class.
+
+        Arguments:
+            path: The path to the manifest file, it will be created on save.
+        """
+        self._path = path
+        self._entries = {}
+        self._seen = set()
+
+        try:
+            with open(path) as manifest_file:
+                manifest = json.load(manifest_file)
+        except (OSError, ValueError):
+            return
+
+        if manifest.get('version') == VERSION:
+            self._entries = manifest['entries']
+
+    @classmethod
+    def location(cls, folder: str, state_dir: str = None) -> str:
+        """Determine where the manifest for a library is stored.
+
+        Arguments:
+            folder: The root folder of the library.
+            state_dir: Directory to store manifests in, instead of the library itself.
+
+        Returns:
+            The path to the manifest file.
+        """
+        if state_dir is None:
+            return os.path.join(folder, FILENAME)
+
+        digest = hashlib.sha1(os.path.abspath(folder).encode()).hexdigest()
+
+        return os.path.join(state_dir, '{0}.json'.format(digest))
+
+    def is_settled(self, path: str) -> bool:
+        """Determine whether a file is unchanged since it was last settled.
+
+        Arguments:
+            path: The path to the media file.
+
+        Returns:
+            True if the file can be skipped.
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+
+        key = self._key(stat)
+        entry = self._entries.get(key)
+
+        if entry is None or entry != [stat.st_mtime_ns, os.path.basename(path)]:
+            return False
+
+        self._seen.add(key)
+
+        return True
+
+    def record(self, path: str) -> None:
+        """Record that a file has been settled.
+
+        Arguments:
+            path: The current path to the media file.
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return
+
+        key = self._key(stat)
+
+        self._entries[key] = [stat.st_mtime_ns, os.path.basename(path)]
+        self._seen.add(key)
+
+    def save(self) -> None:
+        """Atomically write the manifest to disk.
+
+        Only entries which were seen during this run are kept, so files which
+        have been removed from the library don't accumulate.
+        """
+        entries = {key: self._entries[key] for key in self._seen}
+
+        if os.path.dirname(self._path):
+            os.makedirs(os.path.dirname(self._path), exist_ok=True)
+
+        temporary = self._path + '.tmp'
+
+        with open(temporary, 'w') as manifest_file:
+            json.dump({'version': VERSION, 'entries': entries}, manifest_file, separators=(',', ':'))
+
+        os.replace(temporary, self._path)
+
+    @classmethod
+    def _key(cls, stat: os.stat_result) -> str:
+        return '{0}:{1}'.format(stat.st_dev, stat.st_ino)
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+This file is part of yamr "Yet Another Media Renamer".
+
+Copyright (C) 2019, James Lee <jamesl33info@gmail.com>.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import sys
+
+from typing import Iterator, List, Mapping, TypeVar
+
+
+# The only information yamr uses, out of everything Guessit extracts
+FIELDS = ('title', 'alternative_title', 'year', 'season', 'episode', 'episode_title', 'disc', 'cd', 'part', 'type')
+
+# Shared by every file of a show or album, so a single copy of each is kept
+INTERNED = ('title', 'alternative_title', 'type')
+
+T = TypeVar('T')  # Generic type
+
+
+class MediaInfo():
+    """Class representing the information extracted from a media file's name.
+
+    Guessit extracts dozens of properties from each filename, only the few
+    which yamr uses are kept, in slots rather than a dictionary. It supports
+    the dictionary methods which yamr uses, so it can be used in place of the
+    information extracted by Guessit.
+    """
+    __slots__ = FIELDS
+
+    def __init__(self, info: Mapping[str, T] = None) -> None:
+        """Instantiate the MediaInfo class.
+
+        Arguments:
+            info: The information extracted by Guessit, or the fast path.
+        """
+        for key in FIELDS:
+            if info is not None and info.get(key) is not None:
+                self[key] = info[key]
+
+    def get(self, key: str, default: T = None) -> T:
+        return getattr(self, key, default) if key in FIELDS else default
+
+    def keys(self) -> List[str]:
+        return [key for key in FIELDS if hasattr(self, key)]
+
+    def items(self) -> List[tuple]:
+        return [(key, getattr(self, key)) for key in self.keys()]
+
+    def __getitem__(self, key: str) -> T:
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key) from None
+
+    def __setitem__(self, key: str, value: T) -> None:
+        # Any other information e.g. from overrides, is unused so it's not kept
+        if key not in FIELDS:
+            return
+
+        if key in INTERNED and isinstance(value, str):
+            value = sys.intern(value)
+        elif isinstance(value, list):
+            value = tuple(value)
+
+        setattr(self, key, value)
+
+    def __delitem__(self, key: str) -> None:
+        try:
+            delattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key: str) -> bool:
+        return key in FIELDS and hasattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, MediaInfo):
+            return NotImplemented
+
+        return dict(self.items()) == dict(other.items())
+
+    def __repr__(self) -> str:
+        return 'MediaInfo({0!r})'.format(dict(self.items()))
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+This file is part of yamr "Yet Another Media Renamer".
+
+Copyright (C) 2019, James Lee <jamesl33info@gmail.com>.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import collections
+import json
+import os.path
+import sys
+
+from typing import List, TextIO
+
+import colorama
+
+
+HUMAN = 'human'
+JSONL = 'jsonl'
+QUIET = 'quiet'
+
+# The status of each media file, once the planner has checked its proposed rename
+COLLISION = 'collision'
+EXISTS = 'exists'
+RENAME = 'rename'
+UNCHANGED = 'unchanged'
+UNMATCHED = 'unmatched'
+
+# Output is written in blocks, rather than line by line, to reduce terminal I/O
+BUFFER_LINES = 1024
+
+
+class Renderer():
+    """Class representing a way of displaying what yamr has done.
+
+    Lines are buffered and written to the stream in blocks, output which is
+    interleaved with prompts must be flushed as it's written.
+    """
+    def __init__(self, stream: TextIO) -> None:
+        """Instantiate the Renderer class.
+
+        Arguments:
+            stream: The stream the output is written to, None means whatever
+                stdout is at the time.
+        """
+        self._stream = stream
+        self._buffer = []
+
+    def event(self, source: str, target: str, status: str, reason: str = None) -> None:
+        """Display the outcome for a single media file.
+
+        Arguments:
+            source: The current path of the media file.
+            target: The path the media file will be renamed to, if one was proposed.
+            status: What will happen to the media file e.g. 'rename'.
+            reason: Why the media file won't be renamed.
+        """
+        raise NotImplementedError
+
+    def unmatched(self, sources: List[str], reason: str, message: str) -> None:
+        """Display that some media files couldn't be matched.
+
+        Arguments:
+            sources: The paths of the media files.
+            reason: Why the media files couldn't be matched.
+            message: A human readable description, covering all of the media files.
+        """
+        for source in sources:
+            self.event(source, None, UNMATCHED, reason)
+
+    def message(self, text: str) -> None:
+        """Display an informational message.
+
+        Arguments:
+            text: The message to display.
+        """
+
+    def flush(self) -> None:
+        """Write any buffered output to the stream."""
+        stream = self._stream or sys.stdout
+
+        if self._buffer:
+            stream.write(''.join(self._buffer))
+            self._buffer.clear()
+
+        stream.flush()
+
+    def finish(self) -> None:
+        """Write any buffered output, and a summary if there is one."""
+        self.flush()
+
+    def _write(self, line: str) -> None:
+        self._buffer.append(line + '\n')
+
+        if len(self._buffer) >= BUFFER_LINES:
+            self.flush()
+
+
+class HumanRenderer(Renderer):
+    """Class representing the colorized output intended for a terminal.
+
+    Messages are written immediately since they're interleaved with prompts,
+    only the outcome of each media file is buffered.
+    """
+    def event(self, source: str, target: str, status: str, reason: str = None) -> None:
+        """See super class."""
+        if status == UNCHANGED:
+            original = colorama.Fore.LIGHTGREEN_EX + os.path.basename(source) + colorama.Fore.RESET
+
+            self._write('Filename "{0}" is already correct (no changes made)'.format(original))
+        elif status == RENAME:
+            original = colorama.Fore.LIGHTRED_EX + os.path.basename(source) + colorama.Fore.RESET
+            new = colorama.Fore.LIGHTGREEN_EX + os.path.basename(target) + colorama.Fore.RESET
+
+            self._write('"{0}" -> "{1}"'.format(original, new))
+        else:
+            new = colorama.Fore.LIGHTRED_EX + os.path.basename(target) + colorama.Fore.RESET
+
+            self._write('Filename "{0}" {1} (no changes made)'.format(new, reason))
+
+    def unmatched(self, sources: List[str], reason: str, message: str) -> None:
+        """See super class."""
+        self._write(message)
+        self.flush()
+
+    def message(self, text: str) -> None:
+        """See super class."""
+        self._write(text)
+        self.flush()
+
+
+class JSONLRenderer(Renderer):
+    """Class representing output with one JSON object per media file."""
+    def event(self, source: str, target: str, status: str, reason: str = None) -> None:
+        """See super class."""
+        self._write(json.dumps({'source': source, 'target': target, 'status': status, 'reason': reason}))
+
+
+class QuietRenderer(Renderer):
+    """Class representing output which only summarises what happened."""
+    def __init__(self, stream: TextIO) -> None:
+        """See super class."""
+        super().__init__(stream)
+        self._counts = collections.Counter()
+
+    def event(self, source: str, target: str, status: str, reason: str = None) -> None:
+        """See super class."""
+        self._counts[status] += 1
+
+    def finish(self) -> None:
+        """See super class."""
+        if self._counts:
+            self._write(', '.join('{0} {1}'.format(self._counts[s], s) for s in sorted(self._counts)))
+            self._counts.clear()
+
+        super().finish()
+
+
+RENDERERS = {
+    HUMAN: HumanRenderer,
+    JSONL: JSONLRenderer,
+    QUIET: QuietRenderer,
+}
+
+_renderer = HumanRenderer(None)
+
+
+def configure(output_format: str = HUMAN, stream: TextIO = None) -> None:
+    """Configure how yamr displays what it has done.
+
+    Arguments:
+        output_format: One of 'human', 'jsonl' or 'quiet'.
+        stream: The stream to write to, None means whatever stdout is at the time.
+    """
+    global _renderer
+
+    _renderer.flush()
+    _renderer = RENDERERS[output_format](stream)
+
+
+def event(source: str, target: str, status: str, reason: str = None) -> None:
+    """Display the outcome for a single media file, see 'Renderer.event'."""
+    _renderer.event(source, target, status, reason)
+
+
+def unmatched(sources: List[str], reason: str, message: str) -> None:
+    """Display that some media files couldn't be matched, see 'Renderer.unmatched'."""
+    _renderer.unmatched(sources, reason, message)
+
+
+def message(text: str) -> None:
+    """Display an informational message, see 'Renderer.message'."""
+    _renderer.message(text)
+
+
+def flush() -> None:
+    """Write any buffered output."""
+    _renderer.flush()
+
+
+def finish() -> None:
+    """Write any buffered output, and a summary if there is one."""
+    _renderer.finish()
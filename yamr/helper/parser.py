@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+This file is part of yamr "Yet Another Media Renamer".
+
+Copyright (C) 2019, James Lee <jamesl33info@gmail.com>.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import itertools
+import os.path
+import re
+
+from concurrent import futures
+from typing import Callable, Iterable, Iterator, List, Tuple, TypeVar
+
+import guessit
+
+from . import cache
+from . import media_info
+from . import scanner
+from . import stats
+
+
+# Parsed information is only valid for the Guessit release which produced it
+NAMESPACE = 'guessit-{0}'.format(guessit.__version__)
+
+BATCH_SIZE = 512
+
+# yamr's own output formats, which are recognised without running Guessit
+EPISODE_PATTERN = re.compile(r'^(?P<title>.+?)(?: \((?P<year>(?:18|19|20)\d{2})\))? - (?P<episodes>S\d{2,}E\d{2,}(?: - S\d{2,}E\d{2,})*) - (?P<episode_title>.+)$')
+MOVIE_PATTERN = re.compile(r'^(?P<title>.+) \((?P<year>(?:18|19|20)\d{2})\)(?: - cd(?P<cd>\d+))?(?: - part(?P<part>\d+))?$')
+TRACK_PATTERN = re.compile(r'^(?P<title>.+?) - (?P<alternative_title>.+?) - (?:(?P<disc>\d+)-)?(?P<episode>\d{2,}) - (?P<episode_title>.+)$')
+
+_EPISODE_NUMBER = re.compile(r'S(\d+)E(\d+)')
+_SUBTITLE_LANGUAGE = re.compile(r'\.[a-z]{2,3}$')
+
+T = TypeVar('T')  # Generic type
+
+_cache = None
+
+
+def use_cache(parse_cache: cache.Cache) -> None:
+    """Set the cache which is checked before parsing a filename with Guessit.
+
+    Arguments:
+        parse_cache: The cache to use, or None to always parse.
+    """
+    global _cache
+    _cache = parse_cache
+
+
+def parse(filename: str) -> media_info.MediaInfo:
+    """Extract information from a filename using Guessit.
+
+    Arguments:
+        filename: The basename of the media file.
+
+    Returns:
+        The information used by yamr, out of everything extracted by Guessit.
+    """
+    filename = os.path.basename(filename)
+
+    info = match(filename)
+
+    if info is None and _cache is not None:
+        info = _cache.get(NAMESPACE, filename)
+
+    if info is None:
+        info = _guess(filename)
+
+        if _cache is not None:
+            _cache.put(NAMESPACE, filename, info)
+
+    return media_info.MediaInfo(info)
+
+
+def parse_all(filenames: Iterable[str], jobs: int = 1) -> List[media_info.MediaInfo]:
+    """Extract information from many filenames, optionally in parallel.
+
+    Arguments:
+        filenames: The basenames of the media files.
+        jobs: The number of worker processes to use, one means parse in process.
+
+    Returns:
+        The information extracted by Guessit, in the same order as 'filenames'.
+    """
+    return [info for _, info in parse_stream(filenames, os.path.basename, jobs)]
+
+
+def parse_stream(items: Iterable[T], filename: Callable[[T], str], jobs: int = 1,
+                 batch_size: int = BATCH_SIZE) -> Iterator[Tuple[T, media_info.MediaInfo]]:
+    """Extract information from a stream of media files, optionally in parallel.
+
+    The stream is consumed in batches so parsing can start before the stream
+    has been exhausted e.g. whilst a directory tree is still being scanned.
+
+    Arguments:
+        items: The items which represent media files.
+        filename: Function which returns the filename of an item.
+        jobs: The number of worker processes to use, one means parse in process.
+        batch_size: The number of items parsed at once.
+
+    Returns:
+        Each item paired with the information extracted by Guessit, in order.
+        Only the information used by yamr is kept, so large libraries can be
+        held in memory at once.
+    """
+    items = iter(items)
+    executor = None
+
+    if jobs is not None and jobs > 1:
+        executor = futures.ProcessPoolExecutor(max_workers=jobs)
+
+    try:
+        while True:
+            batch = list(itertools.islice(items, batch_size))
+
+            if not batch:
+                break
+
+            infos = _parse_batch([os.path.basename(filename(i)) for i in batch], executor, jobs)
+
+            yield from zip(batch, map(media_info.MediaInfo, infos))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+def _parse_batch(filenames: List[str], executor: futures.Executor = None, jobs: int = 1) -> List[dict]:
+    """Extract information from a batch of filenames, checking the cache first.
+
+    Arguments:
+        filenames: The basenames of the media files.
+        executor: The worker processes to use, or None to parse in process.
+        jobs: The number of worker processes in the executor.
+
+    Returns:
+        The information extracted by Guessit, in the same order as 'filenames'.
+    """
+    infos = [match(f) for f in filenames]
+
+    stats.increment('parse.fast_path', sum(info is not None for info in infos))
+
+    if _cache is not None:
+        infos = [info if info is not None else _cache.get(NAMESPACE, f) for f, info in zip(filenames, infos)]
+
+    # Only the filenames which weren't matched or cached need to go through Guessit
+    missing = [index for index, info in enumerate(infos) if info is None]
+
+    with stats.timer('parse.guessit'):
+        if executor is None or len(missing) <= 1:
+            guessed = [_guess(filenames[i]) for i in missing]
+        else:
+            # Large chunks keep the inter process communication overhead low
+            chunksize = max(1, len(missing) // (jobs * 4))
+            guessed = list(executor.map(_guess, [filenames[i] for i in missing], chunksize=chunksize))
+
+    stats.increment('parse.guessed', len(missing))
+
+    for index, info in zip(missing, guessed):
+        infos[index] = info
+
+        if _cache is not None:
+            _cache.put(NAMESPACE, filenames[index], info)
+
+    if _cache is not None:
+        _cache.flush()
+
+    return infos
+
+
+def match(filename: str) -> dict:
+    """Extract information from a filename which is in one of yamr's own
+    formats, producing the same keys as Guessit.
+
+    Arguments:
+        filename: The basename of the media file.
+
+    Returns:
+        The extracted information, or None if the filename isn't in one of
+        yamr's formats.
+    """
+    name, extension = os.path.splitext(filename)
+    kind = scanner.FILE_KINDS.get(extension)
+
+    if kind == scanner.AUDIO:
+        found = TRACK_PATTERN.match(name)
+
+        if found is None or _parenthesised(found, 'title', 'alternative_title', 'episode_title'):
+            return None
+
+        info = dict(found.groupdict(), episode=int(found.group('episode')), type='episode')
+
+        # Only tracks from albums with more than one disc include the disc number
+        if info['disc'] is None:
+            del info['disc']
+        else:
+            info['disc'] = int(info['disc'])
+
+        return info
+
+    if kind == scanner.SUBTITLE:
+        # Subtitles are named after their video, with an optional language code
+        name = _SUBTITLE_LANGUAGE.sub('', name)
+    elif kind != scanner.VIDEO:
+        return None
+
+    found = EPISODE_PATTERN.match(name)
+
+    if found is not None and not _parenthesised(found, 'title', 'episode_title'):
+        numbers = [(int(s), int(e)) for s, e in _EPISODE_NUMBER.findall(found.group('episodes'))]
+
+        # Guessit is left to make sense of episodes which span seasons
+        if len(set(s for s, _ in numbers)) != 1:
+            return None
+
+        episodes = [e for _, e in numbers]
+
+        info = {
+            'title': found.group('title'),
+            'season': numbers[0][0],
+            'episode': episodes[0] if len(episodes) == 1 else episodes,
+            'episode_title': found.group('episode_title'),
+            'type': 'episode',
+        }
+
+        # Shows which share a title are told apart by their year e.g. "Doctor Who (2005)"
+        if found.group('year') is not None:
+            info['year'] = int(found.group('year'))
+
+        return info
+
+    if found is not None:
+        return None
+
+    found = MOVIE_PATTERN.match(name)
+
+    if found is not None and not _parenthesised(found, 'title'):
+        info = {'title': found.group('title'), 'year': int(found.group('year')), 'type': 'movie'}
+
+        # Movies split across several files are numbered
+        for part in [p for p in ['cd', 'part'] if found.group(p) is not None]:
+            info[part] = int(found.group(part))
+
+        return info
+
+    return None
+
+
+def _parenthesised(found: re.Match, *groups: str) -> bool:
+    """Determine whether any of the matched parts of a filename contain text
+    in parentheses, other than a year.
+
+    Guessit treats these specially e.g. "The Office (US)" is a country and
+    "Bohemian Rhapsody (Live)" a release group, so they're left to Guessit.
+
+    Arguments:
+        found: The match of one of yamr's formats.
+        groups: The names of the groups to check.
+
+    Returns:
+        Whether any of the groups contain parentheses.
+    """
+    return any('(' in found.group(group) or ')' in found.group(group) for group in groups)
+
+
+def _guess(filename: str) -> dict:
+    """Run Guessit on a single filename.
+
+    Arguments:
+        filename: The basename of the media file.
+
+    Returns:
+        The information extracted by Guessit as a plain dictionary.
+    """
+    # 'MatchesDict' can't be pickled, convert it so results can be returned
+    # from worker processes and stored in the cache.
+    return dict(guessit.guessit(filename))
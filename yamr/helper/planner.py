@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+This file is part of yamr "Yet Another Media Renamer".
+
+Copyright (C) 2019, James Lee <jamesl33info@gmail.com>.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import collections
+import hashlib
+import json
+import os
+
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Tuple
+
+from . import output
+from . import stats
+
+# Importing the media classes would import Guessit, which isn't needed to resume or rollback
+if TYPE_CHECKING:
+    from ..core import media_abc
+
+
+JOURNAL_FILENAME = '.yamr-journal.jsonl'
+
+# Statuses are shared with the output renderers, which display them
+COLLISION = output.COLLISION
+EXISTS = output.EXISTS
+RENAME = output.RENAME
+UNCHANGED = output.UNCHANGED
+
+
+class Rename():
+    """Class representing a single proposed rename."""
+    def __init__(self, media: 'media_abc.Media', parent: 'Rename' = None) -> None:
+        """Instantiate the Rename class.
+
+        Arguments:
+            media: The media file or sidecar, which has a proposed target.
+            parent: The rename of the media file a sidecar accompanies.
+        """
+        self.media = media
+        self.parent = parent
+        self.source = media.path
+        self.target = media.target
+        self.status = UNCHANGED if self.source == self.target else RENAME
+        self.reason = None
+
+
+class Planner():
+    """Class representing a plan of every rename in a run of yamr.
+
+    Media files propose their new names, then every proposal is checked for
+    collisions at once; against the existing files in each directory and
+    against each other. The renames are then executed in a safe order through
+    a write-ahead journal, so an interrupted run can be resumed or rolled back.
+    """
+    def __init__(self) -> None:
+        """Instantiate the Planner class."""
+        self._renames = []
+
+    def add(self, media: Iterable['media_abc.Media']) -> None:
+        """Add the proposed renames of some media files to the plan.
+
+        Their sidecars are renamed with them, after the same proposed target.
+
+        Arguments:
+            media: The media files, those without a proposed target are ignored.
+        """
+        for m in media:
+            if m.target is not None:
+                rename = Rename(m)
+                self._renames += [rename] + [Rename(s, rename) for s in m.sidecars]
+
+    def check(self) -> List[Rename]:
+        """Detect collisions and determine a safe order to perform the renames in.
+
+        Returns:
+            The renames which can be performed, in the order they must be performed.
+        """
+        pending = [r for r in self._renames if r.status == RENAME]
+
+        # Two or more files which would be renamed to the same path
+        targets = collections.Counter(r.target for r in pending)
+        unchanged = set(r.source for r in self._renames if r.status == UNCHANGED)
+
+        for rename in pending:
+            if targets[rename.target] > 1:
+                rename.status, rename.reason = COLLISION, 'is the target of multiple files'
+            elif rename.target in unchanged:
+                rename.status, rename.reason = EXISTS, 'already exists'
+
+        pending = [r for r in pending if r.status == RENAME]
+
+        # Files which already exist, unless they are going to be renamed out of the way
+        listings = {}
+        existing = []
+
+        for rename in pending:
+            directory, filename = os.path.split(rename.target)
+
+            if directory not in listings:
+                try:
+                    listings[directory] = set(os.listdir(directory or '.'))
+                except OSError:
+                    listings[directory] = set()
+
+            if filename in listings[directory]:
+                existing.append(rename)
+
+        while True:
+            pending = self._reject_blocked(pending, existing)
+            ordered, cycles = self._order(pending)
+
+            # Whatever is left is renaming in a cycle
+            for rename in cycles:
+                rename.status, rename.reason = COLLISION, 'is part of a rename cycle'
+
+            # Sidecars of media files in a cycle can't be renamed either, which may block others
+            if not any(r.parent is not None and r.parent.status not in (RENAME, UNCHANGED) for r in ordered):
+                return ordered
+
+            pending = [r for r in pending if r.status == RENAME]
+
+    @classmethod
+    def _reject_blocked(cls, pending: List[Rename], existing: List[Rename]) -> List[Rename]:
+        """Reject the renames whose target exists and isn't being vacated, and
+        the sidecars of media files which can't be renamed.
+
+        A rejected rename leaves its source in place, which may in turn block
+        the rename into it e.g. 'b' -> 'c' is rejected so 'a' -> 'b' must be too.
+
+        Arguments:
+            pending: The renames which haven't been rejected so far.
+            existing: The renames whose target already exists on disk.
+
+        Returns:
+            The renames which are still pending.
+        """
+        while True:
+            sources = set(r.source for r in pending)
+            rejected = False
+
+            for rename in existing:
+                if rename.status == RENAME and rename.target not in sources:
+                    rename.status, rename.reason = EXISTS, 'already exists'
+                    rejected = True
+
+            # Otherwise a subtitle would be moved next to a different video
+            for rename in pending:
+                if rename.parent is not None and rename.parent.status not in (RENAME, UNCHANGED):
+                    rename.status, rename.reason = rename.parent.status, 'accompanies a file which can\'t be renamed'
+                    rejected = True
+
+            if not rejected:
+                return pending
+
+            pending = [r for r in pending if r.status == RENAME]
+
+    @classmethod
+    def _order(cls, pending: List[Rename]) -> Tuple[List[Rename], List[Rename]]:
+        """Determine a safe order to perform some renames in.
+
+        Arguments:
+            pending: The renames to perform.
+
+        Returns:
+            The renames in the order they must be performed, and the renames
+            which can't be performed because they rename in a cycle.
+        """
+        sources = set(r.source for r in pending)
+        ordered = []
+
+        # A rename can only happen once its target has been vacated
+        while pending:
+            ready = [r for r in pending if r.target not in sources or r.target == r.source]
+
+            if not ready:
+                break
+
+            for rename in ready:
+                ordered.append(rename)
+                sources.discard(rename.source)
+
+            pending = [r for r in pending if r not in ready]
+
+        return ordered, pending
+
+    def execute(self, journal_path: str, dry_run: bool) -> None:
+        """Check the plan, display it to the user and perform the renames.
+
+        Arguments:
+            journal_path: The path to write the journal to.
+            dry_run: Whether or not to *actually* perform the renames.
+        """
+        ordered = self.report()
+
+        if not dry_run:
+            self.perform(ordered, journal_path)
+
+    def report(self) -> List[Rename]:
+        """Check the plan and display it to the user.
+
+        Returns:
+            The renames which can be performed, in the order they must be performed.
+        """
+        ordered = self.check()
+
+        for rename in self._renames:
+            output.event(rename.source, rename.target, rename.status, rename.reason)
+            stats.increment('plan.' + rename.status)
+
+        output.flush()
+
+        return ordered
+
+    @classmethod
+    def perform(cls, ordered: List[Rename], journal_path: str) -> None:
+        """Perform checked renames through a write-ahead journal, this is safe
+        to run in a background thread.
+
+        Arguments:
+            ordered: The renames, as returned by 'check' or 'report'.
+            journal_path: The path to write the journal to.
+        """
+        if not ordered:
+            return
+
+        if os.path.dirname(journal_path):
+            os.makedirs(os.path.dirname(journal_path), exist_ok=True)
+
+        with open(journal_path, 'w') as journal:
+            for index, rename in enumerate(ordered):
+                journal.write(json.dumps({'id': index, 'source': rename.source, 'target': rename.target}) + '\n')
+
+            journal.flush()
+            os.fsync(journal.fileno())
+
+            for index, rename in enumerate(ordered):
+                with stats.timer('planner.rename'):
+                    rename.media.path = rename.target
+
+                journal.write(json.dumps({'done': index}) + '\n')
+                journal.flush()
+
+        os.remove(journal_path)
+
+    def __iter__(self) -> Iterator[Rename]:
+        return iter(self._renames)
+
+    def __len__(self) -> int:
+        return len(self._renames)
+
+
+def journal_location(folder: str, state_dir: str = None) -> str:
+    """Determine where the rename journal for a library is stored.
+
+    Arguments:
+        folder: The root folder of the library.
+        state_dir: Directory to store journals in, instead of the library itself.
+
+    Returns:
+        The path to the journal file.
+    """
+    if state_dir is None:
+        return os.path.join(folder, JOURNAL_FILENAME)
+
+    digest = hashlib.sha1(os.path.abspath(folder).encode()).hexdigest()
+
+    return os.path.join(state_dir, '{0}.journal.jsonl'.format(digest))
+
+
+def resume(journal_path: str) -> None:
+    """Complete the renames from an interrupted run.
+
+    Arguments:
+        journal_path: The path to the journal of the interrupted run.
+    """
+    entries = _read_journal(journal_path)
+
+    # Renames which are marked as done are skipped, the first which isn't may still have happened
+    for entry in entries[_count_done(entries):]:
+        if os.path.exists(entry['source']) and not os.path.exists(entry['target']):
+            output.event(entry['source'], entry['target'], RENAME)
+            os.rename(entry['source'], entry['target'])
+        elif not os.path.exists(entry['target']):
+            output.message('File "{0}" is missing (no changes made)'.format(entry['source']))
+
+    os.remove(journal_path)
+    output.finish()
+
+
+def rollback(journal_path: str) -> None:
+    """Undo the renames from an interrupted run.
+
+    Arguments:
+        journal_path: The path to the journal of the interrupted run.
+    """
+    entries = _read_journal(journal_path)
+
+    # Only renames which are marked as done, and the one which was in progress, are undone
+    for entry in reversed(entries[:_count_done(entries) + 1]):
+        if os.path.exists(entry['target']) and not os.path.exists(entry['source']):
+            output.event(entry['target'], entry['source'], RENAME)
+            os.rename(entry['target'], entry['source'])
+
+    os.remove(journal_path)
+    output.finish()
+
+
+def _read_journal(journal_path: str) -> List[dict]:
+    """Read the planned renames from a journal.
+
+    Arguments:
+        journal_path: The path to the journal.
+
+    Returns:
+        The planned renames, in the order they were to be performed, each
+        with a 'done' flag which is set once it's been performed.
+    """
+    entries = []
+
+    with open(journal_path) as journal:
+        for line in journal:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # The final line may have been partially written
+                continue
+
+            if 'source' in entry:
+                entries.append(dict(entry, done=False))
+            elif 'done' in entry and entry['done'] < len(entries):
+                entries[entry['done']]['done'] = True
+
+    return entries
+
+
+def _count_done(entries: List[dict]) -> int:
+    """Count the renames which were performed, they're performed in order so
+    these are the first entries in the journal.
+
+    Arguments:
+        entries: The planned renames, as returned by '_read_journal'.
+
+    Returns:
+        The number of renames which are marked as done.
+    """
+    count = 0
+
+    while count < len(entries) and entries[count]['done']:
+        count += 1
+
+    return count
+
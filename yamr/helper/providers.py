@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+This file is part of yamr "Yet Another Media Renamer".
+
+Copyright (C) 2019, James Lee <jamesl33info@gmail.com>.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import functools
+import sys
+import threading
+import types
+
+from concurrent import futures
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, TypeVar
+
+from . import cache
+from . import scheduler
+from . import stats
+
+# The provider libraries are slow to import, so they're only imported once a
+# request is made; runs without any albums never import 'musicbrainzngs'.
+if TYPE_CHECKING:
+    import imdb
+
+
+# How long each kind of provider response is considered valid, in seconds
+TTLS = {
+    'search': 24 * 60 * 60,
+    'movie': 30 * 24 * 60 * 60,
+    'episodes': 7 * 24 * 60 * 60,
+    'release': 90 * 24 * 60 * 60,
+}
+
+DEFAULT_PREFETCH_WORKERS = 8
+
+# MusicBrainz allows an average of one request per second
+DEFAULT_MUSICBRAINZ_RATE = 1.0
+
+T = TypeVar('T')  # Generic type
+
+_cache = None
+_imdb_backend = None
+_musicbrainz = None
+_musicbrainz_backend = None
+_musicbrainzngs = None
+_offline = False
+_refresh = False
+_ttls = dict(TTLS)
+
+_executor = None
+_pending = {}
+_pending_lock = threading.Lock()
+
+
+def configure(provider_cache: cache.Cache = None, refresh: bool = False, offline: bool = False,
+              ttls: Dict[str, float] = None, prefetch_workers: int = DEFAULT_PREFETCH_WORKERS,
+              imdb_backend: T = None, musicbrainz_rate: float = DEFAULT_MUSICBRAINZ_RATE,
+              musicbrainz_backend: T = None) -> None:
+    """Configure how requests to IMDB and MusicBrainz are made and cached.
+
+    Arguments:
+        provider_cache: The cache to store responses in, or None to disable caching.
+        refresh: Ignore cached responses, but still store fresh ones.
+        offline: Never make a network request, use cached responses regardless of age.
+        ttls: Overriding time to live values for each kind of response.
+        prefetch_workers: The number of concurrent prefetch requests, zero disables prefetching.
+        imdb_backend: Serves IMDB lookups instead of the web api e.g. an 'IMDbIndex'.
+        musicbrainz_rate: The maximum number of MusicBrainz requests per second.
+        musicbrainz_backend: Serves MusicBrainz lookups instead of the web api.
+    """
+    global _cache, _executor, _imdb_backend, _musicbrainz, _musicbrainz_backend, _offline, _refresh, _ttls
+
+    _cache = provider_cache
+    _imdb_backend = imdb_backend
+    _musicbrainz_backend = musicbrainz_backend
+    _offline = offline
+    _refresh = refresh
+    _ttls = dict(TTLS, **(ttls or {}))
+
+    with _pending_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+
+        _executor = None
+        _pending.clear()
+
+        if prefetch_workers:
+            _executor = futures.ThreadPoolExecutor(max_workers=prefetch_workers, thread_name_prefix='yamr-prefetch')
+
+    if _musicbrainz is not None:
+        _musicbrainz.shutdown()
+
+    _musicbrainz = scheduler.Scheduler(musicbrainz_rate)
+
+
+def prefetch(function: Callable[..., T], *args) -> None:
+    """Start a provider request in the background, so it has completed by the
+    time it's needed.
+
+    Arguments:
+        function: A prefetchable provider function e.g. 'search_movie'.
+        args: The arguments the function will later be called with.
+    """
+    with _pending_lock:
+        if _executor is None or (function.__name__, args) in _pending:
+            return
+
+        _pending[(function.__name__, args)] = _executor.submit(function.__wrapped__, *args)
+
+
+def _prefetchable(function: Callable[..., T]) -> Callable[..., T]:
+    """Decorator which serves calls from prefetched requests when possible.
+
+    Arguments:
+        function: The provider function being decorated.
+
+    Returns:
+        The wrapped provider function.
+    """
+    @functools.wraps(function)
+    def _wrapper(*args):
+        with _pending_lock:
+            future = _pending.pop((function.__name__, args), None)
+
+        if future is not None:
+            return future.result()
+
+        return function(*args)
+
+    return _wrapper
+
+
+@_prefetchable
+def search_movie(title: str, year: int = None) -> List['imdb.Movie.Movie']:
+    """Search IMDB for movies and TV shows.
+
+    Arguments:
+        title: The title to search for.
+        year: The year of release, if known.
+
+    Returns:
+        The search results from IMDB.
+    """
+    # Local backends are already fast, so they bypass the cache
+    if _imdb_backend is not None:
+        with stats.timer('request.imdb-search'):
+            return _imdb_backend.search_movie(title, year)
+
+    query = title if year is None else '{0} {1}'.format(title, year)
+
+    def _fetch() -> List['imdb.Movie.Movie']:
+        import imdb
+        return imdb.IMDb().search_movie(query)
+
+    return _cached('imdb-search', query, 'search', _fetch, [])
+
+
+@_prefetchable
+def get_movie(movie_id: str) -> 'imdb.Movie.Movie':
+    """Get an IMDB title by its id, without searching for it.
+
+    Arguments:
+        movie_id: The IMDB id, with or without the 'tt' prefix.
+
+    Returns:
+        The title, or None if it couldn't be found.
+    """
+    movie_id = movie_id[2:] if movie_id.startswith('tt') else movie_id
+
+    if _imdb_backend is not None:
+        with stats.timer('request.imdb-movie'):
+            return _imdb_backend.get_movie(movie_id)
+
+    def _fetch() -> 'imdb.Movie.Movie':
+        import imdb
+        return imdb.IMDb().get_movie(movie_id)
+
+    return _cached('imdb-movie', movie_id, 'movie', _fetch, None)
+
+
+def update_episodes(imdb_show: 'imdb.Movie.Movie', seasons: Iterable[int] = None) -> None:
+    """Populate the 'episodes' key of an IMDB TV show.
+
+    Arguments:
+        imdb_show: The TV show, the episodes will be stored on this object.
+        seasons: Only fetch these seasons, keeping any which were fetched
+            before, None means fetch every season.
+    """
+    if _imdb_backend is not None:
+        with stats.timer('request.imdb-episodes'):
+            _imdb_backend.update_episodes(imdb_show, seasons)
+
+        return
+
+    if seasons is not None:
+        _update_seasons(imdb_show, seasons)
+        return
+
+    def _fetch() -> dict:
+        import imdb
+        imdb.IMDb().update(imdb_show, 'episodes')
+        return imdb_show.get('episodes', {})
+
+    episodes = _cached('imdb-episodes', imdb_show.movieID, 'episodes', _fetch, None)
+
+    if episodes is not None:
+        imdb_show['episodes'] = episodes
+
+
+def _update_seasons(imdb_show: 'imdb.Movie.Movie', seasons: Iterable[int]) -> None:
+    """Populate some seasons in the 'episodes' key of an IMDB TV show, each
+    season is requested and cached separately.
+
+    Arguments:
+        imdb_show: The TV show, the episodes will be stored on this object.
+        seasons: The seasons to fetch.
+    """
+    episodes = imdb_show.get('episodes') or {}
+
+    for season in seasons:
+        def _fetch(season: int = season) -> dict:
+            import imdb
+            ia = imdb.IMDb()
+
+            # Fetched into a scratch copy, so the seasons which were already fetched are kept
+            scratch = imdb.Movie.Movie(movieID=imdb_show.movieID, accessSystem=ia.accessSystem)
+            ia.update_series_seasons(scratch, [season])
+
+            return scratch.get('episodes', {}).get(season, {})
+
+        key = '{0}:{1}'.format(imdb_show.movieID, season)
+        fetched = _cached('imdb-season', key, 'episodes', _fetch, None)
+
+        if fetched is not None:
+            episodes[season] = fetched
+
+    imdb_show['episodes'] = episodes
+
+
+@_prefetchable
+def search_releases(title: str, artist: str = None) -> List[dict]:
+    """Search MusicBrainz for releases.
+
+    Arguments:
+        title: The title of the release to search for.
+        artist: The artist of the release, if it's known.
+
+    Returns:
+        The releases found by MusicBrainz.
+    """
+    if _musicbrainz_backend is not None:
+        with stats.timer('request.musicbrainz-search'):
+            return _musicbrainz_backend.search_releases(title, artist)
+
+    # Searches without an artist keep the keys used by older versions of yamr
+    key = title if artist is None else '{0}\n{1}'.format(title, artist)
+    fields = {} if artist is None else {'artist': artist}
+
+    def _fetch() -> List[dict]:
+        return _musicbrainz_call(('search', title, artist), _musicbrainz_module().search_releases, title,
+                                 limit=100, **fields)['release-list']
+
+    return _cached('musicbrainz-search', key, 'search', _fetch, [])
+
+
+def get_release(release_id: str) -> dict:
+    """Get a MusicBrainz release, including its artists and recordings.
+
+    Arguments:
+        release_id: The MusicBrainz id of the release.
+
+    Returns:
+        The release, or None when offline and it hasn't been cached.
+    """
+    if _musicbrainz_backend is not None:
+        with stats.timer('request.musicbrainz-release'):
+            return _musicbrainz_backend.get_release(release_id)
+
+    def _fetch() -> dict:
+        return _musicbrainz_call(('release', release_id), _musicbrainz_module().get_release_by_id, release_id,
+                                 includes=['artists', 'recordings'])
+
+    return _cached('musicbrainz-release', release_id, 'release', _fetch, None)
+
+
+def _musicbrainz_module() -> types.ModuleType:
+    """Import and configure 'musicbrainzngs', the first time it's needed.
+
+    Returns:
+        The 'musicbrainzngs' module.
+    """
+    global _musicbrainzngs
+
+    if _musicbrainzngs is None:
+        import musicbrainzngs
+
+        # All MusicBrainz requests are paced by the scheduler, rather than each
+        # request being individually delayed by 'musicbrainzngs'.
+        musicbrainzngs.set_rate_limit(False)
+
+        yamr = sys.modules[__name__.split('.')[0]]
+        musicbrainzngs.set_useragent(yamr.__title__, yamr.__version__, yamr.__homepage__)
+
+        _musicbrainzngs = musicbrainzngs
+
+    return _musicbrainzngs
+
+
+def _musicbrainz_call(key: tuple, function: Callable[..., T], *args, **kwargs) -> T:
+    """Make a MusicBrainz request through the rate limited scheduler.
+
+    Arguments:
+        key: Identifies the request, so duplicate requests can be coalesced.
+        function: The 'musicbrainzngs' function which performs the request.
+        args: Positional arguments for the function.
+        kwargs: Keyword arguments for the function.
+
+    Returns:
+        The response from MusicBrainz.
+    """
+    if _musicbrainz is None:
+        return function(*args, **kwargs)
+
+    return _musicbrainz.call(key, function, *args, **kwargs)
+
+
+def _cached(namespace: str, key: str, kind: str, fetch: Callable[[], T], default: T) -> T:
+    """Get a provider response from the cache or fetch a fresh one.
+
+    Arguments:
+        namespace: The cache namespace for this type of request.
+        key: The query or id the response is keyed on.
+        kind: The kind of response, used to determine its time to live.
+        fetch: Function which performs the network request.
+        default: Returned when offline and there isn't a cached response.
+
+    Returns:
+        The provider response.
+    """
+    if _cache is not None and (_offline or not _refresh):
+        # When offline any response is better than no response
+        response = _cache.get(namespace, str(key), None if _offline else _ttls[kind])
+
+        if response is not None:
+            return response
+
+    if _offline:
+        return default
+
+    with stats.timer('request.' + namespace):
+        response = fetch()
+
+    if _cache is not None:
+        _cache.put(namespace, str(key), response)
+        _cache.flush()
+
+    return response
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+This file is part of yamr "Yet Another Media Renamer".
+
+Copyright (C) 2019, James Lee <jamesl33info@gmail.com>.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import collections
+import os
+import queue
+import threading
+
+from typing import Dict, Iterable, Iterator, List
+
+
+AUDIO = 'audio'
+SUBTITLE = 'subtitle'
+VIDEO = 'video'
+
+AUDIO_EXTENSIONS = ['.flac', '.mp3', '.ogg']
+SUBTITLE_EXTENSIONS = ['.srt']
+VIDEO_EXTENSIONS = ['.avi', '.mkv', '.mp4']
+
+# Maps a file extension to the kind of media file it represents
+FILE_KINDS = dict([(e, AUDIO) for e in AUDIO_EXTENSIONS] +
+                  [(e, SUBTITLE) for e in SUBTITLE_EXTENSIONS] +
+                  [(e, VIDEO) for e in VIDEO_EXTENSIONS])
+
+# Sidecars are the paths of files which accompany a video e.g. its subtitles
+MediaFile = collections.namedtuple('MediaFile', ['path', 'name', 'kind', 'sidecars'], defaults=[()])
+
+# The number of media files each scanning worker may get ahead by
+QUEUE_SIZE = 1024
+
+
+def scan(directory: str) -> Iterator[MediaFile]:
+    """Lazily search for all the media files in a given directory.
+
+    Each directory entry is classified exactly once, and records are yielded
+    as soon as they're found so processing can begin whilst the rest of the
+    tree is still being walked.
+
+    Arguments:
+        directory: The directory to search in.
+
+    Returns:
+        A record for each media file which is supported by yamr.
+    """
+    directories = [os.fspath(directory)]
+
+    while directories:
+        subdirectories = []
+        files = []
+
+        try:
+            with os.scandir(directories.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirectories.append(entry.path)
+                        continue
+
+                    kind = FILE_KINDS.get(os.path.splitext(entry.name)[-1])
+
+                    if kind is not None:
+                        files.append(MediaFile(entry.path, entry.name, kind))
+        except OSError:
+            # Match 'os.walk' which silently skips directories it can't list
+            continue
+
+        # Sidecars are always in the same directory as their video
+        yield from pair(files)
+
+        # Reversed so subdirectories are visited in the order they were listed
+        directories.extend(reversed(subdirectories))
+
+
+def scan_roots(directories: Iterable[str]) -> Iterator[MediaFile]:
+    """Lazily search for all the media files in several directories.
+
+    Directories on different devices are scanned concurrently, by one worker
+    per device; directories on the same device are scanned one after another
+    so a disk isn't made to seek between them.
+
+    Arguments:
+        directories: The directories to search in.
+
+    Returns:
+        A record for each media file which is supported by yamr, records from
+        different devices are interleaved.
+    """
+    devices = group_by_device(distinct_roots(directories))
+
+    if len(devices) <= 1:
+        for directory in [d for device in devices.values() for d in device]:
+            yield from scan(directory)
+
+        return
+
+    found = queue.Queue(maxsize=QUEUE_SIZE)
+
+    def _scan_device(device: List[str]) -> None:
+        try:
+            for directory in device:
+                for file in scan(directory):
+                    found.put(file)
+        finally:
+            # Signals that this worker has finished
+            found.put(None)
+
+    for index, device in enumerate(devices.values()):
+        threading.Thread(target=_scan_device, args=(device,), daemon=True,
+                         name='yamr-scan-{0}'.format(index)).start()
+
+    remaining = len(devices)
+
+    while remaining:
+        file = found.get()
+
+        if file is None:
+            remaining -= 1
+        else:
+            yield file
+
+
+def distinct_roots(directories: Iterable[str]) -> List[str]:
+    """Remove directories which are repeated, or which are inside another of
+    the directories, so no media file is found twice.
+
+    Arguments:
+        directories: The directories to search in.
+
+    Returns:
+        The remaining directories, in the order they were given.
+    """
+    roots = collections.OrderedDict()
+
+    # Symbolic links and relative paths are resolved, but the directories are returned as they were given
+    for directory in directories:
+        roots.setdefault(os.path.realpath(directory), os.fspath(directory))
+
+    return [directory for path, directory in roots.items()
+            if not any(path != other and path.startswith(os.path.join(other, '')) for other in roots)]
+
+
+def group_by_device(directories: Iterable[str]) -> Dict[int, List[str]]:
+    """Group directories by the device they're stored on.
+
+    Arguments:
+        directories: The directories to group.
+
+    Returns:
+        The directories on each device, keyed by device id, in the order they
+        were given. Directories which can't be accessed are grouped together.
+    """
+    devices = collections.OrderedDict()
+
+    for directory in directories:
+        try:
+            device = os.stat(directory).st_dev
+        except OSError:
+            device = None
+
+        devices.setdefault(device, []).append(os.fspath(directory))
+
+    return devices
+
+
+def pair(files: Iterable[MediaFile]) -> List[MediaFile]:
+    """Attach subtitles to the video they accompany.
+
+    A subtitle accompanies a video when they're in the same directory, and
+    the subtitle is named after the video with an extra suffix e.g. a language
+    code; the longest matching video name wins.
+
+    Arguments:
+        files: Records for some media files.
+
+    Returns:
+        The same records, where videos include the paths of their subtitles
+        and those subtitles aren't included by themselves.
+    """
+    files = list(files)
+
+    videos = {}
+
+    for index, file in enumerate(files):
+        if file.kind == VIDEO:
+            videos[(os.path.dirname(file.path), os.path.splitext(file.name)[0])] = index
+
+    sidecars = collections.defaultdict(list)
+    paired = set()
+
+    for index, file in enumerate(files):
+        if file.kind != SUBTITLE:
+            continue
+
+        directory, stem = os.path.dirname(file.path), os.path.splitext(file.name)[0]
+
+        # Remove one suffix at a time, so the longest video name is found first
+        while stem and (directory, stem) not in videos:
+            stem = stem.rpartition('.')[0]
+
+        if stem:
+            sidecars[videos[(directory, stem)]].append(file.path)
+            paired.add(index)
+
+    return [file._replace(sidecars=tuple(sidecars[index])) if index in sidecars else file
+            for index, file in enumerate(files) if index not in paired]
+
+
+def media_file(path: str) -> MediaFile:
+    """Classify a single file, in the same way as 'scan'.
+
+    Arguments:
+        path: The path to the file.
+
+    Returns:
+        A record for the file, or None if it isn't supported by yamr.
+    """
+    name = os.path.basename(path)
+    kind = FILE_KINDS.get(os.path.splitext(name)[-1])
+
+    return None if kind is None else MediaFile(path, name, kind)
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+This file is part of yamr "Yet Another Media Renamer".
+
+Copyright (C) 2019, James Lee <jamesl33info@gmail.com>.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import queue
+import threading
+import time
+
+from concurrent import futures
+from typing import Callable, Hashable, TypeVar
+
+
+T = TypeVar('T')  # Generic type
+
+
+class Scheduler():
+    """Class representing a rate limited request scheduler.
+
+    Requests are queued and started at no more than the allowed rate, using a
+    token bucket. Each request runs on its own short lived thread, so a slow
+    response doesn't stop the next request from starting on time. Duplicate
+    requests which are submitted whilst the original is still pending share
+    its result.
+    """
+    def __init__(self, rate: float = 1.0, burst: int = 1, workers: int = 4) -> None:
+        """Instantiate the Scheduler class.
+
+        Arguments:
+            rate: The maximum number of requests started per second.
+            burst: The number of requests which may be started back to back.
+            workers: The maximum number of requests in flight at once.
+        """
+        # Tokens would never be refilled, leaving every queued request waiting forever
+        if rate <= 0:
+            raise ValueError('rate must be greater than 0')
+
+        self._rate = rate
+        self._burst = burst
+
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._queue = queue.Queue()
+        self._shutdown = False
+
+        self._in_flight = threading.BoundedSemaphore(workers)
+
+        self._dispatcher = threading.Thread(target=self._dispatch, name='yamr-dispatcher', daemon=True)
+        self._dispatcher.start()
+
+    def submit(self, key: Hashable, function: Callable[..., T], *args, **kwargs) -> futures.Future:
+        """Queue a request.
+
+        Arguments:
+            key: Identifies the request, duplicates of pending requests are coalesced.
+            function: The function which performs the request.
+            args: Positional arguments for the function.
+            kwargs: Keyword arguments for the function.
+
+        Returns:
+            A future which will hold the response.
+        """
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError('cannot schedule new requests after shutdown')
+
+            if key in self._pending:
+                return self._pending[key]
+
+            future = futures.Future()
+            self._pending[key] = future
+
+        self._queue.put((key, future, function, args, kwargs))
+
+        return future
+
+    def call(self, key: Hashable, function: Callable[..., T], *args, **kwargs) -> T:
+        """Queue a request then wait for its response, see 'submit'."""
+        return self.submit(key, function, *args, **kwargs).result()
+
+    def shutdown(self) -> None:
+        """Stop dispatching requests, queued requests are cancelled but
+        requests which are in flight still complete."""
+        with self._lock:
+            self._shutdown = True
+
+        self._queue.put(None)
+
+    def _dispatch(self) -> None:
+        """Start each queued request once there is a token available."""
+        while True:
+            request = self._queue.get()
+
+            if request is not None:
+                self._in_flight.acquire()
+                self._take_token()
+
+            with self._lock:
+                if not self._shutdown:
+                    threading.Thread(target=self._run, args=request, name='yamr-request', daemon=True).start()
+                    continue
+
+            if request is not None:
+                self._in_flight.release()
+
+            break
+
+        # Anything still queued will never be started
+        while request is not None:
+            self._cancel(*request)
+            request = self._queue.get()
+
+    def _cancel(self, key: Hashable, future: futures.Future, *_) -> None:
+        """Cancel a queued request, so nothing waits on it forever."""
+        future.cancel()
+
+        with self._lock:
+            del self._pending[key]
+
+    def _take_token(self) -> None:
+        """Block until a token is available, then consume it."""
+        while True:
+            now = time.monotonic()
+
+            self._tokens = min(self._burst, self._tokens + (now - self._last_refill) * self._rate)
+            self._last_refill = now
+
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+
+            time.sleep((1 - self._tokens) / self._rate)
+
+    def _run(self, key: Hashable, future: futures.Future, function: Callable[..., T], args: tuple,
+             kwargs: dict) -> None:
+        """Perform a request, storing the response in its future."""
+        if future.set_running_or_notify_cancel():
+            try:
+                future.set_result(function(*args, **kwargs))
+            except BaseException as exception:  # pylint: disable=broad-except
+                future.set_exception(exception)
+
+        with self._lock:
+            del self._pending[key]
+
+        self._in_flight.release()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+This file is part of yamr "Yet Another Media Renamer".
+
+Copyright (C) 2019, James Lee <jamesl33info@gmail.com>.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import difflib
+import re
+import unicodedata
+
+from typing import Dict
+
+
+DEFAULT_THRESHOLD = 0.85
+
+# How far ahead of the runner-up the best match must be to be chosen automatically
+DEFAULT_MARGIN = 0.05
+
+
+def normalize(title: str) -> str:
+    """Normalize a title so that cosmetic differences don't affect comparisons.
+
+    Arguments:
+        title: The title to normalize.
+
+    Returns:
+        The title in lowercase, without accents, punctuation or a leading "the".
+    """
+    title = unicodedata.normalize('NFKD', str(title))
+    title = ''.join(c for c in title if not unicodedata.combining(c)).lower()
+    title = re.sub(r'&', ' and ', title)
+    title = re.sub(r'[^\w\s]', ' ', title)
+    title = re.sub(r'^the\s+', '', title.strip())
+
+    return ' '.join(title.split())
+
+
+def similarity(first: str, second: str) -> float:
+    """Determine how similar two titles are.
+
+    Arguments:
+        first: The first title.
+        second: The second title.
+
+    Returns:
+        A ratio between 0 (nothing in common) and 1 (identical once normalized).
+    """
+    return difflib.SequenceMatcher(None, normalize(first), normalize(second)).ratio()
+
+
+def score_movie(candidate: Dict, title: str, year: int = None) -> float:
+    """Score how well an IMDB search result matches a movie.
+
+    Arguments:
+        candidate: The IMDB search result.
+        title: The title of the movie extracted by Guessit.
+        year: The year of the movie extracted by Guessit, if known.
+
+    Returns:
+        A confidence between 0 and 1.
+    """
+    score = similarity(candidate.get('title', ''), title)
+
+    # Prefer theatrical releases over e.g. "tv movie" or "video movie"
+    if candidate.get('kind') != 'movie':
+        score -= 0.05
+
+    if year is None:
+        return max(0.0, score)
+
+    candidate_year = candidate.get('year')
+
+    if candidate_year == year:
+        return min(1.0, 0.7 * score + 0.3)
+
+    if candidate_year is not None and abs(candidate_year - year) == 1:
+        return max(0.0, 0.7 * score + 0.15)
+
+    return max(0.0, 0.7 * score)
+
+
+def score_show(candidate: Dict, title: str, year: int = None) -> float:
+    """Score how well an IMDB search result matches a TV show.
+
+    Arguments:
+        candidate: The IMDB search result.
+        title: The title of the show extracted by Guessit.
+        year: The year the show started extracted by Guessit, if known.
+
+    Returns:
+        A confidence between 0 and 1.
+    """
+    score = similarity(candidate.get('title', ''), title)
+
+    # Prefer full series over e.g. "tv mini series" or "tv special"
+    if candidate.get('kind') != 'tv series':
+        score -= 0.05
+
+    if year is None:
+        return max(0.0, score)
+
+    # Unlike movies, the year only ever disambiguates remakes e.g. "Doctor Who (2005)"
+    if candidate.get('year') == year:
+        return min(1.0, 0.7 * score + 0.3)
+
+    return max(0.0, 0.7 * score)
+
+
+def score_album(candidate: Dict, title: str, track_count: int, artist: str = None) -> float:
+    """Score how well a MusicBrainz search result matches an album.
+
+    Arguments:
+        candidate: The MusicBrainz release.
+        title: The title of the album extracted by Guessit.
+        track_count: The number of local tracks which belong to the album.
+        artist: The artist of the album from the filenames or tags, if known.
+
+    Returns:
+        A confidence between 0 and 1.
+    """
+    score = similarity(candidate.get('title', ''), title)
+
+    # Albums such as "Greatest Hits" are only told apart by their artist
+    if artist is not None:
+        score = 0.5 * score + 0.5 * similarity(candidate.get('artist-credit-phrase', ''), artist)
+
+    try:
+        release_tracks = sum(int(m['track-count']) for m in candidate['medium-list'])
+    except (KeyError, ValueError):
+        release_tracks = 0
+
+    if not release_tracks or track_count > release_tracks:
+        return 0.7 * score
+
+    # Partial albums are common, but a complete match is the strongest signal
+    return 0.7 * score + 0.3 * (track_count / release_tracks)
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+This file is part of yamr "Yet Another Media Renamer".
+
+Copyright (C) 2019, James Lee <jamesl33info@gmail.com>.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import collections
+import contextlib
+import functools
+import json
+import threading
+import time
+
+from typing import Callable, Dict, Iterable, Iterator, TextIO, TypeVar
+
+
+T = TypeVar('T')  # Generic type
+
+# Timings with this prefix are the top level phases of a run
+PHASE_PREFIX = 'phase.'
+
+_counters = collections.Counter()
+_lock = threading.Lock()
+
+# Running totals of each operation as [count, total, max], rather than every
+# sample, so memory use doesn't grow with the length of a run (or a watch)
+_timings = {}
+
+
+def reset() -> None:
+    """Discard everything recorded so far."""
+    with _lock:
+        _counters.clear()
+        _timings.clear()
+
+
+def increment(name: str, amount: int = 1) -> None:
+    """Increment a counter.
+
+    Arguments:
+        name: The name of the counter e.g. 'files'.
+        amount: The amount to increment the counter by.
+    """
+    with _lock:
+        _counters[name] += amount
+
+
+def record(name: str, seconds: float) -> None:
+    """Record how long an operation took.
+
+    Arguments:
+        name: The name of the operation e.g. 'request.imdb-search'.
+        seconds: The wall time the operation took.
+    """
+    with _lock:
+        timing = _timings.get(name)
+
+        if timing is None:
+            _timings[name] = [1, seconds, seconds]
+        else:
+            timing[0] += 1
+            timing[1] += seconds
+            timing[2] = max(timing[2], seconds)
+
+
+@contextlib.contextmanager
+def timer(name: str) -> Iterator[None]:
+    """Context manager which records the wall time of its body.
+
+    Arguments:
+        name: The name of the operation being timed.
+    """
+    start = time.perf_counter()
+
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+def timed(name: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Decorator which records the wall time of each call to a function.
+
+    Arguments:
+        name: The name of the operation being timed.
+
+    Returns:
+        The decorator.
+    """
+    def _decorator(function: Callable[..., T]) -> Callable[..., T]:
+        @functools.wraps(function)
+        def _wrapper(*args, **kwargs):
+            with timer(name):
+                return function(*args, **kwargs)
+
+        return _wrapper
+
+    return _decorator
+
+
+def timed_iter(name: str, iterable: Iterable[T]) -> Iterator[T]:
+    """Time how long a lazy iterable spends producing its items.
+
+    Time spent by the consumer, between items, isn't included so a generator
+    which is interleaved with other work can still be timed on its own.
+
+    Arguments:
+        name: The name of the operation being timed.
+        iterable: The iterable to time.
+
+    Returns:
+        The items from the iterable.
+    """
+    iterator = iter(iterable)
+    elapsed = 0.0
+
+    try:
+        while True:
+            start = time.perf_counter()
+
+            try:
+                item = next(iterator)
+            except StopIteration:
+                break
+            finally:
+                elapsed += time.perf_counter() - start
+
+            yield item
+    finally:
+        record(name, elapsed)
+
+
+def summary() -> Dict:
+    """Summarise everything recorded so far.
+
+    Returns:
+        The phase timings, operation latencies, counters, cache hit rates and
+        throughput, suitable for serializing as JSON.
+    """
+    with _lock:
+        counters = dict(_counters)
+        timings = {name: tuple(timing) for name, timing in _timings.items()}
+
+    phases = {name[len(PHASE_PREFIX):]: total for name, (_, total, _) in timings.items()
+              if name.startswith(PHASE_PREFIX)}
+
+    latencies = {
+        name: {
+            'count': count,
+            'total': total,
+            'mean': total / count,
+            'max': longest,
+        } for name, (count, total, longest) in timings.items() if not name.startswith(PHASE_PREFIX)
+    }
+
+    caches = collections.defaultdict(lambda: {'hits': 0, 'misses': 0})
+
+    for name, count in counters.items():
+        if name.startswith('cache.'):
+            namespace, outcome = name[len('cache.'):].rsplit('.', 1)
+            caches[namespace][outcome] = count
+
+    for namespace in caches.values():
+        namespace['hit_rate'] = namespace['hits'] / ((namespace['hits'] + namespace['misses']) or 1)
+
+    # Filenames are either matched by the fast path or go through Guessit, cached filenames are neither
+    parsed = counters.get('parse.fast_path', 0) + counters.get('parse.guessed', 0)
+
+    total = phases.get('total')
+
+    return {
+        'phases': phases,
+        'latencies': latencies,
+        'counters': {name: count for name, count in counters.items() if not name.startswith('cache.')},
+        'caches': dict(caches),
+        'fast_path_hit_rate': counters.get('parse.fast_path', 0) / parsed if parsed else None,
+        'files_per_second': counters.get('files', 0) / total if total else None,
+    }
+
+
+def print_summary(output: TextIO = None) -> None:
+    """Print a human readable summary of everything recorded so far.
+
+    Arguments:
+        output: The stream to print to, defaults to stdout.
+    """
+    results = summary()
+
+    def _print(line: str = '') -> None:
+        print(line, file=output)
+
+    _print()
+    _print('Phases')
+
+    for name, seconds in results['phases'].items():
+        _print('  {0:<40}{1:>10.3f}s'.format(name, seconds))
+
+    _print('Latencies')
+
+    for name, latency in sorted(results['latencies'].items()):
+        _print('  {0:<40}{1:>6} calls {2:>10.3f}s total {3:>8.3f}s mean {4:>8.3f}s max'.format(
+            name, latency['count'], latency['total'], latency['mean'], latency['max']))
+
+    _print('Counters')
+
+    for name, count in sorted(results['counters'].items()):
+        _print('  {0:<40}{1:>10}'.format(name, count))
+
+    _print('Caches')
+
+    for name, cache in sorted(results['caches'].items()):
+        _print('  {0:<40}{1:>9.1%} of {2} lookups'.format(name, cache['hit_rate'], cache['hits'] + cache['misses']))
+
+    if results['fast_path_hit_rate'] is not None:
+        _print('Parsing')
+        _print('  {0:<40}{1:>9.1%}'.format('fast path hit rate', results['fast_path_hit_rate']))
+
+    if results['files_per_second'] is not None:
+        _print('Throughput')
+        _print('  {0:<40}{1:>10.1f}'.format('files per second', results['files_per_second']))
+
+
+def dump(path: str) -> None:
+    """Write a summary of everything recorded so far as JSON.
+
+    Arguments:
+        path: The file to write the summary to.
+    """
+    with open(path, 'w') as stats_file:
+        json.dump(summary(), stats_file, indent=4)
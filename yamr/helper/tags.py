@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+This file is part of yamr "Yet Another Media Renamer".
+
+Copyright (C) 2019, James Lee <jamesl33info@gmail.com>.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import mmap
+import os
+import struct
+
+from typing import Dict, Iterator
+
+from . import media_info
+from . import stats
+
+
+DEFAULT_WORKERS = 8
+
+# Tags are stored at the start of the file, only this much of it is ever mapped
+MAX_HEADER_SIZE = 16 * 1024 * 1024
+
+# Maps ID3v2.3/2.4 and ID3v2.2 text frames to the tags which yamr uses
+ID3_FRAMES = {
+    b'TALB': 'album', b'TPE1': 'artist', b'TPE2': 'album_artist', b'TIT2': 'title', b'TRCK': 'track', b'TPOS': 'disc',
+    b'TAL': 'album', b'TP1': 'artist', b'TP2': 'album_artist', b'TT2': 'title', b'TRK': 'track', b'TPA': 'disc',
+}
+
+# Maps Vorbis comment fields, as used by FLAC and Ogg, to the tags which yamr uses
+VORBIS_FIELDS = {
+    'ALBUM': 'album', 'ARTIST': 'artist', 'ALBUMARTIST': 'album_artist', 'ALBUM ARTIST': 'album_artist',
+    'TITLE': 'title', 'TRACKNUMBER': 'track', 'DISCNUMBER': 'disc',
+}
+
+ID3_ENCODINGS = ['latin-1', 'utf-16', 'utf-16-be', 'utf-8']
+
+FLAC_VORBIS_COMMENT = 4
+
+
+def read(path: str) -> Dict[str, object]:
+    """Read the embedded tags of an audio file.
+
+    Only the start of the file is mapped into memory, and only the pages which
+    contain the tags are actually read, so large lossless files are cheap.
+
+    Arguments:
+        path: The path to the audio file, which may be an MP3, FLAC or Ogg file.
+
+    Returns:
+        The 'artist', 'album', 'title', 'track' and 'disc' tags which were
+        found, empty if the file has no tags or they couldn't be read.
+    """
+    with stats.timer('tags.read'):
+        try:
+            with open(path, 'rb') as file:
+                size = os.fstat(file.fileno()).st_size
+
+                if size == 0:
+                    return {}
+
+                with mmap.mmap(file.fileno(), min(size, MAX_HEADER_SIZE), access=mmap.ACCESS_READ) as data:
+                    raw = _read_raw(data)
+        except (OSError, ValueError, IndexError, StopIteration, struct.error):
+            # Broken or truncated tags are treated as if they weren't there
+            return {}
+
+    tags = {}
+
+    for key, value in raw.items():
+        value = value.strip('\x00').strip()
+
+        if not value:
+            continue
+
+        if key in ('track', 'disc'):
+            # Numbers are often stored with their total e.g. "3/12"
+            number = value.split('/')[0].strip()
+
+            if number.isdigit():
+                tags[key] = int(number)
+        else:
+            tags[key] = value
+
+    # The album artist is the same for every track, so it's preferred when grouping
+    if 'album_artist' in tags:
+        tags['artist'] = tags.pop('album_artist')
+
+    stats.increment('tags.found' if tags else 'tags.missing')
+
+    return tags
+
+
+def track_info(info: media_info.MediaInfo, tags: Dict[str, object]) -> media_info.MediaInfo:
+    """Combine the information extracted from a track's filename with its tags.
+
+    Arguments:
+        info: The information extracted by Guessit or the fast path.
+        tags: The tags read from the track.
+
+    Returns:
+        New information using the same keys as Guessit, where the tags take
+        precedence over the filename.
+    """
+    info = media_info.MediaInfo(info)
+
+    for key, tag in [('title', 'artist'), ('alternative_title', 'album'), ('episode_title', 'title'),
+                     ('episode', 'track'), ('disc', 'disc')]:
+        if tag in tags:
+            info[key] = tags[tag]
+
+    return info
+
+
+def _read_raw(data: mmap.mmap) -> Dict[str, str]:
+    """Read the tags from the start of an audio file, in whichever format
+    they're stored.
+
+    Arguments:
+        data: The start of the audio file.
+
+    Returns:
+        The raw values of the tags, keyed by the name used by yamr.
+    """
+    if data[:3] == b'ID3':
+        return _read_id3(data)
+
+    if data[:4] == b'fLaC':
+        return _read_flac(data)
+
+    if data[:4] == b'OggS':
+        return _read_ogg(data)
+
+    return {}
+
+
+def _read_id3(data: mmap.mmap) -> Dict[str, str]:
+    """Read the text frames of an ID3v2 tag.
+
+    Arguments:
+        data: The start of an audio file which begins with an ID3v2 tag.
+
+    Returns:
+        The raw values of the tags, keyed by the name used by yamr.
+    """
+    version, flags = data[3], data[5]
+    end = min(len(data), 10 + _syncsafe(data[6:10]))
+    offset = 10
+
+    if version not in (2, 3, 4):
+        return {}
+
+    if flags & 0x40 and version > 2:
+        # Skip the extended header, its size only includes itself in ID3v2.4
+        extended = data[offset:offset + 4]
+        offset += _syncsafe(extended) if version == 4 else struct.unpack('>I', extended)[0] + 4
+
+    body = data[offset:end]
+
+    if flags & 0x80 and version < 4:
+        # The whole tag is unsynchronised, ID3v2.4 unsynchronises each frame instead
+        body = body.replace(b'\xff\x00', b'\xff')
+
+    id_size, header_size = (3, 6) if version == 2 else (4, 10)
+    offset = 0
+    raw = {}
+
+    while offset + header_size <= len(body):
+        frame_id = body[offset:offset + id_size]
+
+        if not frame_id.strip(b'\x00'):
+            # The remainder of the tag is padding
+            break
+
+        if version == 2:
+            size = int.from_bytes(body[offset + 3:offset + 6], 'big')
+        elif version == 3:
+            size = struct.unpack('>I', body[offset + 4:offset + 8])[0]
+        else:
+            size = _syncsafe(body[offset + 4:offset + 8])
+
+        frame = body[offset + header_size:offset + header_size + size]
+        offset += header_size + size
+
+        if frame_id in ID3_FRAMES and frame and frame[0] < len(ID3_ENCODINGS):
+            raw.setdefault(ID3_FRAMES[frame_id], _decode_text(frame[1:], ID3_ENCODINGS[frame[0]]))
+
+    return raw
+
+
+def _read_flac(data: mmap.mmap) -> Dict[str, str]:
+    """Read the Vorbis comment metadata block of a FLAC file.
+
+    Blocks which aren't needed, such as embedded pictures, are skipped without
+    being read.
+
+    Arguments:
+        data: The start of a FLAC file.
+
+    Returns:
+        The raw values of the tags, keyed by the name used by yamr.
+    """
+    offset = 4
+
+    while offset + 4 <= len(data):
+        header = data[offset]
+        size = int.from_bytes(data[offset + 1:offset + 4], 'big')
+        offset += 4
+
+        if header & 0x7f == FLAC_VORBIS_COMMENT:
+            return _read_vorbis_comment(data[offset:offset + size])
+
+        if header & 0x80:
+            # This was the last metadata block
+            break
+
+        offset += size
+
+    return {}
+
+
+def _read_ogg(data: mmap.mmap) -> Dict[str, str]:
+    """Read the comment header of an Ogg Vorbis or Opus file.
+
+    Arguments:
+        data: The start of an Ogg file.
+
+    Returns:
+        The raw values of the tags, keyed by the name used by yamr.
+    """
+    # The comment header is always the second packet of the first logical stream
+    packets = _ogg_packets(data)
+    next(packets)
+    packet = next(packets)
+
+    for magic in (b'\x03vorbis', b'OpusTags'):
+        if packet.startswith(magic):
+            return _read_vorbis_comment(packet[len(magic):])
+
+    return {}
+
+
+def _ogg_packets(data: mmap.mmap) -> Iterator[bytes]:
+    """Reassemble the packets of the first logical stream of an Ogg file.
+
+    Arguments:
+        data: The start of an Ogg file.
+
+    Returns:
+        Each complete packet, in order.
+    """
+    offset = 0
+    serial = None
+    packet = []
+
+    while data[offset:offset + 4] == b'OggS':
+        page_serial, segment_count = struct.unpack('<I', data[offset + 14:offset + 18])[0], data[offset + 26]
+        segments = data[offset + 27:offset + 27 + segment_count]
+        offset += 27 + segment_count
+
+        if serial is None:
+            serial = page_serial
+
+        for length in segments:
+            if page_serial == serial:
+                packet.append(data[offset:offset + length])
+
+                # A segment shorter than the maximum ends the packet
+                if length < 255:
+                    yield b''.join(packet)
+                    packet = []
+
+            offset += length
+
+
+def _read_vorbis_comment(block: bytes) -> Dict[str, str]:
+    """Read a Vorbis comment, as stored by FLAC, Ogg Vorbis and Opus.
+
+    Arguments:
+        block: The comment, starting at its vendor string.
+
+    Returns:
+        The raw values of the tags, keyed by the name used by yamr.
+    """
+    vendor_length = struct.unpack('<I', block[:4])[0]
+    offset = 4 + vendor_length
+    count = struct.unpack('<I', block[offset:offset + 4])[0]
+    offset += 4
+    raw = {}
+
+    for _ in range(count):
+        length = struct.unpack('<I', block[offset:offset + 4])[0]
+        field, _, value = block[offset + 4:offset + 4 + length].decode('utf-8', 'replace').partition('=')
+        offset += 4 + length
+
+        if field.upper() in VORBIS_FIELDS:
+            raw.setdefault(VORBIS_FIELDS[field.upper()], value)
+
+    return raw
+
+
+def _decode_text(text: bytes, encoding: str) -> str:
+    """Decode the value of an ID3v2 text frame.
+
+    Arguments:
+        text: The value, excluding its encoding byte.
+        encoding: The encoding of the value.
+
+    Returns:
+        The first string in the frame.
+    """
+    # ID3v2.4 allows several null separated strings, only the first is used
+    return text.decode(encoding).split('\x00')[0]
+
+
+def _syncsafe(value: bytes) -> int:
+    """Decode an ID3v2 syncsafe integer, which only uses 7 bits per byte.
+
+    Arguments:
+        value: The four encoded bytes.
+
+    Returns:
+        The decoded integer.
+    """
+    return (value[0] & 0x7f) << 21 | (value[1] & 0x7f) << 14 | (value[2] & 0x7f) << 7 | (value[3] & 0x7f)
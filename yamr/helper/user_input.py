@@ -18,22 +18,99 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
-from typing import Callable, List, TypeVar
+import json
+import threading
+
+from typing import Callable, Dict, List, Tuple, TypeVar
+
+from . import scoring
+from . import stats
 
 
 T = TypeVar('T')  # Generic type
 
+_auto_margin = scoring.DEFAULT_MARGIN
+_auto_threshold = None
+_confirmed = False
+_review_queue = None
+_review_lock = threading.Lock()
+
+
+def configure(auto_threshold: float = None, review_queue: str = None,
+              auto_margin: float = scoring.DEFAULT_MARGIN) -> None:
+    """Configure whether choices are made by the user or automatically.
+
+    Arguments:
+        auto_threshold: Automatically accept the best scoring choice when its
+            score is at least this high, None means always prompt the user.
+        review_queue: Path to a file which low confidence choices are appended
+            to, rather than prompting the user.
+        auto_margin: How far the best scoring choice must be ahead of the
+            runner-up to be accepted automatically.
+    """
+    global _auto_margin, _auto_threshold, _review_queue
+
+    _auto_margin = auto_margin
+    _auto_threshold = auto_threshold
+    _review_queue = review_queue
+
+
+def last_choice_confirmed() -> bool:
+    """Determine whether the last choice was entered by the user, as opposed
+    to being made automatically or skipped.
+
+    Returns:
+        Whether the user entered the last choice.
+    """
+    return _confirmed
+
 
-def prompt_choice(choices: List[T], print_choice: Callable[[int, T], T]) -> T:
+def prompt_choice(choices: List[T], print_choice: Callable[[int, T], T], score: Callable[[T], float] = None,
+                  describe: Callable[[T], Dict] = None, query: Dict = None) -> T:
     """Prompt the user to choose an item from a list.
 
+    When automatic matching is enabled and a 'score' function is given the
+    user isn't prompted, see 'auto_choice'.
+
+    Arguments:
+        choices: The items to choose between.
+        print_choice: Function which displays a numbered choice.
+        score: Function which scores how well a choice matches the query.
+        describe: Function which describes a choice for the review queue.
+        query: Describes what the choices were searched for, for the review queue.
+
     Returns:
         The users choice from the 'choices' list.
     """
+    global _confirmed
+
+    _confirmed = False
+
     # There weren't any search results
     if not choices:
         return
 
+    if _auto_threshold is not None and score is not None:
+        return auto_choice(choices, print_choice, score, describe, query)
+
+    # Time spent waiting on the user is recorded separately from network time
+    with stats.timer('prompt'):
+        choice, _confirmed = _prompt_user(choices, print_choice)
+
+    return choice
+
+
+def _prompt_user(choices: List[T], print_choice: Callable[[int, T], T]) -> Tuple[T, bool]:
+    """Interactively prompt the user to choose an item from a list.
+
+    Arguments:
+        choices: The items to choose between.
+        print_choice: Function which displays a numbered choice.
+
+    Returns:
+        The users choice from the 'choices' list, and whether the user entered
+        it rather than it being the only result.
+    """
     current_pos = 0
 
     while True:
@@ -45,7 +122,7 @@ def prompt_choice(choices: List[T], print_choice: Callable[[int, T], T]) -> T:
         # There was only one search result, automatically choose it
         if len(choices) == 1:
             print('Automatically choosing only result: 1')
-            return current_choices[0]
+            return current_choices[0], False
 
         try:
             user_input = input('\033[KEnter choice: ')
@@ -54,22 +131,73 @@ def prompt_choice(choices: List[T], print_choice: Callable[[int, T], T]) -> T:
 
         # Attempt to see if the user input a valid choice
         try:
-            return choices[int(user_input) - 1]
+            return choices[int(user_input) - 1], True
         except ValueError:
             pass
 
         # Check for other valid input, which is *not* a choice
         if user_input == '' and choices[0] == current_choices[0]:
             print('\033[F\033[KEnter choice: 1')
-            return current_choices[0]
+            return current_choices[0], True
         elif user_input == 'n' and current_pos <= len(choices) - (5 + 1):
             current_pos += 5
         elif user_input == 'p' and current_pos >= 5:
             current_pos -= 5
         elif user_input == 's':
-            return None
+            return None, False
         elif user_input == 'q':
             exit(0)
 
         # Erase the old output choices
         print('\033[F\033[K' * (len(current_choices) + 1), end='')
+
+
+def auto_choice(choices: List[T], print_choice: Callable[[int, T], T], score: Callable[[T], float],
+                describe: Callable[[T], Dict] = None, query: Dict = None) -> T:
+    """Choose the best scoring item from a list without prompting the user.
+
+    Choices which aren't confident enough, or which are ambiguous because the
+    runner-up scores almost as well e.g. a remake with the same title, are
+    deferred by appending them to the review queue, so the rest of the batch
+    can keep flowing.
+
+    Arguments:
+        choices: The items to choose between.
+        print_choice: Function which displays a numbered choice.
+        score: Function which scores how well a choice matches the query.
+        describe: Function which describes a choice for the review queue.
+        query: Describes what the choices were searched for, for the review queue.
+
+    Returns:
+        The best choice, or None if it was deferred.
+    """
+    scores = [score(choice) for choice in choices]
+    ranked = sorted(range(len(choices)), key=lambda i: scores[i], reverse=True)
+
+    best = ranked[0]
+    runner_up = scores[ranked[1]] if len(ranked) > 1 else 0.0
+
+    if scores[best] >= _auto_threshold and scores[best] - runner_up >= _auto_margin:
+        print_choice(best + 1, choices[best])
+        print('Automatically choosing: {0} (confidence {1:.2f})'.format(best + 1, scores[best]))
+        stats.increment('auto.accepted')
+        return choices[best]
+
+    if scores[best] >= _auto_threshold:
+        print('Ambiguous match (best {0:.2f}, runner-up {1:.2f}), deferred for review'.format(scores[best], runner_up))
+    else:
+        print('No confident match (best {0:.2f}), deferred for review'.format(scores[best]))
+
+    stats.increment('auto.deferred')
+
+    if _review_queue is not None:
+        entry = {
+            'query': query or {},
+            'candidates': [dict(describe(choices[i]) if describe else {}, score=round(scores[i], 3))
+                           for i in ranked[:5]],
+        }
+
+        with _review_lock, open(_review_queue, 'a') as review_file:
+            review_file.write(json.dumps(entry, default=str) + '\n')
+
+    return None
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+This file is part of yamr "Yet Another Media Renamer".
+
+Copyright (C) 2019, James Lee <jamesl33info@gmail.com>.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from . import scanner
+
+
+DEFAULT_INTERVAL = 1.0  # Seconds
+DEFAULT_SETTLE = 5.0  # Seconds
+
+# See 'inotify(7)'
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+_EVENT = struct.Struct('iIII')
+
+
+class InotifyBackend():
+    """Class representing change detection using the Linux inotify api."""
+    def __init__(self, folder: str) -> None:
+        """Instantiate the InotifyBackend class.
+
+        Arguments:
+            folder: The folder to watch, including its subdirectories.
+
+        Raises:
+            OSError: If inotify isn't available.
+        """
+        if not sys.platform.startswith('linux'):
+            raise OSError('inotify is only available on Linux')
+
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+
+        self._folder = folder
+        self._watches = {}
+
+        self._watch_tree(folder)
+
+    def changes(self, timeout: float) -> List[str]:
+        """Wait for files to be created or changed.
+
+        Arguments:
+            timeout: The maximum number of seconds to wait.
+
+        Returns:
+            The paths of the files which have changed.
+        """
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+
+        if not readable:
+            return []
+
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        changed = []
+        offset = 0
+
+        while offset < len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            name = data[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b'\0')
+            offset += _EVENT.size + length
+
+            # Events were dropped, so everything has to be checked
+            if mask & IN_Q_OVERFLOW:
+                changed += [f.path for f in scanner.scan(self._folder)]
+                continue
+
+            if wd not in self._watches or not name:
+                continue
+
+            path = os.path.join(self._watches[wd], os.fsdecode(name))
+
+            # Files may have been moved in with the directory, before it was watched
+            if mask & IN_ISDIR:
+                self._watch_tree(path)
+                changed += [f.path for f in scanner.scan(path)]
+            else:
+                changed.append(path)
+
+        return changed
+
+    def close(self) -> None:
+        """Stop watching the folder."""
+        os.close(self._fd)
+
+    def _watch_tree(self, folder: str) -> None:
+        for directory, _, _ in os.walk(folder):
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+
+            if wd >= 0:
+                self._watches[wd] = directory
+
+
+class PollingBackend():
+    """Class representing change detection by periodically scanning the folder."""
+    def __init__(self, folder: str) -> None:
+        """Instantiate the PollingBackend class.
+
+        Arguments:
+            folder: The folder to watch, including its subdirectories.
+        """
+        self._folder = folder
+        self._snapshot = self._scan()
+
+    def changes(self, timeout: float) -> List[str]:
+        """Wait, then scan the folder for files which are new or have changed.
+
+        Arguments:
+            timeout: The number of seconds to wait before scanning.
+
+        Returns:
+            The paths of the files which have changed.
+        """
+        time.sleep(timeout)
+
+        snapshot = self._scan()
+        changed = [path for path, signature in snapshot.items() if self._snapshot.get(path) != signature]
+        self._snapshot = snapshot
+
+        return changed
+
+    def close(self) -> None:
+        """Stop watching the folder."""
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        snapshot = {}
+
+        for file in scanner.scan(self._folder):
+            signature = _signature(file.path)
+
+            if signature is not None:
+                snapshot[file.path] = signature
+
+        return snapshot
+
+
+class Watcher():
+    """Class representing a watch on a folder for new media files.
+
+    Files are only reported once their size and modification time have stopped
+    changing for a while, so partially written downloads aren't processed.
+    """
+    def __init__(self, folder: str, interval: float = DEFAULT_INTERVAL, settle: float = DEFAULT_SETTLE,
+                 polling: bool = False) -> None:
+        """Instantiate the Watcher class.
+
+        Arguments:
+            folder: The folder to watch, including its subdirectories.
+            interval: How often to check for changes in seconds.
+            settle: How long a file must be unchanged for before it's reported.
+            polling: Always scan the folder, rather than trying to use inotify.
+        """
+        self._interval = interval
+        self._settle = settle
+
+        self._backend = None
+
+        if not polling:
+            try:
+                self._backend = InotifyBackend(folder)
+            except (AttributeError, OSError):
+                pass
+
+        if self._backend is None:
+            self._backend = PollingBackend(folder)
+
+        self._ignored = set()
+        self._pending = {}
+
+    def batches(self) -> Iterator[List[str]]:
+        """Wait for new media files, forever.
+
+        Returns:
+            Batches of paths to media files which have settled.
+        """
+        while True:
+            now = time.monotonic()
+
+            for path in self._backend.changes(self._interval):
+                if path in self._ignored:
+                    self._ignored.discard(path)
+                elif scanner.media_file(path) is not None:
+                    self._pending.setdefault(path, (None, now))
+
+            ready = []
+
+            for path, (signature, since) in list(self._pending.items()):
+                current = _signature(path)
+
+                if current is None:
+                    # The file was removed or moved away whilst it was being written
+                    del self._pending[path]
+                elif current != signature:
+                    self._pending[path] = (current, time.monotonic())
+                elif time.monotonic() - since >= self._settle:
+                    ready.append(path)
+                    del self._pending[path]
+
+            if ready:
+                yield sorted(ready)
+
+    def ignore(self, paths: Iterable[str]) -> None:
+        """Ignore the next change to some files e.g. because yamr renamed them.
+
+        Arguments:
+            paths: The paths of the files.
+        """
+        self._ignored.update(paths)
+
+    def close(self) -> None:
+        """Stop watching the folder."""
+        self._backend.close()
+
+
+def _signature(path: str) -> Tuple[int, int]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+
+    return stat.st_size, stat.st_mtime_ns